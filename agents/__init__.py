@@ -1,14 +1,48 @@
 """
 Coffee Trends Agents Package
+
+Agents are built lazily: importing the package only defines the factories, and
+the agent attributes below are created on first access.
 """
 
-from .coffee_trends_agent import coffee_trends_agent, coffee_trends_a2a_app
-from .baho_strategy_agent import baho_strategy_agent, remote_coffee_trends_agent
+from importlib import import_module
+
+from .baho_strategy_agent import build_baho_strategy_agent, build_remote_coffee_trends_agent
+
+# Importing the submodule bound "baho_strategy_agent" to the module itself; drop
+# it so the name resolves to the agent through __getattr__ below.
+del baho_strategy_agent
+
+# The coffee trends agent's module loads the knowledge base, which a process
+# only running the BAHO Strategy Agent (a remote client of it) never needs, so
+# even its factories are imported on first access.
+_LAZY_ATTRIBUTES = {
+    "coffee_trends_agent": ".coffee_trends_agent",
+    "coffee_trends_a2a_app": ".coffee_trends_agent",
+    "build_coffee_trends_agent": ".coffee_trends_agent",
+    "build_coffee_trends_a2a_app": ".coffee_trends_agent",
+    "baho_strategy_agent": ".baho_strategy_agent",
+    "remote_coffee_trends_agent": ".baho_strategy_agent",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        module = import_module(_LAZY_ATTRIBUTES[name], __name__)
+        # A first import binds the submodule's name here; drop it as above
+        if globals().get(module.__name__.rpartition(".")[2]) is module:
+            del globals()[module.__name__.rpartition(".")[2]]
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "coffee_trends_agent",
     "coffee_trends_a2a_app",
     "baho_strategy_agent",
     "remote_coffee_trends_agent",
+    "build_coffee_trends_agent",
+    "build_coffee_trends_a2a_app",
+    "build_baho_strategy_agent",
+    "build_remote_coffee_trends_agent",
 ]
-
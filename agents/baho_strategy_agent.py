@@ -2,49 +2,36 @@
 BAHO Coffee Strategy Agent - Consumer Agent
 This agent uses the Coffee Trends Agent via A2A to provide strategic insights
 specifically tailored for BAHO COFFEE COMPANY, a Rwandan specialty coffee producer.
+
+Importing this module builds nothing. build_baho_strategy_agent() and
+build_remote_coffee_trends_agent() create the agents; the module attributes
+baho_strategy_agent and remote_coffee_trends_agent hold shared default
+instances built on first access.
 """
 
+import logging
 import os
-from google.adk.agents import LlmAgent
-from google.adk.agents.remote_a2a_agent import (
-    RemoteA2aAgent,
-    AGENT_CARD_WELL_KNOWN_PATH,
-)
-from google.adk.models.google_llm import Gemini
-from google.genai import types
-
-
-# Configure retry options
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
-
-
-# Create a RemoteA2aAgent that connects to the Coffee Trends Agent
-remote_coffee_trends_agent = RemoteA2aAgent(
-    name="coffee_trends_agent",
-    description="Remote coffee trends and market intelligence agent that provides "
-                "global coffee trends, Rwandan coffee information, and strategic insights.",
-    # Point to the agent card URL
-    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}",
-)
-
-print("✅ Remote Coffee Trends Agent proxy created!")
-print(f"   Connected to: http://localhost:8001")
-print(f"   Agent card: http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}")
-
-
-# Create the BAHO Coffee Strategy Agent
-baho_strategy_agent = LlmAgent(
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    name="baho_strategy_agent",
-    description="Strategic advisor for BAHO COFFEE COMPANY, a Rwandan specialty coffee producer. "
-                "Provides market insights, competitive positioning, and growth strategies based on "
-                "global coffee trends and Rwandan coffee characteristics.",
-    instruction="""
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cache import attach_response_cache
+from config import AgentConfig
+
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+
+logger = logging.getLogger(__name__)
+
+
+BAHO_STRATEGY_INSTRUCTION = """
     You are a strategic advisor for BAHO COFFEE COMPANY, a premium Rwandan specialty coffee producer.
     
     Your role is to help BAHO make informed business decisions by:
@@ -71,12 +58,134 @@ baho_strategy_agent = LlmAgent(
     
     Always be strategic, data-driven, and focused on BAHO's success as a Rwandan specialty coffee producer.
     Be enthusiastic about Rwanda's unique coffee story and BAHO's potential in the global market.
-    """,
-    sub_agents=[remote_coffee_trends_agent],  # Use the remote agent via A2A!
-)
+    """
+
+
+def build_remote_coffee_trends_agent(config: Optional[AgentConfig] = None) -> "RemoteA2aAgent":
+    """
+    Create a RemoteA2aAgent that connects to the Coffee Trends Agent.
+    
+    Calls go through the process-wide pooled keep-alive HTTP client, and the
+    agent card is fetched on the first call through a shared cache that
+    refreshes it after config.agent_card_ttl seconds. When COFFEE_TRENDS_URL
+    lists several servers, that client balances the calls over all of them.
+    
+    Args:
+        config: Settings naming the trends server and HTTP pool (default: AgentConfig.from_env())
+    
+    Returns:
+        A new RemoteA2aAgent
+    """
+    from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
+    from clients.http_pool import shared_http_client
+    from clients.remote_agent import CachingRemoteA2aAgent, shared_agent_card_cache
+    
+    config = config or AgentConfig.from_env()
+    agent_card_url = f"{config.coffee_trends_url}{AGENT_CARD_WELL_KNOWN_PATH}"
+    remote_agent = CachingRemoteA2aAgent(
+        name="coffee_trends_agent",
+        description="Remote coffee trends and market intelligence agent that provides "
+                    "global coffee trends, Rwandan coffee information, and strategic insights.",
+        # Point to the agent card URL
+        agent_card=agent_card_url,
+        httpx_client=shared_http_client(config),
+        timeout=config.http_timeout,
+        card_cache=shared_agent_card_cache(config.agent_card_ttl),
+        replica_urls=config.coffee_trends_urls if len(config.coffee_trends_urls) > 1 else (),
+    )
+    logger.info("Remote Coffee Trends Agent proxy created for %s", agent_card_url)
+    return remote_agent
+
+
+def build_baho_strategy_agent(
+    config: Optional[AgentConfig] = None,
+    remote_agent: Optional["RemoteA2aAgent"] = None,
+    model: Optional["BaseLlm"] = None,
+) -> "LlmAgent":
+    """
+    Create the BAHO Coffee Strategy Agent.
+    
+    Args:
+        config: Model, retry and trends server settings (default: AgentConfig.from_env())
+        model: Model instance to use instead of Gemini (e.g., a stub for benchmarks)
+        remote_agent: Coffee Trends Agent proxy to use as sub-agent
+                      (default: a new one from build_remote_coffee_trends_agent(config)).
+                      An agent can only have one parent, so each strategy agent needs its own.
+    
+    Returns:
+        A new LlmAgent
+    """
+    from google.adk.agents import LlmAgent
+    
+    from agents.context_budget import attach_context_budget
+    from cache.semantic_cache import shared_semantic_cache
+    from clients.model_scheduler import create_gemini
+    from telemetry import configure_telemetry
+    
+    config = config or AgentConfig.from_env()
+    # Records ADK's turn, model and tool spans; the A2A client continues them on the trends server
+    configure_telemetry(config.telemetry, service_name="baho-strategy-agent")
+    agent = LlmAgent(
+        model=model or create_gemini(config),
+        name="baho_strategy_agent",
+        description="Strategic advisor for BAHO COFFEE COMPANY, a Rwandan specialty coffee producer. "
+                    "Provides market insights, competitive positioning, and growth strategies based on "
+                    "global coffee trends and Rwandan coffee characteristics.",
+        instruction=BAHO_STRATEGY_INSTRUCTION,
+        sub_agents=[remote_agent or build_remote_coffee_trends_agent(config)],  # Use the remote agent via A2A!
+    )
+    
+    # Optionally answer near-duplicate first questions from the semantic cache. Answers
+    # build on the remote trends server's knowledge base, so they are keyed on the
+    # version that server reports and a reload there retires them.
+    semantic_cache = shared_semantic_cache()
+    if semantic_cache is not None:
+        from clients.remote_agent import RemoteKnowledgeVersion
+        
+        attach_response_cache(agent, semantic_cache, version=RemoteKnowledgeVersion(config))
+    
+    # Keep long conversations from re-sending an ever-growing history to the model
+    if config.context_budget_tokens > 0:
+        attach_context_budget(agent, config.context_budget_tokens)
+    
+    logger.info(
+        "BAHO Strategy Agent created (model=%s, semantic cache=%s, context budget=%s)",
+        model.model if model is not None else config.model,
+        "enabled" if semantic_cache is not None else "disabled",
+        f"~{config.context_budget_tokens} tokens" if config.context_budget_tokens > 0 else "off",
+    )
+    return agent
+
+
+# Shared default instances, built on first access to the module attributes below
+_defaults = {}
+_defaults_lock = threading.Lock()
+
+
+def get_remote_coffee_trends_agent() -> "RemoteA2aAgent":
+    """Return the shared Coffee Trends Agent proxy, building it on first use."""
+    with _defaults_lock:
+        if "remote_agent" not in _defaults:
+            _defaults["remote_agent"] = build_remote_coffee_trends_agent()
+        return _defaults["remote_agent"]
+
+
+def get_baho_strategy_agent() -> "LlmAgent":
+    """Return the shared BAHO Strategy Agent, building it on first use."""
+    remote_agent = get_remote_coffee_trends_agent()
+    with _defaults_lock:
+        if "agent" not in _defaults:
+            _defaults["agent"] = build_baho_strategy_agent(remote_agent=remote_agent)
+        return _defaults["agent"]
+
+
+_LAZY_ATTRIBUTES = {
+    "baho_strategy_agent": get_baho_strategy_agent,
+    "remote_coffee_trends_agent": get_remote_coffee_trends_agent,
+}
 
-print("\n✅ BAHO Strategy Agent created!")
-print("   Model: gemini-2.5-flash-lite")
-print("   Sub-agents: 1 (remote Coffee Trends Agent via A2A)")
-print("   Ready to provide strategic insights for BAHO COFFEE COMPANY!")
 
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,83 @@
+"""
+Agent Callbacks
+Helpers shared by the modules that extend an LlmAgent through its callbacks.
+
+The response caches, the context budget, the lookup router and single flight
+all add callbacks to an agent that may already have some, look at whether a
+question starts its session, and tell the user's own words apart from the
+transcript of another agent that ADK quotes into the conversation. These
+helpers do that in one place. ADK has no public name for the quoting markers,
+so they are read from its fencing module when it is there (ADK 2.x) and
+recognized by ADK's "For context:" preamble otherwise.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.adk.agents.callback_context import CallbackContext
+
+logger = logging.getLogger(__name__)
+
+# Start of ADK's preamble to another agent's transcript, in every ADK release
+RELAYED_CONTEXT_PREFIX = "For context:"
+
+_relay_markers: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+
+def append_callback(existing, callback: Callable):
+    """
+    Add a callback after any the agent already has.
+
+    Args:
+        existing: The agent's current callback(s): None, a callable or a list
+        callback: Callback to run after them
+
+    Returns:
+        Value to assign back to the agent's callback attribute
+    """
+    if existing is None:
+        return callback
+    if isinstance(existing, list):
+        return existing + [callback]
+    return [existing, callback]
+
+
+def is_first_turn(callback_context: "CallbackContext") -> bool:
+    """True if the session holds no events from earlier invocations."""
+    invocation_id = callback_context.invocation_id
+    return all(event.invocation_id == invocation_id for event in callback_context.session.events)
+
+
+def _markers() -> Tuple[Optional[str], Optional[str]]:
+    """ADK's relayed-context preamble and quote start marker, or (None, None) if this ADK has none."""
+    global _relay_markers
+    if _relay_markers is None:
+        try:
+            # Public names in a private module; the only place ADK defines them
+            from google.adk.flows.llm_flows.context._fencing import (
+                OTHER_AGENT_CONTEXT_PREAMBLE,
+                QUOTED_CONTENT_BEGIN,
+            )
+        except ImportError:
+            logger.debug("ADK has no context fencing module; matching relayed context by its preamble")
+            _relay_markers = (None, None)
+        else:
+            _relay_markers = (OTHER_AGENT_CONTEXT_PREAMBLE, QUOTED_CONTENT_BEGIN)
+    return _relay_markers
+
+
+def is_relayed_context(text: Optional[str]) -> bool:
+    """True for the message part ADK puts before its quote of another agent's turn."""
+    if not text:
+        return False
+    preamble, _ = _markers()
+    return text == preamble if preamble is not None else text.startswith(RELAYED_CONTEXT_PREFIX)
+
+
+def is_quoted_context(text: Optional[str]) -> bool:
+    """True for a message part carrying (part of) another agent's quoted turn."""
+    if not text:
+        return False
+    _, quote_begin = _markers()
+    return quote_begin is not None and quote_begin in text
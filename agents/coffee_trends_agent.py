@@ -2,36 +2,93 @@
 Coffee Trends Agent - Exposed via A2A
 This agent provides comprehensive information about global coffee trends,
 Rwandan coffee characteristics, and market insights.
+
+Importing this module only defines the agent's tools. The agent and its A2A
+application are built by build_coffee_trends_agent() and
+build_coffee_trends_a2a_app(), or on first access to the module attributes
+coffee_trends_agent and coffee_trends_a2a_app, which hold shared default
+instances.
 """
 
+import logging
 import os
 import sys
+import threading
+from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, Tuple
 
 # Add parent directory to path for imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from cache import (
+    LRUCache,
+    attach_response_cache,
+    register_cache,
+    response_cache_from_env,
+)
+from config import AgentConfig
 from knowledge import (
     get_coffee_trend,
     search_coffee_trends,
     get_rwanda_coffee_info,
-    get_trends_for_baho_strategy
-)
-from google.adk.agents import LlmAgent
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
-from google.adk.models.google_llm import Gemini
-from google.genai import types
-
-
-# Configure retry options
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
+    get_strategy_report,
+    filter_coffee_trends,
+    get_knowledge_snapshot,
+    get_knowledge_version,
 )
 
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.models.base_llm import BaseLlm
+    from starlette.applications import Starlette
+
+logger = logging.getLogger(__name__)
+
+# Rendered tool output keyed by (tool, arguments, knowledge version). Entries for
+# superseded knowledge versions are never hit again and age out of the LRU.
+RENDER_CACHE_SIZE = int(os.environ.get("COFFEE_TRENDS_RENDER_CACHE_SIZE", "512"))
+_RENDER_CACHE = LRUCache(maxsize=RENDER_CACHE_SIZE)
+register_cache("tool_render", _RENDER_CACHE)
+
+# A tool job is its render cache key (None: not cached) and a function rendering
+# the output; the synchronous tools run it in place, their async variants on the
+# tool pool
+ToolJob = Tuple[Optional[Hashable], Callable[[], str]]
+
+
+def _render_trend_info(trend_data: dict) -> str:
+    """Render a trend record (or lookup error) as tool output."""
+    if "error" in trend_data:
+        return f"❌ {trend_data['error']}\nAvailable trends: {', '.join(trend_data.get('available_trends', []))}"
+    
+    lines = [
+        f"📊 {trend_data['trend']}",
+        "",
+        f"Description: {trend_data['description']}",
+        "",
+        f"Impact Level: {trend_data['impact']}",
+        f"Opportunity: {trend_data['opportunity']}",
+        "",
+    ]
+    
+    if trend_data.get('data_points'):
+        lines.append("Key Data Points:")
+        lines.extend(f"  • {point}" for point in trend_data['data_points'])
+        lines.append("")
+    
+    lines.append(f"Relevance to BAHO: {trend_data.get('relevance_to_baho', 'N/A')}")
+    return "\n".join(lines) + "\n"
+
+
+def _trend_info_job(trend_key: str) -> ToolJob:
+    snapshot = get_knowledge_snapshot()
+    key = trend_key.lower()
+    # Keyed on the trend's own fingerprint so reloads that leave it unchanged keep it cached
+    cache_key = ("get_coffee_trend_info", key, snapshot.fingerprints.get(key, snapshot.version))
+    return cache_key, lambda: _render_trend_info(get_coffee_trend(trend_key, snapshot=snapshot))
+
 
 def get_coffee_trend_info(trend_key: str) -> str:
     """
@@ -43,96 +100,155 @@ def get_coffee_trend_info(trend_key: str) -> str:
     Returns:
         Formatted string with trend information
     """
-    trend_data = get_coffee_trend(trend_key)
-    
-    if "error" in trend_data:
-        return f"❌ {trend_data['error']}\nAvailable trends: {', '.join(trend_data.get('available_trends', []))}"
-    
-    result = f"📊 {trend_data['trend']}\n\n"
-    result += f"Description: {trend_data['description']}\n\n"
-    result += f"Impact Level: {trend_data['impact']}\n"
-    result += f"Opportunity: {trend_data['opportunity']}\n\n"
-    
-    if trend_data.get('data_points'):
-        result += "Key Data Points:\n"
-        for point in trend_data['data_points']:
-            result += f"  • {point}\n"
-        result += "\n"
-    
-    result += f"Relevance to BAHO: {trend_data.get('relevance_to_baho', 'N/A')}\n"
+    return _RENDER_CACHE.get_or_compute(*_trend_info_job(trend_key))
+
+
+def _render_search_results(query: str, matches: list) -> str:
+    """Render ranked search matches as tool output."""
+    if not matches:
+        return f"❌ No trends found matching '{query}'. Try searching for: sustainability, pricing, specialty, Rwanda, processing, etc."
     
-    return result
+    lines = [f"🔍 Top {len(matches)} trend(s) matching '{query}':", ""]
+    for i, match in enumerate(matches, 1):
+        lines.append(f"{i}. {match['trend']} (Key: {match['key']})")
+        lines.append(f"   Impact: {match['impact']}")
+        lines.append(f"   {match['description'][:150]}...")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _search_job(query: str, limit: int) -> ToolJob:
+    # Queries are too varied to be worth caching
+    return None, lambda: _render_search_results(query, search_coffee_trends(query, limit=limit))
 
 
-def search_trends(query: str) -> str:
+def search_trends(query: str, limit: int = 5) -> str:
     """
-    Search for coffee trends matching a query.
+    Search for coffee trends matching a query, best matches first.
     
     Args:
-        query: Search query (e.g., "sustainability", "pricing", "Rwanda", "specialty")
+        query: Search query (e.g., "sustainability", "pricing", "Rwanda", "specialty").
+               Use "AND" between words to require every term (e.g., "pricing AND Rwanda").
+        limit: Maximum number of trends to return (default 5)
     
     Returns:
         Formatted string with matching trends
     """
-    matches = search_coffee_trends(query)
+    _, render = _search_job(query, limit)
+    return render()
+
+
+def _render_filtered_trends(filters: dict, filtered: dict) -> str:
+    """Render filter_coffee_trends() output as tool output."""
+    if "error" in filtered:
+        available = next((value for key, value in filtered.items() if key.startswith("available_")), [])
+        return f"❌ {filtered['error']}\nAvailable values: {', '.join(available)}"
     
+    description = ", ".join(f"{name}={value}" for name, value in filters.items() if value) or "no filters"
+    matches = filtered["trends"]
     if not matches:
-        return f"❌ No trends found matching '{query}'. Try searching for: sustainability, pricing, specialty, Rwanda, processing, etc."
-    
-    result = f"🔍 Found {len(matches)} trend(s) matching '{query}':\n\n"
+        return f"❌ No trends match {description}."
     
+    lines = [f"🧭 {len(matches)} trend(s) matching {description}:", ""]
+    if filtered.get("region_profile"):
+        lines.extend([f"Region profile: {filtered['region_profile']}", ""])
     for i, match in enumerate(matches, 1):
-        result += f"{i}. {match['trend']} (Key: {match['key']})\n"
-        result += f"   Impact: {match['impact']}\n"
-        result += f"   {match['description'][:150]}...\n\n"
-    
-    return result
+        lines.append(f"{i}. {match['trend']} (Key: {match['key']})")
+        lines.append(f"   Impact: {match['impact']}")
+        lines.append(f"   Opportunity: {match['opportunity']}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
 
 
-def get_rwanda_info(category: str = None) -> str:
+def _filter_job(
+    impact: Optional[str], min_impact: Optional[str], category: Optional[str], region: Optional[str]
+) -> ToolJob:
+    snapshot = get_knowledge_snapshot()
+    filters = {"impact": impact, "min_impact": min_impact, "category": category, "region": region}
+    cache_key = ("filter_trends", impact, min_impact, category, region, snapshot.version)
+    return cache_key, lambda: _render_filtered_trends(filters, filter_coffee_trends(**filters, snapshot=snapshot))
+
+
+def filter_trends(impact: str = None, min_impact: str = None, category: str = None, region: str = None) -> str:
     """
-    Get information about Rwandan coffee characteristics.
+    Find coffee trends by impact level, category and/or region.
     
     Args:
-        category: Optional category (terroir, processing_methods, regions, quality_grades, market_positioning)
-                  If None, returns all information
+        impact: Exact impact level (low, low-medium, medium, medium-high, high, critical)
+        min_impact: Lowest impact level to include (e.g., "high" returns high and critical trends)
+        category: Trend category (market, rwanda, consumer, competitive, technology)
+        region: Coffee origin (africa, rwanda, ethiopia, kenya, burundi) or Rwandan region
+                (nyamasheke, huye, muhanga, karongi)
     
     Returns:
-        Formatted string with Rwandan coffee information
+        Formatted string with the matching trends
     """
-    rwanda_data = get_rwanda_coffee_info(category)
-    
+    return _RENDER_CACHE.get_or_compute(*_filter_job(impact, min_impact, category, region))
+
+
+def _title(key: str) -> str:
+    return key.replace('_', ' ').title()
+
+
+def _render_rwanda_info(category: Optional[str], rwanda_data: dict) -> str:
+    """Render Rwandan coffee data (one category or all of them) as tool output."""
     if "error" in rwanda_data:
         return f"❌ {rwanda_data['error']}\nAvailable categories: {', '.join(rwanda_data.get('available_categories', []))}"
     
     if category:
         # Single category
-        result = f"🇷🇼 Rwandan Coffee - {category.title()}:\n\n"
+        lines = [f"🇷🇼 Rwandan Coffee - {category.title()}:", ""]
         if isinstance(rwanda_data, dict):
             for key, value in rwanda_data.items():
                 if isinstance(value, list):
-                    result += f"{key.replace('_', ' ').title()}:\n"
-                    for item in value:
-                        result += f"  • {item}\n"
+                    lines.append(f"{_title(key)}:")
+                    lines.extend(f"  • {item}" for item in value)
                 else:
-                    result += f"{key.replace('_', ' ').title()}: {value}\n"
-        return result
+                    lines.append(f"{_title(key)}: {value}")
     else:
         # All categories
-        result = "🇷🇼 Comprehensive Rwandan Coffee Information:\n\n"
+        lines = ["🇷🇼 Comprehensive Rwandan Coffee Information:", ""]
         for cat, data in rwanda_data.items():
-            result += f"\n{cat.replace('_', ' ').title()}:\n"
+            lines.append("")
+            lines.append(f"{_title(cat)}:")
             if isinstance(data, dict):
                 for key, value in data.items():
                     if isinstance(value, list):
-                        result += f"  {key.replace('_', ' ').title()}:\n"
-                        for item in value:
-                            result += f"    • {item}\n"
+                        lines.append(f"  {_title(key)}:")
+                        lines.extend(f"    • {item}" for item in value)
                     else:
-                        result += f"  {key.replace('_', ' ').title()}: {value}\n"
+                        lines.append(f"  {_title(key)}: {value}")
             else:
-                result += f"  {data}\n"
-        return result
+                lines.append(f"  {data}")
+    return "\n".join(lines) + "\n"
+
+
+def _rwanda_info_job(category: Optional[str]) -> ToolJob:
+    snapshot = get_knowledge_snapshot()
+    cache_key = ("get_rwanda_info", category, snapshot.rwanda_fingerprint)
+    return cache_key, lambda: _render_rwanda_info(category, get_rwanda_coffee_info(category, snapshot=snapshot))
+
+
+def get_rwanda_info(category: str = None) -> str:
+    """
+    Get information about Rwandan coffee characteristics.
+    
+    Args:
+        category: Optional category (terroir, processing_methods, regions, quality_grades, market_positioning)
+                  If None, returns all information
+    
+    Returns:
+        Formatted string with Rwandan coffee information
+    """
+    return _RENDER_CACHE.get_or_compute(*_rwanda_info_job(category))
+
+
+def _baho_strategy_job() -> ToolJob:
+    snapshot = get_knowledge_snapshot()
+    # The report is dated, so the day is part of the key alongside the knowledge version
+    cache_key = ("get_baho_strategy_insights", snapshot.version, datetime.now().strftime("%Y-%m-%d"))
+    # The report is precomputed once per version and day (knowledge/strategy_report.py)
+    return cache_key, lambda: get_strategy_report(snapshot=snapshot).text
 
 
 def get_baho_strategy_insights() -> str:
@@ -142,47 +258,192 @@ def get_baho_strategy_insights() -> str:
     Returns:
         Formatted string with strategic analysis
     """
-    strategy = get_trends_for_baho_strategy()
-    
-    result = f"🎯 {strategy['summary']}\n"
-    result += f"Date: {strategy['date']}\n\n"
-    
-    result += "📈 HIGH IMPACT TRENDS:\n"
-    for i, trend in enumerate(strategy['high_impact_trends'], 1):
-        result += f"\n{i}. {trend['trend']}\n"
-        result += f"   Impact: {trend['impact']}\n"
-        result += f"   {trend['description'][:200]}...\n"
-    
-    result += "\n\n💡 KEY OPPORTUNITIES:\n"
-    for i, opp in enumerate(strategy['key_opportunities'], 1):
-        result += f"{i}. {opp}\n"
-    
-    result += "\n\n🎯 STRATEGIC RECOMMENDATIONS:\n"
-    for i, rec in enumerate(strategy['strategic_recommendations'], 1):
-        result += f"{i}. {rec}\n"
-    
-    result += "\n\n📊 MARKET POSITIONING:\n"
-    mp = strategy['market_positioning']
-    result += "\nStrengths:\n"
-    for strength in mp['strengths']:
-        result += f"  • {strength}\n"
-    result += "\nChallenges:\n"
-    for challenge in mp['challenges']:
-        result += f"  • {challenge}\n"
-    result += "\nOpportunities:\n"
-    for opp in mp['opportunities']:
-        result += f"  • {opp}\n"
-    
-    return result
-
-
-# Create the Coffee Trends Agent
-coffee_trends_agent = LlmAgent(
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    name="coffee_trends_agent",
-    description="Global coffee trends and market intelligence agent specializing in specialty coffee, "
-                "Rwandan coffee characteristics, and strategic insights for coffee producers.",
-    instruction="""
+    return _RENDER_CACHE.get_or_compute(*_baho_strategy_job())
+
+
+def _price(value: Optional[float], suffix: str = "") -> str:
+    return "n/a" if value is None else f"{value:,.2f}{suffix}"
+
+
+def _render_price_summary(summary: dict) -> str:
+    """Render a price summary (or lookup error) as tool output."""
+    if "error" in summary:
+        return _render_price_error(summary)
+    lines = [
+        f"💰 {_title(summary['origin'])} {summary['market']} coffee prices "
+        f"({summary['currency']}, last {summary['period_days']} days)",
+    ]
+    for grade, stats in summary["grades"].items():
+        lines.extend([
+            "",
+            f"{_title(grade)}: {_price(stats['latest_price'])} on {stats['latest_date']}",
+            f"  Period ({stats['period_start']} to {stats['latest_date']}, {stats['observations']} prices): "
+            f"average {_price(stats['average_price'])}, range {_price(stats['low'])}-{_price(stats['high'])}, "
+            f"change {stats['change_pct']:+.1f}%",
+            f"  Moving averages: 30-day {_price(stats['moving_average_30d'])}, "
+            f"90-day {_price(stats['moving_average_90d'])}",
+            f"  Annualized volatility: {_price(stats['annualized_volatility_pct'], '%')}",
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def _render_price_premiums(premiums: dict) -> str:
+    """Render grade premiums over commodity coffee (or a lookup error) as tool output."""
+    if "error" in premiums:
+        return _render_price_error(premiums)
+    lines = [
+        f"📈 {_title(premiums['origin'])} {premiums['market']} coffee premiums over {premiums['benchmark']} "
+        f"({premiums['currency']}, last {premiums['period_days']} days)",
+    ]
+    for grade, stats in premiums["premiums"].items():
+        lines.extend([
+            "",
+            f"{_title(grade)}: {stats['latest_premium']:+,.2f} ({stats['latest_premium_pct']:+.1f}%) "
+            f"on {stats['latest_date']}",
+            f"  Average: {stats['average_premium']:+,.2f} ({stats['average_premium_pct']:+.1f}%), "
+            f"range {_price(stats['min_premium'])} to {_price(stats['max_premium'])} "
+            f"over {stats['observations']} prices",
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def _render_price_error(result: dict) -> str:
+    lines = [f"❌ {result['error']}"]
+    if result.get("available_origins"):
+        lines.append(f"Available origins: {', '.join(result['available_origins'])}")
+    if result.get("available_grades"):
+        lines.append(f"Available grades: {', '.join(result['available_grades'])}")
+    return "\n".join(lines)
+
+
+def _price_summary_job(origin: str, grade: Optional[str], market: str, days: int) -> ToolJob:
+    from knowledge.prices import get_coffee_prices
+    
+    snapshot = get_knowledge_snapshot()
+    cache_key = ("get_price_summary", origin.lower(), grade and grade.lower(), market.lower(), days, snapshot.version)
+    return cache_key, lambda: _render_price_summary(get_coffee_prices(origin, grade, market, days, snapshot=snapshot))
+
+
+def get_price_summary(origin: str, grade: str = None, market: str = "green", days: int = 365) -> str:
+    """
+    Get recent coffee prices for an origin with moving averages and volatility.
+    
+    Args:
+        origin: Producing origin (e.g., "rwanda", "ethiopia", "kenya")
+        grade: Optional quality grade (specialty, premium, standard, commodity). If None, covers every grade
+        market: "green" (exporter/importer prices) or "retail"
+        days: Number of days to summarize, ending at the latest price (default 365)
+    
+    Returns:
+        Formatted string with price statistics per grade
+    """
+    return _RENDER_CACHE.get_or_compute(*_price_summary_job(origin, grade, market, days))
+
+
+def _grade_premiums_job(origin: str, market: str, days: int) -> ToolJob:
+    from knowledge.prices import get_coffee_price_premiums
+    
+    snapshot = get_knowledge_snapshot()
+    cache_key = ("get_grade_premiums", origin.lower(), market.lower(), days, snapshot.version)
+    return cache_key, lambda: _render_price_premiums(get_coffee_price_premiums(origin, market, days, snapshot=snapshot))
+
+
+def get_grade_premiums(origin: str = "rwanda", market: str = "green", days: int = 365) -> str:
+    """
+    Get how far each quality grade of an origin is priced above commodity coffee.
+    
+    Args:
+        origin: Producing origin (default "rwanda")
+        market: "green" (exporter/importer prices) or "retail"
+        days: Number of days to compare, ending at the latest price (default 365)
+    
+    Returns:
+        Formatted string with the latest and average premium per grade
+    """
+    return _RENDER_CACHE.get_or_compute(*_grade_premiums_job(origin, market, days))
+
+
+# Async variants of the knowledge tools. Registered on the agent in place of the
+# synchronous tools while the tool pool is enabled (COFFEE_TRENDS_TOOL_WORKERS),
+# so lookups, searches, filters, price statistics and report renders never run
+# on the event loop serving other A2A requests; render-cache hits are still
+# answered in place.
+
+TOOL_POOL_BUSY_MESSAGE = "⏳ The coffee knowledge base is busy right now. Please try again in a moment."
+
+
+async def _run_tool_job(name: str, job: ToolJob) -> str:
+    """Answer a tool job from the render cache, or render it on the tool pool."""
+    from agents.tool_pool import ToolPoolBusy, get_tool_pool
+    
+    cache_key, render = job
+    if cache_key is not None:
+        cached = _RENDER_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    pool = get_tool_pool()
+    if pool is None:
+        output = render()
+    else:
+        try:
+            output = await pool.run(render, name=name)
+        except ToolPoolBusy:
+            return TOOL_POOL_BUSY_MESSAGE
+    if cache_key is not None:
+        _RENDER_CACHE.put(cache_key, output)
+    return output
+
+
+def _async_variant(tool: Callable) -> Callable:
+    """Register an async function under the name and description of the synchronous tool it replaces."""
+    def decorate(function: Callable) -> Callable:
+        # Not functools.wraps: ADK follows __wrapped__ and would declare the sync function
+        function.__name__ = function.__qualname__ = tool.__name__
+        function.__doc__ = tool.__doc__
+        return function
+    
+    return decorate
+
+
+@_async_variant(get_coffee_trend_info)
+async def get_coffee_trend_info_async(trend_key: str) -> str:
+    return await _run_tool_job("get_coffee_trend_info", _trend_info_job(trend_key))
+
+
+@_async_variant(search_trends)
+async def search_trends_async(query: str, limit: int = 5) -> str:
+    return await _run_tool_job("search_trends", _search_job(query, limit))
+
+
+@_async_variant(get_rwanda_info)
+async def get_rwanda_info_async(category: str = None) -> str:
+    return await _run_tool_job("get_rwanda_info", _rwanda_info_job(category))
+
+
+@_async_variant(get_baho_strategy_insights)
+async def get_baho_strategy_insights_async() -> str:
+    return await _run_tool_job("get_baho_strategy_insights", _baho_strategy_job())
+
+
+@_async_variant(filter_trends)
+async def filter_trends_async(
+    impact: str = None, min_impact: str = None, category: str = None, region: str = None
+) -> str:
+    return await _run_tool_job("filter_trends", _filter_job(impact, min_impact, category, region))
+
+
+@_async_variant(get_price_summary)
+async def get_price_summary_async(origin: str, grade: str = None, market: str = "green", days: int = 365) -> str:
+    return await _run_tool_job("get_price_summary", _price_summary_job(origin, grade, market, days))
+
+
+@_async_variant(get_grade_premiums)
+async def get_grade_premiums_async(origin: str = "rwanda", market: str = "green", days: int = 365) -> str:
+    return await _run_tool_job("get_grade_premiums", _grade_premiums_job(origin, market, days))
+
+
+COFFEE_TRENDS_INSTRUCTION = """
     You are a coffee industry expert specializing in global coffee trends, market intelligence, 
     and strategic insights for specialty coffee producers, particularly Rwandan coffee.
     
@@ -195,8 +456,11 @@ coffee_trends_agent = LlmAgent(
     When asked about coffee trends:
     1. Use get_coffee_trend_info() for specific trends
     2. Use search_trends() to find trends by topic
-    3. Use get_rwanda_info() for Rwandan coffee specifics
-    4. Use get_baho_strategy_insights() for comprehensive strategic analysis
+    3. Use filter_trends() to list trends by impact level, category or region
+    4. Use get_rwanda_info() for Rwandan coffee specifics
+    5. Use get_baho_strategy_insights() for comprehensive strategic analysis
+    6. Use get_price_summary() for green or retail price levels, moving averages and volatility by origin and grade
+    7. Use get_grade_premiums() for the premium each grade earns over commodity coffee
     
     Always provide:
     - Clear, actionable insights
@@ -205,27 +469,227 @@ coffee_trends_agent = LlmAgent(
     - Strategic implications
     
     Be professional, knowledgeable, and helpful. Focus on actionable intelligence.
-    """,
-    tools=[
-        get_coffee_trend_info,
-        search_trends,
-        get_rwanda_info,
-        get_baho_strategy_insights
-    ],
-)
+    """
 
-print("✅ Coffee Trends Agent created successfully!")
-print("   Model: gemini-2.5-flash-lite")
-print("   Tools: get_coffee_trend_info, search_trends, get_rwanda_info, get_baho_strategy_insights")
-print("   Ready to be exposed via A2A...")
+COFFEE_TRENDS_TOOLS = [
+    get_coffee_trend_info,
+    search_trends,
+    filter_trends,
+    get_rwanda_info,
+    get_baho_strategy_insights,
+    get_price_summary,
+    get_grade_premiums,
+]
 
-# Convert to A2A-compatible application
-coffee_trends_a2a_app = to_a2a(
-    coffee_trends_agent,
-    port=8001  # Port where this agent will be served
-)
+# The same tools, with the async variants in place of their synchronous versions
+COFFEE_TRENDS_ASYNC_TOOLS = [
+    get_coffee_trend_info_async,
+    search_trends_async,
+    filter_trends_async,
+    get_rwanda_info_async,
+    get_baho_strategy_insights_async,
+    get_price_summary_async,
+    get_grade_premiums_async,
+]
+
+
+def build_coffee_trends_agent(
+    config: Optional[AgentConfig] = None,
+    model: Optional["BaseLlm"] = None,
+) -> "LlmAgent":
+    """
+    Create the Coffee Trends Agent.
+    
+    Args:
+        config: Model and retry settings (default: AgentConfig.from_env())
+        model: Model instance to use instead of Gemini (e.g., a stub for benchmarks)
+    
+    Returns:
+        A new LlmAgent with the response caches configured by the environment attached
+    """
+    from google.adk.agents import LlmAgent
+    
+    from agents.context_budget import attach_context_budget
+    from agents.lookup_router import attach_lookup_router
+    from agents.single_flight import SingleFlight, attach_single_flight
+    from agents.tool_pool import configure_tool_pool
+    from cache.semantic_cache import shared_semantic_cache
+    from clients.model_scheduler import create_gemini
+    from telemetry import configure_telemetry
+    
+    config = config or AgentConfig.from_env()
+    # Records ADK's turn, model and tool spans (and the metrics derived from them)
+    configure_telemetry(config.telemetry, service_name="coffee-trends-agent")
+    tool_pool = configure_tool_pool(config)
+    agent = LlmAgent(
+        model=model or create_gemini(config),
+        name="coffee_trends_agent",
+        description="Global coffee trends and market intelligence agent specializing in specialty coffee, "
+                    "Rwandan coffee characteristics, and strategic insights for coffee producers.",
+        instruction=COFFEE_TRENDS_INSTRUCTION,
+        tools=list(COFFEE_TRENDS_ASYNC_TOOLS if tool_pool is not None else COFFEE_TRENDS_TOOLS),
+    )
+    
+    # Plain lookups ("What are Rwanda's quality grades?") are answered by their tool
+    # alone; attached first so they are never looked up in or stored to a cache
+    if config.fast_path:
+        attach_lookup_router(agent)
+    
+    # Answer repeated questions from cache; keys include the knowledge version.
+    # The exact-match cache is consulted first, then the optional semantic cache.
+    response_cache = response_cache_from_env()
+    if response_cache is not None:
+        register_cache("response", response_cache)
+        attach_response_cache(agent, response_cache, version=get_knowledge_version)
+    
+    semantic_cache = shared_semantic_cache()
+    if semantic_cache is not None:
+        attach_response_cache(agent, semantic_cache, version=get_knowledge_version)
+    
+    # Questions still unanswered by the caches share the run of an identical
+    # question already in progress instead of calling the model again
+    if config.single_flight:
+        flights = SingleFlight()
+        register_cache("single_flight", flights)
+        attach_single_flight(agent, flights, version=get_knowledge_version)
+    
+    # An A2A conversation continues the same session on this server, so repeated
+    # tool reports would otherwise pile up in every later prompt
+    if config.context_budget_tokens > 0:
+        attach_context_budget(agent, config.context_budget_tokens)
+    
+    logger.info(
+        "Coffee Trends Agent created (model=%s, tool pool=%s, fast path=%s, response cache=%s, semantic cache=%s, "
+        "single flight=%s, context budget=%s)",
+        model.model if model is not None else config.model,
+        f"{tool_pool.workers} workers" if tool_pool is not None else "off",
+        "enabled" if config.fast_path else "disabled",
+        type(response_cache).__name__ if response_cache is not None else "disabled",
+        "enabled" if semantic_cache is not None else "disabled",
+        "enabled" if config.single_flight else "disabled",
+        f"~{config.context_budget_tokens} tokens" if config.context_budget_tokens > 0 else "off",
+    )
+    return agent
+
+
+# A2A JSON-RPC methods whose client waits for the complete task (1.x and 0.3 names)
+_NON_STREAMING_METHODS = ("SendMessage", "message/send")
+
+
+def _streaming_run_request(request, part_converter):
+    """
+    Convert an A2A request to an ADK run request, streaming model output (SSE)
+    unless the client asked for the complete task only.
+    """
+    from google.adk.a2a.converters.request_converter import convert_a2a_request_to_agent_run_request
+    from google.adk.agents.run_config import StreamingMode
+    
+    run_request = convert_a2a_request_to_agent_run_request(request, part_converter)
+    call_context = request.call_context
+    method = call_context.state.get("method") if call_context is not None else None
+    if method not in _NON_STREAMING_METHODS:
+        run_request.run_config.streaming_mode = StreamingMode.SSE
+    return run_request
+
+
+def _streaming_executor(runner):
+    """A2A executor whose runs stream partial model responses as artifact chunks."""
+    from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+    from google.adk.a2a.executor.config import A2aAgentExecutorConfig
+    
+    # The current executor sends partial responses as artifact chunks, which
+    # RemoteA2aAgent turns back into partial events; the legacy one sends them
+    # as "working" status messages that clients show as thoughts
+    return A2aAgentExecutor(
+        runner=runner,
+        config=A2aAgentExecutorConfig(request_converter=_streaming_run_request),
+        force_new_version=True,
+    )
+
+
+def build_coffee_trends_a2a_app(
+    config: Optional[AgentConfig] = None,
+    agent: Optional["LlmAgent"] = None,
+) -> "Starlette":
+    """
+    Create the A2A application serving the Coffee Trends Agent.
+    
+    With config.streaming (the default), the model's output is sent to
+    streaming (SendStreamingMessage) clients chunk by chunk as it is generated;
+    SendMessage clients receive the complete task, without the cost of
+    streaming the model.
+    
+    Args:
+        config: Host, port, model and streaming settings (default: AgentConfig.from_env())
+        agent: Agent to serve (default: a new agent from build_coffee_trends_agent(config))
+    
+    Returns:
+        Starlette application; its agent card is at /.well-known/agent-card.json
+    """
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from google.adk.artifacts import InMemoryArtifactService
+    from google.adk.auth.credential_service.in_memory_credential_service import InMemoryCredentialService
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.runners import Runner
+    from sessions import session_service_from_env
+    
+    config = config or AgentConfig.from_env()
+    agent = agent or build_coffee_trends_agent(config)
+    # Conversations with A2A clients are kept in the bounded session store
+    # (COFFEE_SESSION_*) rather than ADK's unbounded in-memory default
+    runner = Runner(
+        app_name=agent.name,
+        agent=agent,
+        session_service=session_service_from_env(),
+        artifact_service=InMemoryArtifactService(),
+        memory_service=InMemoryMemoryService(),
+        credential_service=InMemoryCredentialService(),
+    )
+    app = to_a2a(
+        agent,
+        host=config.trends_host,
+        port=config.trends_port,  # Port where this agent will be served
+        runner=runner,
+        agent_executor_factory=_streaming_executor if config.streaming else None,
+    )
+    if config.telemetry != "off":
+        from telemetry import TraceContextMiddleware
+        
+        # Continues the caller's trace (traceparent header) for the whole request
+        app.add_middleware(TraceContextMiddleware)
+    logger.info("Coffee Trends Agent A2A app created for %s", config.coffee_trends_url)
+    return app
+
+
+# Shared default instances, built on first access to the module attributes below
+_defaults = {}
+_defaults_lock = threading.Lock()
+
+
+def get_coffee_trends_agent() -> "LlmAgent":
+    """Return the shared Coffee Trends Agent, building it on first use."""
+    with _defaults_lock:
+        if "agent" not in _defaults:
+            _defaults["agent"] = build_coffee_trends_agent()
+        return _defaults["agent"]
+
+
+def get_coffee_trends_a2a_app() -> "Starlette":
+    """Return the shared A2A application for the shared Coffee Trends Agent."""
+    agent = get_coffee_trends_agent()
+    with _defaults_lock:
+        if "app" not in _defaults:
+            _defaults["app"] = build_coffee_trends_a2a_app(agent=agent)
+        return _defaults["app"]
+
+
+_LAZY_ATTRIBUTES = {
+    "coffee_trends_agent": get_coffee_trends_agent,
+    "coffee_trends_a2a_app": get_coffee_trends_a2a_app,
+}
 
-print("\n✅ Coffee Trends Agent is now A2A-compatible!")
-print("   Agent will be served at: http://localhost:8001")
-print("   Agent card will be at: http://localhost:8001/.well-known/agent-card.json")
 
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,250 @@
+"""
+Context Budget
+Keeps the conversation history an LlmAgent sends to its model within a token budget.
+
+Every model call re-sends the whole session, so without a limit the prompt of
+a long conversation (and the time the model takes to read it) grows with
+every turn. attach_context_budget() adds a before_model_callback that
+rewrites the request's history before it is sent:
+
+    1. Repeated tool outputs (e.g. the full get_baho_strategy_insights report
+       fetched again in a later turn) and repeated long messages are kept
+       only at their latest occurrence; earlier copies become a short note.
+    2. While the history is still over budget, the oldest whole turns are
+       dropped and replaced by a one-line summary listing the questions
+       they asked. The current turn is always sent in full.
+
+Only the request is rewritten; the session keeps the full conversation.
+Sizes are estimated from character counts (about four characters per
+token), so the budget is approximate and covers the history only, not the
+system instruction or tool declarations.
+"""
+
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from agents.callbacks import append_callback, is_relayed_context
+
+if TYPE_CHECKING:
+    # ADK and google.genai are only needed once a budget is attached to an agent
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models.llm_request import LlmRequest
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+DUPLICATE_MIN_CHARS = 400  # shorter repeated messages are cheap enough to keep
+SUMMARY_QUESTION_CHARS = 120
+SUMMARY_MAX_QUESTIONS = 10
+
+
+def _part_chars(part: "types.Part") -> int:
+    if part.text is not None:
+        return len(part.text)
+    return len(part.model_dump_json(exclude_none=True))
+
+
+def estimate_tokens(contents: List["types.Content"]) -> int:
+    """
+    Estimate the number of tokens in a list of messages.
+
+    Args:
+        contents: Messages (google.genai Content)
+
+    Returns:
+        Approximate token count
+    """
+    chars = sum(_part_chars(part) for content in contents for part in content.parts or ())
+    return chars // CHARS_PER_TOKEN
+
+
+def _is_relayed_context(content: "types.Content") -> bool:
+    """True for the user-role message ADK uses to quote another agent's reply."""
+    parts = content.parts or ()
+    return bool(parts) and is_relayed_context(parts[0].text)
+
+
+def _is_user_turn(content: "types.Content") -> bool:
+    """True for a message typed by the user, which starts a new turn."""
+    if content.role != "user" or not content.parts:
+        return False
+    if any(part.function_response for part in content.parts):
+        return False
+    return any(part.text for part in content.parts) and not _is_relayed_context(content)
+
+
+def _split_turns(contents: List["types.Content"]) -> List[List["types.Content"]]:
+    """Group messages into turns, each starting at a user message."""
+    turns: List[List["types.Content"]] = []
+    for content in contents:
+        if not turns or _is_user_turn(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _deduplicate(contents: List["types.Content"]) -> int:
+    """
+    Replace earlier copies of repeated tool outputs and long messages with a note.
+
+    Contents are rebuilt rather than modified, because their parts belong to
+    the session's events.
+
+    Returns:
+        Number of parts replaced
+    """
+    from google.genai import types
+
+    seen = set()
+    replaced = 0
+    # Walk newest first so the copy the model sees is the most recent one
+    for index in range(len(contents) - 1, -1, -1):
+        content = contents[index]
+        new_parts = []
+        changed = False
+        for part in content.parts or ():
+            if part.function_response is not None:
+                response = part.function_response
+                key = ("tool", response.name, json.dumps(response.response, sort_keys=True, default=str))
+                if key in seen and len(key[2]) >= DUPLICATE_MIN_CHARS:
+                    note = f"[Same output as the later {response.name} call]"
+                    part = types.Part(
+                        function_response=types.FunctionResponse(
+                            id=response.id, name=response.name, response={"result": note}
+                        )
+                    )
+                    changed = True
+                    replaced += 1
+                seen.add(key)
+            elif part.text and len(part.text) >= DUPLICATE_MIN_CHARS and not part.thought:
+                key = ("text", part.text)
+                if key in seen:
+                    part = types.Part(text="[Repeated later in the conversation]")
+                    changed = True
+                    replaced += 1
+                seen.add(key)
+            new_parts.append(part)
+        if changed:
+            contents[index] = types.Content(role=content.role, parts=new_parts)
+    return replaced
+
+
+def _summarize(turns: List[List["types.Content"]]) -> str:
+    """One-line extractive summary of dropped turns: how many, and what was asked."""
+    questions = []
+    for turn in turns:
+        first = turn[0]
+        if _is_user_turn(first):
+            text = " ".join("".join(part.text or "" for part in first.parts).split())
+            if len(text) > SUMMARY_QUESTION_CHARS:
+                text = text[: SUMMARY_QUESTION_CHARS - 1] + "…"
+            questions.append(f'"{text}"')
+    summary = f"[Earlier conversation: {len(turns)} turn(s) omitted to save space."
+    if questions:
+        shown = questions[-SUMMARY_MAX_QUESTIONS:]
+        more = len(questions) - len(shown)
+        summary += " The user asked: " + "; ".join(shown)
+        if more:
+            summary += f" (and {more} earlier question(s))"
+        summary += "."
+    return summary + "]"
+
+
+class ContextBudget:
+    """Token budget for the history of an agent's model requests, with counters."""
+
+    def __init__(self, max_tokens: int):
+        """
+        Args:
+            max_tokens: Approximate tokens of history to send per model call
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.trimmed_requests = 0
+        self.turns_dropped = 0
+        self.duplicates_removed = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def apply(self, contents: List["types.Content"]) -> List["types.Content"]:
+        """
+        Fit a request's history into the budget.
+
+        Args:
+            contents: Messages of the request, oldest first
+
+        Returns:
+            New list of messages; the input list and its messages are not modified
+        """
+        from google.genai import types
+
+        before = estimate_tokens(contents)
+        contents = list(contents)
+        duplicates = _deduplicate(contents) if before > self.max_tokens else 0
+
+        turns = _split_turns(contents)
+        dropped: List[List["types.Content"]] = []
+        size = estimate_tokens(contents)
+        while len(turns) > 1 and size > self.max_tokens:
+            turn = turns.pop(0)
+            dropped.append(turn)
+            size -= estimate_tokens(turn)
+
+        if dropped:
+            # Every turn after the first opens with a user message; the summary leads it
+            first = turns[0][0]
+            summary = types.Part(text=_summarize(dropped))
+            turns[0][0] = types.Content(role=first.role, parts=[summary] + list(first.parts or ()))
+        contents = [content for turn in turns for content in turn]
+
+        after = estimate_tokens(contents)
+        with self._lock:
+            self.requests += 1
+            if duplicates or dropped:
+                self.trimmed_requests += 1
+                self.turns_dropped += len(dropped)
+                self.duplicates_removed += duplicates
+                self.tokens_saved += max(0, before - after)
+        if duplicates or dropped:
+            logger.debug(
+                "Context trimmed from ~%d to ~%d tokens (%d duplicate(s), %d turn(s) dropped)",
+                before, after, duplicates, len(dropped),
+            )
+        return contents
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_tokens": self.max_tokens,
+            "requests": self.requests,
+            "trimmed_requests": self.trimmed_requests,
+            "turns_dropped": self.turns_dropped,
+            "duplicates_removed": self.duplicates_removed,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+def attach_context_budget(agent: "LlmAgent", max_tokens: int) -> ContextBudget:
+    """
+    Keep the history an agent sends to its model within a token budget.
+
+    Args:
+        agent: Agent whose model requests to trim
+        max_tokens: Approximate tokens of history to send per model call
+
+    Returns:
+        The ContextBudget, whose stats() report how much was trimmed
+    """
+    budget = ContextBudget(max_tokens)
+
+    def fit_context(callback_context: "CallbackContext", llm_request: "LlmRequest") -> Optional[object]:
+        llm_request.contents = budget.apply(llm_request.contents)
+        return None
+
+    agent.before_model_callback = append_callback(agent.before_model_callback, fit_context)
+    return budget
@@ -0,0 +1,242 @@
+"""
+Lookup Router
+Answers plain lookup questions to the Coffee Trends Agent straight from its tools.
+
+Questions such as "What are Rwanda's quality grades?" or "Tell me about
+subscription_models" name exactly one trend or Rwandan coffee category, and the
+model would only call get_coffee_trend_info or get_rwanda_info and pass the
+output on. attach_lookup_router() adds a before_agent_callback that
+recognizes these questions and returns the tool's output without calling the
+model at all.
+
+A question is routed only when, after an optional lookup phrase ("what
+are", "tell me about", "describe", ...) and filler words ("the", "coffee",
+"in", ...) are removed, nothing is left but a trend key or title, a Rwanda
+category, or "Rwanda" itself. Anything else ("why are subscription models
+growing?", "how should BAHO price its specialty grade?") goes to the model as
+before. The names are read from the current knowledge snapshot, so trends
+added by a reload are routed too. Reading them decodes every trend, so after
+a reload the callback rebuilds the routes on the tool pool, off the event
+loop; questions arriving meanwhile go to the model.
+"""
+
+import asyncio
+import inspect
+import logging
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from agents.callbacks import append_callback, is_quoted_context, is_relayed_context
+from agents.tool_pool import ToolPoolBusy, get_tool_pool
+from cache.response_cache import normalize_query
+from knowledge import KnowledgeSnapshot, get_knowledge_snapshot
+
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Questions longer than this are never plain lookups
+MAX_QUESTION_CHARS = 120
+
+_LOOKUP_PHRASE_RE = re.compile(
+    r"^(?:(?:please|can you|could you)\s+)?"
+    r"(?:what\s+(?:is|are|s)|whats|tell\s+me(?:\s+more)?\s+about|what\s+do\s+you\s+know\s+about"
+    r"|show(?:\s+me)?|describe|give\s+me|get|list"
+    r"|(?:info|information|details|overview)\s+(?:on|about|of|for))\s+"
+)
+_FILLER_WORDS = frozenset(
+    "the a an of in on about for and s coffee coffees trend trends info information details please me".split()
+)
+# Ways of naming Rwanda, all matched as "rwanda"
+_RWANDA_WORDS = frozenset(("rwanda", "rwandas", "rwandan"))
+
+Route = Tuple[str, Dict[str, Optional[str]]]
+
+
+def _terms(text: str) -> Tuple[str, ...]:
+    """Order-independent significant words of a name or question remainder."""
+    words = normalize_query(text.replace("_", " ")).split()
+    words = ["rwanda" if word in _RWANDA_WORDS else word for word in words]
+    return tuple(sorted(word for word in words if word not in _FILLER_WORDS))
+
+
+def _build_routes(snapshot: KnowledgeSnapshot) -> Dict[Tuple[str, ...], Route]:
+    """Map the terms of every trend and Rwanda category name to the tool call that looks it up."""
+    routes: Dict[Tuple[str, ...], Route] = {}
+    for key, record in snapshot.store.iter_trends():
+        route = ("get_coffee_trend_info", {"trend_key": key})
+        routes.setdefault(_terms(key), route)
+        routes.setdefault(_terms(record.get("trend", "")), route)
+    for category in snapshot.store.rwanda_categories():
+        route = ("get_rwanda_info", {"category": category})
+        # "processing methods" is also a trend; with "Rwanda" it means the category
+        routes.setdefault(_terms(category), route)
+        routes[_terms(f"rwanda {category}")] = route
+    routes[("rwanda",)] = ("get_rwanda_info", {"category": None})
+    routes.pop((), None)
+    return routes
+
+
+def _question_text(content: Optional["types.Content"]) -> str:
+    """
+    The user's own words in a message, without quoted context from other agents.
+
+    A question forwarded over A2A by the BAHO agent carries, after the
+    question itself, ADK's transcript of what that agent did (e.g. its
+    transfer_to_agent call), fenced in quote markers.
+    """
+    if not content or not content.parts:
+        return ""
+    return "".join(
+        part.text
+        for part in content.parts
+        if part.text and not is_relayed_context(part.text) and not is_quoted_context(part.text)
+    )
+
+
+class LookupRouter:
+    """Matches lookup questions to a tool call, with hit counters."""
+
+    def __init__(self, snapshot: Callable[[], KnowledgeSnapshot] = get_knowledge_snapshot):
+        """
+        Args:
+            snapshot: Returns the knowledge snapshot whose names are routed
+        """
+        self._snapshot = snapshot
+        self._routes: Dict[Tuple[str, ...], Route] = {}
+        self._version: Optional[str] = None
+        # Version whose routes are being built off the loop, if any
+        self._building: Optional[str] = None
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.passed = 0
+        self.busy = 0
+
+    def _current_routes(self) -> Dict[Tuple[str, ...], Route]:
+        snapshot = self._snapshot()
+        if snapshot.version != self._version:
+            with self._lock:
+                if snapshot.version != self._version:
+                    self._routes = _build_routes(snapshot)
+                    self._version = snapshot.version
+        return self._routes
+
+    def _match(self, question: str, routes: Optional[Dict[Tuple[str, ...], Route]]) -> Optional[Route]:
+        route = None
+        if routes is not None and question and len(question) <= MAX_QUESTION_CHARS:
+            remainder = _LOOKUP_PHRASE_RE.sub("", normalize_query(question), count=1)
+            route = routes.get(_terms(remainder))
+        with self._lock:
+            if route is None:
+                self.passed += 1
+            else:
+                self.routed += 1
+        return route
+
+    def route(self, question: str) -> Optional[Route]:
+        """
+        Find the tool call that fully answers a lookup question.
+
+        Args:
+            question: User question
+
+        Returns:
+            Tuple of (tool name, arguments), or None if the question needs the model
+        """
+        return self._match(question, self._current_routes())
+
+    async def aroute(self, question: str) -> Optional[Route]:
+        """
+        route() for callers on the event loop.
+
+        Routes for a new snapshot are built on the tool pool (or the loop's
+        default executor without one); while that runs, questions are not routed.
+
+        Raises:
+            ToolPoolBusy: If the routes are out of date and the tool pool is full
+        """
+        if not question or len(question) > MAX_QUESTION_CHARS:
+            return self._match(question, None)
+        return self._match(question, await self._refreshed_routes())
+
+    async def _refreshed_routes(self) -> Optional[Dict[Tuple[str, ...], Route]]:
+        """Current routes, rebuilt off the loop if stale; None while another caller rebuilds them."""
+        snapshot = self._snapshot()
+        with self._lock:
+            if snapshot.version == self._version:
+                return self._routes
+            if self._building == snapshot.version:
+                return None
+            self._building = snapshot.version
+        try:
+            pool = get_tool_pool()
+            if pool is not None:
+                routes = await pool.run(_build_routes, snapshot, name="lookup_routes")
+            else:
+                routes = await asyncio.get_running_loop().run_in_executor(None, _build_routes, snapshot)
+        finally:
+            with self._lock:
+                if self._building == snapshot.version:
+                    self._building = None
+        with self._lock:
+            self._routes, self._version = routes, snapshot.version
+        return routes
+
+    def record_busy(self) -> None:
+        """Count a routed question that went to the model because the tool pool was busy."""
+        with self._lock:
+            self.busy += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"routes": len(self._routes), "routed": self.routed, "passed": self.passed, "busy": self.busy}
+
+
+def attach_lookup_router(agent: "LlmAgent", router: Optional[LookupRouter] = None) -> LookupRouter:
+    """
+    Answer lookup questions to an agent with its own tools, skipping the model.
+
+    Attach it before any response cache, so lookups never occupy cache entries.
+    A routed lookup that finds the tool pool busy goes to the model instead,
+    so the user never gets the pool's "busy" notice as an answer.
+
+    Args:
+        agent: Agent with get_coffee_trend_info and get_rwanda_info among its tools
+        router: Router to use (default: a new LookupRouter on the current knowledge)
+
+    Returns:
+        The router, whose stats() count routed, passed and busy questions
+    """
+    from google.genai import types
+
+    from agents.coffee_trends_agent import TOOL_POOL_BUSY_MESSAGE
+
+    router = router or LookupRouter()
+    tools = {getattr(tool, "__name__", None): tool for tool in agent.tools}
+
+    async def answer_lookup(callback_context: "CallbackContext") -> Optional["types.Content"]:
+        try:
+            route = await router.aroute(_question_text(callback_context.user_content))
+        except ToolPoolBusy:
+            router.record_busy()
+            logger.debug("Tool pool busy; passing the question to the model")
+            return None
+        if route is None or route[0] not in tools:
+            return None
+        name, args = route
+        logger.debug("Routed lookup to %s(%s)", name, args)
+        text = tools[name](**args)
+        # The agent's tools are async variants while its tool pool is enabled
+        if inspect.isawaitable(text):
+            text = await text
+        if text == TOOL_POOL_BUSY_MESSAGE:
+            router.record_busy()
+            logger.debug("Tool pool busy; passing the lookup to the model")
+            return None
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    agent.before_agent_callback = append_callback(agent.before_agent_callback, answer_lookup)
+    return router
@@ -0,0 +1,191 @@
+"""
+Single Flight
+Lets concurrent identical questions to the Coffee Trends Agent share one model run.
+
+When a market report drops, many BAHO sessions ask the trends agent the same
+question within seconds of each other. The response cache only helps once the
+first answer is stored, so until then every request runs the model on its
+own. attach_single_flight() adds callbacks that coalesce them:
+
+    before_agent_callback   the first request for a question becomes its
+                            leader and runs as usual; requests for the same
+                            question arriving while it runs wait for it
+    after_model_callback    the leader's final answer is handed to every
+                            waiting request, which returns it as its own
+
+Questions match on the response cache's key: the agent name, the normalized
+question and the knowledge version, so a reload never hands out an answer
+computed from the old knowledge base. Like the response cache, only the
+first question of a session is coalesced; follow-up questions depend on the
+conversation and always run on their own.
+
+If the leader ends without an answer (an error, a cancelled request), the
+first of its waiting requests leads the question again and the others wait
+for it; a request that has waited wait_timeout seconds runs the model itself.
+Flights are per process and per event loop; with several server workers each
+worker coalesces its own requests.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Union
+
+from agents.callbacks import append_callback, is_first_turn
+from cache.response_cache import content_text, make_cache_key
+
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAIT_TIMEOUT_SECONDS = 120.0
+
+
+class SingleFlight:
+    """In-flight questions of one process, each with the future its waiting requests share."""
+
+    def __init__(self, wait_timeout: float = DEFAULT_WAIT_TIMEOUT_SECONDS):
+        """
+        Args:
+            wait_timeout: Seconds a request waits for a leader before running on its own
+        """
+        self.wait_timeout = wait_timeout
+        self._flights: Dict[str, asyncio.Future] = {}
+        # invocation id -> key of the flight it leads
+        self._leaders: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.unanswered = 0
+
+    def join(self, key: str, invocation_id: str) -> Optional[asyncio.Future]:
+        """
+        Lead the flight for key, or join the one already in the air.
+
+        Args:
+            key: Question key
+            invocation_id: The request's invocation
+
+        Returns:
+            The leader's future to wait on, or None if this request is now the leader
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.done() and flight.get_loop() is loop:
+                self.coalesced += 1
+                return flight
+            self._flights[key] = loop.create_future()
+            self._leaders[invocation_id] = key
+            self.leaders += 1
+        task = asyncio.current_task()
+        if task is not None:
+            # The leader's request may end without reaching its after callbacks
+            task.add_done_callback(lambda _: self.land(invocation_id, None))
+        return None
+
+    def land(self, invocation_id: str, answer: Optional[str]) -> None:
+        """
+        End the flight led by an invocation, handing its answer to the waiting requests.
+
+        Args:
+            invocation_id: The leader's invocation (other invocations are ignored)
+            answer: Final answer text, or None to let the waiting requests run on their own
+        """
+        with self._lock:
+            key = self._leaders.pop(invocation_id, None)
+            if key is None:
+                return
+            flight = self._flights.pop(key, None)
+        if flight is not None and not flight.done():
+            flight.set_result(answer)
+
+    async def wait(self, flight: asyncio.Future) -> Optional[str]:
+        """Wait for a leader's answer; None if it ended without one or took longer than wait_timeout."""
+        try:
+            # Shielded: a waiting request that is cancelled must not cancel the flight
+            answer = await asyncio.wait_for(asyncio.shield(flight), self.wait_timeout)
+        except asyncio.TimeoutError:
+            answer = None
+        if answer is None:
+            self.unanswered += 1
+        return answer
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return flights in the air and leader/coalesced counters (reported like a cache's hits and misses)."""
+        return {
+            "size": len(self),
+            "hits": self.coalesced,
+            "misses": self.leaders,
+            "unanswered": self.unanswered,
+        }
+
+
+def attach_single_flight(
+    agent: "LlmAgent",
+    flights: SingleFlight,
+    version: Callable[[], str] = lambda: "",
+) -> "LlmAgent":
+    """
+    Let concurrent identical first-turn questions to an agent share one run.
+
+    Attach after the response caches, so a cached answer is served before a
+    question is coalesced.
+
+    Args:
+        agent: Agent to coalesce questions for
+        flights: The in-flight questions
+        version: Returns the version of the data answers depend on; part of every key
+
+    Returns:
+        The same agent, with single-flight callbacks appended
+    """
+    from google.genai import types
+
+    def _flight_key(callback_context: "CallbackContext") -> Optional[str]:
+        query = content_text(callback_context.user_content)
+        if not query or not is_first_turn(callback_context):
+            return None
+        return make_cache_key(agent.name, query, version())
+
+    async def join_flight(callback_context: "CallbackContext") -> Optional["types.Content"]:
+        key = _flight_key(callback_context)
+        if key is None:
+            return None
+        while True:
+            flight = flights.join(key, callback_context.invocation_id)
+            if flight is None:
+                return None
+            answer = await flights.wait(flight)
+            if answer is not None:
+                return types.Content(role="model", parts=[types.Part(text=answer)])
+            if not flight.done():
+                # Waited wait_timeout for a leader that is still running
+                return None
+            # The leader failed: one of its waiting requests leads the question next
+            logger.debug("Single-flight leader ended without an answer; rejoining")
+
+    def land_with_answer(callback_context: "CallbackContext", llm_response: "LlmResponse") -> Optional["LlmResponse"]:
+        if llm_response.partial or llm_response.error_code or llm_response.get_function_calls():
+            return None
+        text = content_text(llm_response.content)
+        if text:
+            flights.land(callback_context.invocation_id, text)
+        return None
+
+    def land_without_answer(callback_context: "CallbackContext") -> Optional["types.Content"]:
+        # No-op if the answer already landed the flight
+        flights.land(callback_context.invocation_id, None)
+        return None
+
+    agent.before_agent_callback = append_callback(agent.before_agent_callback, join_flight)
+    agent.after_model_callback = append_callback(agent.after_model_callback, land_with_answer)
+    agent.after_agent_callback = append_callback(agent.after_agent_callback, land_without_answer)
+    return agent
@@ -0,0 +1,222 @@
+"""
+Tool Pool
+Runs the Coffee Trends Agent's knowledge tools off the event loop, with backpressure.
+
+ADK calls a synchronous tool function on the event loop, so a slow search or
+a large report render stalls every other A2A request the worker is serving.
+The agent's async tools (see coffee_trends_agent.py) answer render-cache hits
+on the loop and hand everything else to a ToolPool:
+
+    workers      threads running tool work; at most this many jobs run at once
+    queue_size   callers allowed to wait for a free worker; callers beyond it
+                 are turned away at once instead of piling up
+    queue_timeout  seconds a caller waits before it is turned away
+
+A caller turned away gets ToolPoolBusy, which the tools report to the model as
+a short "busy, try again" answer. The knowledge snapshot lives in this
+process's memory and tool results are small strings, so the workers are
+threads: pure-Python work still holds the GIL, but the interpreter switches
+back to the loop every few milliseconds (sys.getswitchinterval()) instead of
+after the whole call, and SQLite and NumPy release the GIL while they work.
+For the same reason a small pool serves best; more threads than that only
+take GIL turns away from the loop (see benchmarks/loop_latency.py).
+
+The pool is per process; pre-forked server workers each get their own.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
+from config import AgentConfig
+from telemetry import TOOL_POOL_REJECTED, TOOL_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ToolPoolBusy(RuntimeError):
+    """Raised when a tool call cannot get a worker: the wait queue is full or the wait timed out."""
+
+
+class ToolPool:
+    """Bounded thread pool for tool work, shared by the event loops of one process."""
+
+    def __init__(self, workers: int = 2, queue_size: int = 32, queue_timeout: float = 10.0):
+        """
+        Args:
+            workers: Threads running tool work
+            queue_size: Callers allowed to wait for a free worker
+            queue_timeout: Seconds a caller waits for a free worker
+        """
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # asyncio primitives belong to one loop; a process normally runs one
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="coffee-tools")
+            return self._executor
+
+    def _get_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+        return slots
+
+    def _reject(self, name: str, reason: str) -> ToolPoolBusy:
+        self.rejected += 1
+        TOOL_POOL_REJECTED.inc(tool=name)
+        logger.warning("Tool pool busy, rejected %s (%s)", name, reason)
+        return ToolPoolBusy(f"Tool pool busy ({reason})")
+
+    async def run(self, function: Callable[..., T], *args, name: str = "", **kwargs) -> T:
+        """
+        Run a function on a pool thread and wait for its result.
+
+        The call runs in a copy of the caller's context, so its spans nest
+        under the caller's tool span.
+
+        Args:
+            function: Function to call
+            *args: Positional arguments for the function
+            name: Tool name for metrics and logs (default: the function's name)
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ToolPoolBusy: If the wait queue is full or no worker frees up within queue_timeout
+        """
+        name = name or getattr(function, "__name__", "tool")
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots(loop)
+
+        started = time.perf_counter()
+        if slots.locked():
+            if self.waiting >= self.queue_size:
+                raise self._reject(name, f"{self.waiting} calls waiting")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(name, f"no worker within {self.queue_timeout:g}s") from None
+            finally:
+                self.waiting -= 1
+        else:
+            await slots.acquire()
+        TOOL_POOL_WAIT_SECONDS.observe(time.perf_counter() - started, tool=name)
+
+        context = contextvars.copy_context()
+        try:
+            future = self._get_executor().submit(context.run, function, *args, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        self.running += 1
+
+        def release(_) -> None:
+            # Runs on the worker thread; the slot is freed when the work is done,
+            # even if the caller stopped waiting for it
+            try:
+                loop.call_soon_threadsafe(self._release, slots)
+            except RuntimeError:
+                # The loop has closed; nothing waits on its semaphore any more
+                pass
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        self.running -= 1
+        self.completed += 1
+        slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool's size and call counters."""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; the pool starts new ones if it is used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_pool: Optional[ToolPool] = None
+_configured = False
+_pool_lock = threading.Lock()
+
+
+def configure_tool_pool(config: Optional[AgentConfig] = None) -> Optional[ToolPool]:
+    """
+    Set up this process's tool pool from the agent settings.
+
+    The first call wins, like configure_telemetry(): tools are module
+    functions, so every agent in the process shares one pool.
+
+    Args:
+        config: Settings with tool_workers, tool_queue_size and tool_queue_timeout
+                (default: AgentConfig.from_env())
+
+    Returns:
+        The shared pool, or None if tool_workers is 0 (tools run on the event loop)
+    """
+    global _pool, _configured
+    with _pool_lock:
+        if not _configured:
+            config = config or AgentConfig.from_env()
+            if config.tool_workers > 0:
+                _pool = ToolPool(config.tool_workers, config.tool_queue_size, config.tool_queue_timeout)
+                logger.info(
+                    "Tool pool configured (%d workers, %d waiting, %gs wait)",
+                    config.tool_workers, config.tool_queue_size, config.tool_queue_timeout,
+                )
+            _configured = True
+        return _pool
+
+
+def get_tool_pool() -> Optional[ToolPool]:
+    """Return this process's tool pool (configured from the environment on first use), or None if disabled."""
+    return _pool if _configured else configure_tool_pool()
+
+
+def _reset_after_fork() -> None:
+    # Threads do not survive fork(); a worker forked from the launcher's master
+    # starts its own pool (with the master's settings) on first use
+    global _pool
+    if _pool is not None:
+        _pool = ToolPool(_pool.workers, _pool.queue_size, _pool.queue_timeout)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
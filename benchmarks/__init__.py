@@ -0,0 +1,5 @@
+"""
+Benchmarks Package
+"""
+
+__all__ = []
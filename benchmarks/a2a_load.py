@@ -0,0 +1,309 @@
+"""
+A2A Load Benchmark
+Drives the Coffee Trends Agent's A2A HTTP endpoint at a fixed concurrency and
+reports latency percentiles, throughput and server memory.
+
+By default the benchmark starts its own server in a subprocess, with Gemini
+replaced by the deterministic StubLlm (see benchmarks/stub_model.py), so a run
+measures the A2A stack, the agent runtime, the tools and JSON serialization
+rather than the model. The response cache and single-flight coalescing are
+disabled in that server unless --response-cache or --single-flight is given,
+so every request reaches the tools.
+
+Usage:
+    python -m benchmarks.a2a_load --requests 500 --concurrency 32 --latency 0.05
+    python -m benchmarks.a2a_load --workers 4 --json
+    python -m benchmarks.a2a_load --url http://localhost:8001   # an already running server
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+# Questions cycled through by the load generator; together they touch every tool
+DEFAULT_QUERIES = [
+    "What pricing trends matter for specialty coffee?",
+    "Which trends have high impact?",
+    "Tell me about Rwanda's coffee regions",
+    "What strategy should BAHO follow?",
+    "sustainability and direct trade",
+    "How is the home brewing market changing?",
+]
+
+READY_TIMEOUT_SECONDS = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _send_message_body(text: str) -> Dict:
+    """JSON-RPC SendMessage request for one user question."""
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid.uuid4().hex,
+        "method": "SendMessage",
+        "params": {
+            "message": {
+                "messageId": uuid.uuid4().hex,
+                "role": "ROLE_USER",
+                "parts": [{"text": text}],
+            }
+        },
+    }
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _proc_field_kb(path: str, field: str) -> Optional[int]:
+    try:
+        with open(path) as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def server_memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """
+    Memory of a server process and its workers (Linux only).
+
+    RSS counts pages shared copy-on-write between the master and its workers
+    once per process; PSS splits them between the sharers, so it is the fair
+    total for a multi-worker server.
+
+    Returns:
+        Dictionary with RSS, PSS and per-process peak RSS summed over the tree, in MB
+    """
+    pids = _process_tree(pid)
+    totals = {}
+    for name, path, field in (
+        ("rss_mb", "/proc/{}/status", "VmRSS"),
+        ("pss_mb", "/proc/{}/smaps_rollup", "Pss"),
+        ("peak_rss_mb", "/proc/{}/status", "VmHWM"),
+    ):
+        values = [_proc_field_kb(path.format(p), field) for p in pids]
+        totals[name] = None if any(value is None for value in values) else sum(values) / 1024
+    return totals
+
+
+def start_stub_server(
+    port: int, latency: float, workers: int, response_cache: bool, chunk_delay: float = 0.0,
+    single_flight: bool = False,
+) -> subprocess.Popen:
+    """Start a benchmark server on localhost in a subprocess."""
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    if not response_cache:
+        env["COFFEE_TRENDS_RESPONSE_CACHE"] = "off"
+    if not single_flight:
+        env["COFFEE_TRENDS_SINGLE_FLIGHT"] = "off"
+    command = [
+        sys.executable, "-m", "benchmarks.a2a_load", "serve",
+        "--port", str(port), "--latency", str(latency), "--workers", str(workers),
+        "--chunk-delay", str(chunk_delay),
+    ]
+    return subprocess.Popen(command, cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, url: str, timeout: float = READY_TIMEOUT_SECONDS) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get(f"{url}/.well-known/agent-card.json")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Server at {url} did not become ready within {timeout:.0f}s")
+        await asyncio.sleep(0.2)
+
+
+async def run_load(
+    url: str,
+    total_requests: int,
+    concurrency: int,
+    queries: Sequence[str] = DEFAULT_QUERIES,
+    warmup: int = 10,
+    timeout: float = 60.0,
+) -> Dict:
+    """
+    Send SendMessage requests with a fixed number in flight.
+
+    Args:
+        url: Base URL of the A2A server
+        total_requests: Number of measured requests
+        concurrency: Requests in flight at once
+        queries: Questions cycled through in order
+        warmup: Unmeasured requests sent first
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Dictionary with latency percentiles (ms), requests/sec and error count
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"A2A-Version": "1.0"}
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, headers=headers) as client:
+        await wait_until_ready(client, url)
+
+        for i in range(warmup):
+            await client.post(f"{url}/", json=_send_message_body(queries[i % len(queries)]))
+
+        latencies: List[float] = []
+        errors = 0
+        next_index = 0
+
+        async def worker() -> None:
+            nonlocal errors, next_index
+            while next_index < total_requests:
+                index = next_index
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}/", json=_send_message_body(queries[index % len(queries)]))
+                    ok = response.status_code == 200 and "result" in response.json()
+                except (httpx.HTTPError, ValueError):
+                    ok = False
+                latencies.append((time.perf_counter() - started) * 1000)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": total_requests / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def _print_report(result: Dict) -> None:
+    latency = result["latency_ms"]
+    print(f"Requests:     {result['requests']} ({result['errors']} errors) at concurrency {result['concurrency']}")
+    print(f"Throughput:   {result['requests_per_second']:.1f} req/s over {result['seconds']:.2f}s")
+    print(
+        f"Latency (ms): p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}  "
+        f"mean {latency['mean']:.1f}  max {latency['max']:.1f}"
+    )
+    memory = result.get("server_memory")
+    if memory and memory["rss_mb"] is not None:
+        print(f"Server RSS:   {memory['rss_mb']:.1f} MB now, {memory['peak_rss_mb']:.1f} MB peak (all processes)")
+    if memory and memory["pss_mb"] is not None:
+        print(f"Server PSS:   {memory['pss_mb']:.1f} MB (shared pages split between processes)")
+
+
+def serve_stub(port: int, latency: float, workers: int, chunk_delay: float = 0.0) -> int:
+    """Serve the Coffee Trends Agent with the stub model (the benchmark's server side)."""
+    from agents import build_coffee_trends_agent, build_coffee_trends_a2a_app
+    from benchmarks.stub_model import StubLlm
+    from dataclasses import replace
+
+    from config import AgentConfig, ServerConfig
+    from servers.launcher import serve
+    from servers.metrics import register_metrics_route
+
+    # Other settings (fast path, telemetry, ...) come from the environment, as in the real server
+    agent_config = replace(AgentConfig.from_env(), trends_host="127.0.0.1", trends_port=port)
+    agent = build_coffee_trends_agent(agent_config, model=StubLlm(latency=latency, chunk_delay=chunk_delay))
+    app = build_coffee_trends_a2a_app(agent_config, agent=agent)
+    if agent_config.telemetry != "off":
+        register_metrics_route(app)
+    return serve(ServerConfig(host="127.0.0.1", port=port, workers=workers), app=app)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Coffee Trends Agent A2A endpoint.")
+    parser.add_argument("mode", nargs="?", choices=["run", "serve"], default="run", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help="benchmark a running server instead of starting a stub server")
+    parser.add_argument("--requests", type=int, default=300, help="measured requests (default 300)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight (default 16)")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured warm-up requests (default 10)")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub model latency per call in seconds (default 0)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0,
+                        help="stub model delay between streamed answer chunks in seconds (default 0)")
+    parser.add_argument("--workers", type=int, default=1, help="stub server worker processes (default 1)")
+    parser.add_argument("--port", type=int, default=0, help="stub server port (default: a free port)")
+    parser.add_argument("--response-cache", action="store_true", help="keep the response cache on in the stub server")
+    parser.add_argument("--single-flight", action="store_true",
+                        help="let concurrent identical questions share one run in the stub server")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        return serve_stub(args.port, args.latency, args.workers, args.chunk_delay)
+
+    server = None
+    url = args.url
+    if url is None:
+        port = args.port or _free_port()
+        server = start_stub_server(
+            port, args.latency, args.workers, args.response_cache, args.chunk_delay, args.single_flight
+        )
+        url = f"http://127.0.0.1:{port}"
+    try:
+        result = asyncio.run(run_load(url.rstrip("/"), args.requests, args.concurrency, warmup=args.warmup))
+        if server is not None:
+            result["server_memory"] = server_memory_mb(server.pid)
+            result["stub_latency"] = args.latency
+            result["workers"] = args.workers
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_report(result)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Import-Time Benchmark
+Measures cold-start time and memory of importing the project's packages.
+
+Every scenario runs in a fresh interpreter, so nothing is shared between
+measurements. The "eager" scenario touches every agent attribute right after
+import, which is what a plain `import agents` used to cost when the agents and
+the A2A app were built at import time; compare it with "agents (lazy)".
+
+Usage:
+    python benchmarks/import_time.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+SCENARIOS = {
+    "knowledge": "import knowledge",
+    "agents (lazy)": "import agents",
+    "demo: baho_strategy_agent": "from agents import baho_strategy_agent",
+    "server: coffee_trends_a2a_app": "from agents import coffee_trends_a2a_app",
+    "agents (eager, all attributes)": (
+        "import agents; agents.coffee_trends_agent; agents.coffee_trends_a2a_app; "
+        "agents.baho_strategy_agent; agents.remote_coffee_trends_agent"
+    ),
+}
+
+# Runs the statement in a fresh interpreter and reports elapsed time, peak RSS
+# and module count as JSON on the last line of stdout
+_PROBE = """
+import json, resource, sys, time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    peak_kb //= 1024
+print(json.dumps({{"seconds": elapsed, "peak_rss_mb": peak_kb / 1024, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(statement: str, runs: int) -> dict:
+    """
+    Run an import statement in fresh interpreters and summarize the runs.
+
+    Args:
+        statement: Python statement(s) to time
+        runs: Number of interpreters to start
+
+    Returns:
+        Dictionary with median seconds, peak RSS (MB) and loaded module count
+    """
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement)],
+            cwd=project_root,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(sample["seconds"] for sample in samples),
+        "peak_rss_mb": statistics.median(sample["peak_rss_mb"] for sample in samples),
+        "modules": samples[-1]["modules"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and memory.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario (default 5)")
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':<34} {'time (ms)':>10} {'peak RSS (MB)':>14} {'modules':>8}")
+    print("-" * 69)
+    for name, statement in SCENARIOS.items():
+        result = measure(statement, args.runs)
+        print(
+            f"{name:<34} {result['seconds'] * 1000:>10.1f} "
+            f"{result['peak_rss_mb']:>14.1f} {result['modules']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
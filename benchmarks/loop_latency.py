@@ -0,0 +1,223 @@
+"""
+Event Loop Latency Benchmark
+Measures how long knowledge tool calls stall the event loop under mixed load.
+
+An uvicorn worker serves every A2A request on one event loop, so while a tool
+runs on that loop no other request makes progress. The benchmark serves a
+synthetic knowledge base of --trends trends and runs --concurrency callers
+issuing a mix of searches, trend lookups, Rwanda lookups and strategy reports,
+while a probe task sleeps for 1 ms at a time and records how late it wakes up.
+The same load is run twice:
+
+    loop   the synchronous tools called on the event loop (COFFEE_TRENDS_TOOL_WORKERS=0)
+    pool   their async variants, which run on the tool pool
+
+and the report compares the probe's lag (the delay any other request on the
+loop would see) with tool-call latency and throughput.
+
+Usage:
+    python -m benchmarks.loop_latency --trends 10000 --concurrency 16 --duration 5
+    python -m benchmarks.loop_latency --workers 2 --json
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.a2a_load import percentile
+from knowledge import reload_knowledge
+from knowledge.coffee_trends_knowledge import COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO
+from knowledge.trend_store import DictTrendStore
+
+PROBE_INTERVAL_SECONDS = 0.001
+
+SEARCH_QUERIES = [
+    "sustainability", "pricing", "specialty coffee", "Rwanda", "direct trade", "cold brew",
+    "pricing AND Rwanda", "consumer demand", "traceability premium", "home brewing",
+]
+RWANDA_CATEGORIES = [None, "terroir", "processing_methods", "regions", "quality_grades", "market_positioning"]
+
+# Share of each call in the mix
+CALL_MIX = (
+    ("search_trends", 0.5),
+    ("get_coffee_trend_info", 0.3),
+    ("get_rwanda_info", 0.1),
+    ("get_baho_strategy_insights", 0.1),
+)
+
+
+def synthetic_store(trends: int, seed: int = 7) -> DictTrendStore:
+    """
+    Build a knowledge base of copies of the built-in trends with shuffled descriptions.
+
+    Args:
+        trends: Number of trends
+        seed: Random seed, so both modes serve the same data
+
+    Returns:
+        DictTrendStore with the built-in Rwanda information
+    """
+    rng = random.Random(seed)
+    base = list(COFFEE_TRENDS_DB.items())
+    words = " ".join(trend["description"] for _, trend in base).split()
+    records = {}
+    for i in range(trends):
+        key, trend = base[i % len(base)]
+        record = dict(trend)
+        record["trend"] = f"{trend['trend']} {i}"
+        record["description"] = " ".join(rng.choice(words) for _ in range(60))
+        records[f"{key}_{i}"] = record
+    return DictTrendStore(records, RWANDA_COFFEE_INFO)
+
+
+def _call_plan(tools, keys: Sequence[str], rng: random.Random) -> Tuple[str, Callable[[], object]]:
+    """Pick the next tool call of the mix, as (tool name, zero-argument call)."""
+    name = rng.choices([call for call, _ in CALL_MIX], weights=[share for _, share in CALL_MIX])[0]
+    if name == "search_trends":
+        query = f"{rng.choice(SEARCH_QUERIES)} {rng.choice(SEARCH_QUERIES)}"
+        return name, lambda: tools[name](query)
+    if name == "get_coffee_trend_info":
+        key = rng.choice(keys)
+        return name, lambda: tools[name](key)
+    if name == "get_rwanda_info":
+        category = rng.choice(RWANDA_CATEGORIES)
+        return name, lambda: tools[name](category)
+    return name, lambda: tools[name]()
+
+
+async def _probe(stop: asyncio.Event, lags: List[float]) -> None:
+    """Sleep PROBE_INTERVAL_SECONDS at a time and record how late each wake-up is."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - started - PROBE_INTERVAL_SECONDS))
+
+
+async def run_mixed_load(mode: str, keys: Sequence[str], concurrency: int, duration: float, seed: int = 11) -> Dict:
+    """
+    Run the mixed tool load on this event loop and measure loop lag.
+
+    Args:
+        mode: "loop" (synchronous tools) or "pool" (async variants on the tool pool)
+        keys: Trend keys looked up by get_coffee_trend_info calls
+        concurrency: Callers issuing tool calls back to back
+        duration: Seconds to run
+        seed: Random seed of the call mix
+
+    Returns:
+        Dictionary with loop lag and tool latency percentiles (ms), calls/sec and busy answers
+    """
+    module = importlib.import_module("agents.coffee_trends_agent")
+    # The render cache starts cold in both modes
+    module._RENDER_CACHE.clear()
+    suffix = "_async" if mode == "pool" else ""
+    tools = {name: getattr(module, name + suffix) for name, _ in CALL_MIX}
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    latencies: List[float] = []
+    busy = 0
+
+    async def caller(index: int) -> None:
+        nonlocal busy
+        rng = random.Random(seed + index)
+        while not stop.is_set():
+            name, call = _call_plan(tools, keys, rng)
+            started = time.perf_counter()
+            output = call()
+            if inspect.isawaitable(output):
+                output = await output
+            latencies.append(time.perf_counter() - started)
+            if output == module.TOOL_POOL_BUSY_MESSAGE:
+                busy += 1
+            # A synchronous tool never yields; let the other callers and the probe run
+            await asyncio.sleep(0)
+
+    probe = asyncio.create_task(_probe(stop, lags))
+    callers = [asyncio.create_task(caller(i)) for i in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(probe, *callers)
+    elapsed = time.perf_counter() - started
+
+    lags.sort()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "calls": len(latencies),
+        "busy": busy,
+        "seconds": elapsed,
+        "calls_per_second": len(latencies) / elapsed,
+        "loop_lag_ms": {
+            "p50": percentile(lags, 0.50) * 1000,
+            "p99": percentile(lags, 0.99) * 1000,
+            "max": lags[-1] * 1000 if lags else 0.0,
+            "mean": statistics.fmean(lags) * 1000 if lags else 0.0,
+        },
+        "tool_latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+        },
+    }
+
+
+def _print_report(results: List[Dict], trends: int, concurrency: int, workers: int) -> None:
+    print(f"{trends} trends, {concurrency} concurrent callers, tool pool of {workers} workers")
+    print(
+        f"{'mode':<6} {'calls/s':>9} {'busy':>5} {'lag p50':>9} {'lag p99':>9} {'lag max':>9} "
+        f"{'tool p50':>9} {'tool p99':>9}   (ms)"
+    )
+    print("-" * 76)
+    for result in results:
+        lag, tool = result["loop_lag_ms"], result["tool_latency_ms"]
+        print(
+            f"{result['mode']:<6} {result['calls_per_second']:>9.1f} {result['busy']:>5} "
+            f"{lag['p50']:>9.2f} {lag['p99']:>9.2f} {lag['max']:>9.2f} {tool['p50']:>9.2f} {tool['p99']:>9.2f}"
+        )
+
+
+def main(argv=None) -> int:
+    from agents.tool_pool import configure_tool_pool
+    from config import AgentConfig
+
+    parser = argparse.ArgumentParser(description="Measure event loop lag caused by knowledge tool calls.")
+    parser.add_argument("--trends", type=int, default=10000, help="trends in the synthetic knowledge base (default 10000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent tool callers (default 16)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode (default 5)")
+    defaults = AgentConfig()
+    parser.add_argument("--workers", type=int, default=defaults.tool_workers,
+                        help=f"tool pool workers (default {defaults.tool_workers})")
+    parser.add_argument("--queue", type=int, default=defaults.tool_queue_size,
+                        help=f"calls allowed to wait for a worker (default {defaults.tool_queue_size})")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    store = synthetic_store(args.trends)
+    keys = store.trend_keys()
+    reload_knowledge(store)
+    configure_tool_pool(AgentConfig(tool_workers=args.workers, tool_queue_size=args.queue))
+
+    results = [asyncio.run(run_mixed_load(mode, keys, args.concurrency, args.duration)) for mode in ("loop", "pool")]
+    if args.json:
+        print(json.dumps({"trends": args.trends, "concurrency": args.concurrency, "workers": args.workers,
+                          "results": results}, indent=2))
+    else:
+        _print_report(results, args.trends, args.concurrency, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Model Rate Limit Benchmark
+Compares static per-call retries with the model scheduler against a rate-limited model.
+
+A simulated model accepts --quota calls per second and answers the rest with
+429 RESOURCE_EXHAUSTED (with a RetryInfo delay, like Gemini). --requests model
+calls are issued at each --concurrency level, in two modes:
+
+    static      each call retries on its own, like google.genai's
+                HttpRetryOptions with the agents' former settings (5 attempts,
+                exponential base 7, 1 s initial delay, 1 s of jitter)
+    scheduler   every call goes through one ModelScheduler (jittered backoff,
+                Retry-After pauses, adaptive concurrency, optional token bucket)
+
+and the report shows, per level, the calls that succeeded and failed, the
+attempts the model saw and the latency. All times are multiplied by
+--time-scale (model latency, delays and the quota window), so a run takes
+seconds; reported times are unscaled.
+
+Usage:
+    python -m benchmarks.model_rate_limit --quota 20 --concurrency 8,32,128
+    python -m benchmarks.model_rate_limit --rate-limit 20 --json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Sequence
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from google.genai import errors
+
+from benchmarks.a2a_load import percentile
+from clients.model_scheduler import ModelScheduler
+
+MODES = ("static", "scheduler")
+# google.genai HttpRetryOptions the agents used before the scheduler
+STATIC_ATTEMPTS = 5
+STATIC_EXP_BASE = 7
+STATIC_INITIAL_DELAY = 1.0
+STATIC_MAX_DELAY = 60.0
+STATIC_JITTER = 1.0
+
+
+class QuotaModel:
+    """Simulated model call that accepts `quota` calls per window and rejects the rest with a 429."""
+
+    def __init__(self, quota: int, latency: float, retry_delay: float, window: float):
+        """
+        Args:
+            quota: Calls accepted per window
+            latency: Seconds an accepted call takes
+            retry_delay: Seconds the 429's RetryInfo asks clients to wait
+            window: Length of the quota window in seconds
+        """
+        self.quota = quota
+        self.latency = latency
+        self.retry_delay = retry_delay
+        self.window = window
+        self._accepted: deque = deque()
+        self.attempts = 0
+        self.throttled = 0
+
+    async def call(self) -> AsyncIterator[str]:
+        self.attempts += 1
+        now = time.monotonic()
+        while self._accepted and now - self._accepted[0] >= self.window:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.quota:
+            self.throttled += 1
+            raise errors.ClientError(429, {"error": {
+                "code": 429,
+                "status": "RESOURCE_EXHAUSTED",
+                "message": "Quota exceeded",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                             "retryDelay": f"{self.retry_delay:.3f}s"}],
+            }})
+        self._accepted.append(now)
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        yield "response"
+
+
+async def _static_call(model: QuotaModel, scale: float) -> None:
+    """One call with per-call exponential backoff, as google.genai's retry would make it."""
+    for attempt in range(1, STATIC_ATTEMPTS + 1):
+        try:
+            async for _ in model.call():
+                pass
+            return
+        except errors.ClientError:
+            if attempt == STATIC_ATTEMPTS:
+                raise
+            delay = STATIC_INITIAL_DELAY * STATIC_EXP_BASE ** (attempt - 1) + random.uniform(0, STATIC_JITTER)
+            await asyncio.sleep(min(delay, STATIC_MAX_DELAY) * scale)
+
+
+async def run_level(mode: str, args: argparse.Namespace, concurrency: int) -> Dict:
+    """
+    Issue args.requests model calls at one concurrency level.
+
+    Args:
+        mode: "static" or "scheduler"
+        args: Parsed command line options
+        concurrency: Calls in flight at once
+
+    Returns:
+        Dictionary with succeeded and failed calls, model attempts, throughput and latency (unscaled seconds)
+    """
+    scale = args.time_scale
+    model = QuotaModel(args.quota, args.latency * scale, args.retry_delay * scale, scale)
+    scheduler = ModelScheduler(
+        rate_limit=args.rate_limit / scale if args.rate_limit else 0.0,
+        burst=args.burst,
+        max_concurrency=args.max_concurrency,
+        attempts=STATIC_ATTEMPTS,
+        initial_delay=STATIC_INITIAL_DELAY * scale,
+        max_delay=args.max_delay * scale,
+    )
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+    latencies: List[float] = []
+    failed = 0
+
+    async def caller() -> None:
+        nonlocal failed
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                if mode == "static":
+                    await _static_call(model, scale)
+                else:
+                    async for _ in scheduler.stream(model.call):
+                        pass
+                latencies.append((time.perf_counter() - started) / scale)
+            except errors.ClientError:
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = (time.perf_counter() - started) / scale
+    latencies.sort()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "succeeded": len(latencies),
+        "failed": failed,
+        "attempts": model.attempts,
+        "throttled": model.throttled,
+        "seconds": elapsed,
+        "calls_per_second": len(latencies) / elapsed,
+        "latency_seconds": {"p50": percentile(latencies, 0.50), "p99": percentile(latencies, 0.99)},
+        "final_concurrency_limit": scheduler.stats()["concurrency_limit"] if mode == "scheduler" else None,
+    }
+
+
+def _print_report(results: Sequence[Dict], args: argparse.Namespace) -> None:
+    print(f"Model quota {args.quota} calls/s, {args.latency:g}s per call, {args.requests} calls per level "
+          f"(time scale {args.time_scale:g})")
+    print(f"{'mode':<10} {'conc':>5} {'ok':>5} {'failed':>6} {'attempts':>8} {'calls/s':>8} "
+          f"{'p50 s':>7} {'p99 s':>7} {'limit':>5}")
+    print("-" * 70)
+    for result in results:
+        latency = result["latency_seconds"]
+        limit = result["final_concurrency_limit"]
+        print(
+            f"{result['mode']:<10} {result['concurrency']:>5} {result['succeeded']:>5} {result['failed']:>6} "
+            f"{result['attempts']:>8} {result['calls_per_second']:>8.1f} {latency['p50']:>7.2f} "
+            f"{latency['p99']:>7.2f} {'' if limit is None else limit:>5}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare static retries with the model scheduler under a model quota.")
+    parser.add_argument("--quota", type=int, default=20, help="calls per second the model accepts (default 20)")
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds per accepted call (default 2)")
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="RetryInfo delay of the 429s (default 1)")
+    parser.add_argument("--requests", type=int, default=400, help="calls per concurrency level (default 400)")
+    parser.add_argument("--concurrency", default="8,32,128", help="comma-separated concurrency levels (default 8,32,128)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="scheduler token bucket rate in calls/s (default 0: no pacing)")
+    parser.add_argument("--burst", type=int, default=10, help="scheduler token bucket burst (default 10)")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="scheduler concurrency limit (default 32)")
+    parser.add_argument("--max-delay", type=float, default=30.0, help="scheduler backoff ceiling in seconds (default 30)")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="multiplier for every duration (default 0.05)")
+    parser.add_argument("--seed", type=int, default=7, help="random seed (default 7)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results = [asyncio.run(run_level(mode, args, level)) for level in levels for mode in MODES]
+    if args.json:
+        print(json.dumps({"quota": args.quota, "requests": args.requests, "results": results}, indent=2))
+    else:
+        _print_report(results, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
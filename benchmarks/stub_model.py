@@ -0,0 +1,112 @@
+"""
+Stub Model for Benchmarks
+A deterministic stand-in for Gemini that exercises the agents' tool paths.
+
+The stub never leaves the process: it waits a configurable latency to mimic a
+model round trip, then either asks for one tool call chosen from keywords in
+the question, or, once the tool has answered, replies with a summary built
+from the tool output. Runs are repeatable, so changes in measured latency
+come from the code under test rather than from the model.
+"""
+
+import asyncio
+import re
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Characters of tool output echoed in the final answer
+ANSWER_PREVIEW_CHARS = 400
+
+# Size of the text chunks yielded in streaming mode
+STREAM_CHUNK_CHARS = 64
+
+
+def choose_tool_call(question: str) -> Tuple[str, Dict]:
+    """
+    Pick the Coffee Trends Agent tool a question would most likely need.
+
+    Args:
+        question: User question
+
+    Returns:
+        Tuple of (tool name, arguments)
+    """
+    text = question.lower()
+    if "baho" in text or "strateg" in text:
+        return "get_baho_strategy_insights", {}
+    if re.search(r"\bimpact\b|\bmost important\b", text):
+        return "filter_trends", {"min_impact": "high"}
+    if "rwanda" in text:
+        return "get_rwanda_info", {}
+    return "search_trends", {"query": question, "limit": 5}
+
+
+def _last_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents or []):
+        if content.role == "user" and content.parts:
+            text = "".join(part.text for part in content.parts if part.text)
+            if text:
+                return text
+    return ""
+
+
+def _last_function_response(llm_request: LlmRequest) -> Optional[types.FunctionResponse]:
+    contents = llm_request.contents or []
+    if contents and contents[-1].parts:
+        for part in contents[-1].parts:
+            if part.function_response:
+                return part.function_response
+    return None
+
+
+class StubLlm(BaseLlm):
+    """
+    Deterministic model: one tool call per question, then a canned answer.
+
+    Attributes:
+        latency: Seconds to wait before every model response
+        chunk_delay: Seconds between the chunks of a streamed answer, mimicking
+                     token-by-token generation
+        transfer_to: Sub-agent to hand every new question to (e.g., the BAHO
+                     agent's remote coffee_trends_agent) instead of calling a tool
+    """
+
+    model: str = "stub"
+    latency: float = 0.0
+    chunk_delay: float = 0.0
+    transfer_to: Optional[str] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        function_response = _last_function_response(llm_request)
+        if function_response is None:
+            name, args = choose_tool_call(_last_user_text(llm_request))
+            if self.transfer_to:
+                name, args = "transfer_to_agent", {"agent_name": self.transfer_to}
+            if name in llm_request.tools_dict:
+                yield LlmResponse(content=types.Content(
+                    role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))]
+                ))
+                return
+            answer = f"Stub answer to: {_last_user_text(llm_request)}"
+        else:
+            result = (function_response.response or {}).get("result", function_response.response)
+            answer = f"Based on {function_response.name}:\n{str(result)[:ANSWER_PREVIEW_CHARS]}"
+
+        if stream:
+            for start in range(0, len(answer), STREAM_CHUNK_CHARS):
+                if start and self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=answer[start:start + STREAM_CHUNK_CHARS])]),
+                    partial=True,
+                )
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=answer)]))
@@ -0,0 +1,52 @@
+"""
+Cache Package
+"""
+
+from .lru import LRUCache
+from .registry import cache_stats, register_cache
+from .response_cache import (
+    QuestionCache,
+    ResponseCache,
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+    attach_response_cache,
+    make_cache_key,
+    normalize_query,
+    response_cache_from_env,
+)
+
+# The semantic cache needs NumPy; load it on first use so importing the
+# package stays cheap while the semantic cache is disabled (the default).
+_SEMANTIC_CACHE_ATTRIBUTES = (
+    "HashingEmbedder",
+    "SentenceTransformerEmbedder",
+    "SemanticResponseCache",
+    "shared_semantic_cache",
+)
+
+
+def __getattr__(name: str):
+    if name in _SEMANTIC_CACHE_ATTRIBUTES:
+        from . import semantic_cache
+
+        return getattr(semantic_cache, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "LRUCache",
+    "cache_stats",
+    "register_cache",
+    "QuestionCache",
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "SQLiteResponseCache",
+    "attach_response_cache",
+    "make_cache_key",
+    "normalize_query",
+    "response_cache_from_env",
+    "HashingEmbedder",
+    "SentenceTransformerEmbedder",
+    "SemanticResponseCache",
+    "shared_semantic_cache",
+]
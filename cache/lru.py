@@ -0,0 +1,81 @@
+"""
+LRU Cache
+Thread-safe, size-bounded least-recently-used cache with hit/miss counters.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Size-bounded mapping that evicts the least recently used entry first.
+
+    Values are computed outside the lock, so a slow render never blocks readers
+    of other keys; two threads missing the same key at once may both compute it.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value for key, or default."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], V]) -> V:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
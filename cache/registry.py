@@ -0,0 +1,34 @@
+"""
+Cache Registry
+Named caches whose statistics are reported by the server's admin routes.
+"""
+
+import threading
+from typing import Dict
+
+_CACHES: Dict[str, object] = {}
+_LOCK = threading.Lock()
+
+
+def register_cache(name: str, cache: object) -> None:
+    """
+    Register a cache for statistics reporting.
+
+    Args:
+        name: Unique name for the cache (re-registering a name replaces it)
+        cache: Object with a stats() method returning a dict
+    """
+    with _LOCK:
+        _CACHES[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """
+    Collect statistics from every registered cache.
+
+    Returns:
+        Mapping of cache name to its stats() output
+    """
+    with _LOCK:
+        caches = dict(_CACHES)
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,391 @@
+"""
+Agent Response Cache
+Serves repeated questions to an LlmAgent from a cache instead of a model round trip.
+
+The cache sits on the agent's callbacks: before_agent_callback answers a
+question it has seen before and skips the agent run entirely, and
+after_model_callback stores the model's final text answer. Keys combine the
+agent name, the normalized question and a version string (the knowledge base
+version for the coffee trends agent), so reloading the knowledge base
+naturally retires old answers.
+
+Only the first question of a session is cached: follow-up questions depend on
+the conversation so far and always go to the model.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    # ADK and google.genai are only needed once a cache is attached to an agent
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+# Environment variables configuring the coffee trends agent's response cache
+RESPONSE_CACHE_ENV_VAR = "COFFEE_TRENDS_RESPONSE_CACHE"  # "off", "memory" or a SQLite file path
+RESPONSE_CACHE_TTL_ENV_VAR = "COFFEE_TRENDS_RESPONSE_CACHE_TTL"  # seconds
+RESPONSE_CACHE_SIZE_ENV_VAR = "COFFEE_TRENDS_RESPONSE_CACHE_SIZE"  # entries
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_ENTRIES = 1024
+# The SQLite cache trims itself once every this many inserts (at most), not on every one
+EVICTION_INTERVAL = 64
+# Threads per process running the SQLite cache's queries for the agent callbacks
+CACHE_THREADS = 4
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a question so trivially different phrasings share a cache entry.
+
+    Lowercases, drops punctuation and collapses whitespace, so
+    "What are the key trends?" and "what are the  key trends" match.
+
+    Args:
+        text: Raw question text
+
+    Returns:
+        Normalized question
+    """
+    return _WHITESPACE_RE.sub(" ", _PUNCTUATION_RE.sub(" ", text.lower())).strip()
+
+
+def content_text(content: Optional["types.Content"]) -> str:
+    """Concatenate the text parts of a message."""
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+def make_cache_key(agent_name: str, query: str, version: str = "") -> str:
+    """
+    Build the cache key for a question.
+
+    Args:
+        agent_name: Name of the agent answering
+        query: Raw question text (normalized here)
+        version: Version of the data the answer depends on
+
+    Returns:
+        Hex digest key
+    """
+    payload = "\x1f".join((agent_name, version, normalize_query(query)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QuestionCache(ABC):
+    """Interface of every cache attach_response_cache() can put in front of an agent: answers by question."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def lookup(self, agent_name: str, query: str, version: str = "") -> Optional[str]:
+        """
+        Find the cached answer to a question.
+
+        Args:
+            agent_name: Name of the agent answering
+            query: Raw question text
+            version: Version of the data the answer depends on
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+
+    @abstractmethod
+    def store(self, agent_name: str, query: str, version: str, answer: str) -> None:
+        """Cache the answer to a question."""
+
+    async def alookup(self, agent_name: str, query: str, version: str = "") -> Optional[str]:
+        """lookup() for callers on the event loop; backends that block on I/O override it to run off the loop."""
+        return self.lookup(agent_name, query, version)
+
+    async def astore(self, agent_name: str, query: str, version: str, answer: str) -> None:
+        """store() for callers on the event loop; backends that block on I/O override it to run off the loop."""
+        self.store(agent_name, query, version, answer)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return size, hit/miss counters and hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+class ResponseCache(QuestionCache):
+    """Storage interface for cached agent answers, keyed by make_cache_key()."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer for key, or None if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store an answer, evicting old entries if the cache is full."""
+
+    def lookup(self, agent_name: str, query: str, version: str = "") -> Optional[str]:
+        return self.get(make_cache_key(agent_name, query, version))
+
+    def store(self, agent_name: str, query: str, version: str, answer: str) -> None:
+        self.set(make_cache_key(agent_name, query, version), answer)
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process LRU cache with a time-to-live on every entry."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Cache shared by every worker process on a host, stored in a SQLite file.
+
+    The database runs in WAL mode so concurrent readers never block on a
+    writer. Every few inserts (EVICTION_INTERVAL, or fewer for a small
+    cache) expired entries are purged and the least recently used entries
+    past max_entries evicted, so between trims the table may briefly hold a
+    few more than max_entries. The agent callbacks reach it through
+    alookup()/astore(), which run the queries on the cache's own threads so a
+    busy database never stalls the event loop.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_by_last_used ON responses (last_used);
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = Path(path)
+        self._local = threading.local()
+        # Guards the counters, which the pool threads and the event loop share
+        self._lock = threading.Lock()
+        self._evict_every = max(1, min(EVICTION_INTERVAL, max_entries // 16))
+        self._inserts = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._connection().executescript(self._SCHEMA)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # Each thread has its own connection and WAL lets readers run side by side. A forked worker starts its own.
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=CACHE_THREADS, thread_name_prefix="coffee-response-cache"
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    async def _run(self, function: Callable, *args):
+        """Run blocking SQLite work on the cache's threads and wait for its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(function, *args))
+
+    async def alookup(self, agent_name: str, query: str, version: str = "") -> Optional[str]:
+        return await self._run(self.lookup, agent_name, query, version)
+
+    async def astore(self, agent_name: str, query: str, version: str, answer: str) -> None:
+        await self._run(self.store, agent_name, query, version, answer)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        # Connections are per thread, and never inherited by a forked worker
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, value, now + self.ttl_seconds, now),
+        )
+        with self._lock:
+            self._inserts += 1
+            due = self._inserts % self._evict_every == 0
+        if due:
+            connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def attach_response_cache(
+    agent: "LlmAgent",
+    cache: QuestionCache,
+    version: Callable[[], Union[str, Awaitable[str]]] = lambda: "",
+) -> "LlmAgent":
+    """
+    Serve repeated first-turn questions to an agent from a response cache.
+
+    Args:
+        agent: Agent to put the cache in front of
+        cache: Cache backend (exact-match or semantic)
+        version: Returns (or, as a coroutine function, resolves) the version of the data
+                 answers depend on; part of every key
+
+    Returns:
+        The same agent, with cache callbacks appended
+    """
+    from google.genai import types
+
+    from agents.callbacks import append_callback, is_first_turn
+
+    def _cacheable_query(callback_context: "CallbackContext") -> Optional[str]:
+        query = content_text(callback_context.user_content)
+        if not query or not is_first_turn(callback_context):
+            return None
+        return query
+
+    async def _version() -> str:
+        value = version()
+        return await value if inspect.isawaitable(value) else value
+
+    async def serve_cached_response(callback_context: "CallbackContext") -> Optional["types.Content"]:
+        query = _cacheable_query(callback_context)
+        if query is None:
+            return None
+        cached = await cache.alookup(agent.name, query, await _version())
+        if cached is None:
+            return None
+        return types.Content(role="model", parts=[types.Part(text=cached)])
+
+    async def store_final_response(
+        callback_context: "CallbackContext", llm_response: "LlmResponse"
+    ) -> Optional["LlmResponse"]:
+        if llm_response.partial or llm_response.error_code or llm_response.get_function_calls():
+            return None
+        text = content_text(llm_response.content)
+        query = _cacheable_query(callback_context)
+        if text and query is not None:
+            await cache.astore(agent.name, query, await _version(), text)
+        return None
+
+    agent.before_agent_callback = append_callback(agent.before_agent_callback, serve_cached_response)
+    agent.after_model_callback = append_callback(agent.after_model_callback, store_final_response)
+    return agent
+
+
+def response_cache_from_env() -> Optional[ResponseCache]:
+    """
+    Create the response cache configured by environment variables.
+
+    COFFEE_TRENDS_RESPONSE_CACHE selects the backend: "memory" (default) for a
+    per-process cache, "off" to disable caching, or a file path for a SQLite
+    cache shared by all workers. COFFEE_TRENDS_RESPONSE_CACHE_TTL and
+    COFFEE_TRENDS_RESPONSE_CACHE_SIZE set the entry lifetime and capacity.
+
+    Returns:
+        ResponseCache, or None when caching is disabled
+    """
+    backend = os.environ.get(RESPONSE_CACHE_ENV_VAR, "memory").strip()
+    ttl_seconds = float(os.environ.get(RESPONSE_CACHE_TTL_ENV_VAR, DEFAULT_TTL_SECONDS))
+    max_entries = int(os.environ.get(RESPONSE_CACHE_SIZE_ENV_VAR, DEFAULT_MAX_ENTRIES))
+
+    if backend.lower() in ("", "off", "none", "0", "false"):
+        return None
+    if backend.lower() == "memory":
+        return InMemoryResponseCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    return SQLiteResponseCache(backend, ttl_seconds=ttl_seconds, max_entries=max_entries)
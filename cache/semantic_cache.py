@@ -0,0 +1,372 @@
+"""
+Semantic Response Cache
+Answers near-duplicate questions from cache by embedding similarity.
+
+Questions are embedded into unit vectors and kept in a preallocated NumPy
+matrix; a lookup is one matrix-vector product over the entries of the same
+agent and data version, followed by a similarity threshold. The default
+HashingEmbedder needs no model download or network: it hashes word stems and
+(at half weight) word bigrams into a fixed-size vector, after mapping a small
+coffee-domain lexicon onto shared concepts ("Rwandan" and "BAHO" both mean
+Rwandan coffee, "how should ..." asks for a strategy). That catches rewordings
+such as "pricing strategy for Rwandan coffee" vs "how should BAHO price its
+coffee". A small local sentence-transformers model can be plugged in for
+broader paraphrase matching.
+
+Similar wording is not the same question: "price trends in 2023" and "price
+trends in 2024" differ in one word only. Whatever the embedder, a hit
+therefore also requires both questions to name the same key terms (numbers,
+coffee origins and other proper nouns, see key_terms()). A negation is a key
+term too, so "Is Rwandan coffee organic?" never answers "Is Rwandan coffee
+not organic?".
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Union
+
+import numpy as np
+
+from .registry import register_cache
+from .response_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS, QuestionCache
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+DEFAULT_EMBEDDING_DIM = 1024
+# Weight of a bigram feature relative to a word: word order matters less than vocabulary
+BIGRAM_WEIGHT = 0.5
+
+# Number of recent lookup latencies kept for percentile reporting
+LATENCY_SAMPLE_SIZE = 1024
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+# "don't", "isn't": read the contraction as a separate "not"
+_CONTRACTED_NOT_RE = re.compile(r"n['\u2019]t\b", re.IGNORECASE)
+
+_STOPWORDS = frozenset("""
+a an the and or but of to in on for with at by from as is are was were be been being do does did
+what which who whom whose how why when where could would can will shall may might must
+i me my we our you your it its this that these those there their they them he she his her
+about into over than then so if any some more most very just also please tell give
+""".split())
+
+# Coffee-domain words that name the same concept
+_CONCEPTS = {
+    "rwandan": "rwanda",
+    "baho": "rwanda",  # BAHO COFFEE COMPANY, the Rwandan producer both agents advise
+    "kenyan": "kenya",
+    "ethiopian": "ethiopia",
+    "colombian": "colombia",
+    "brazilian": "brazil",
+    "burundian": "burundi",
+    "ugandan": "uganda",
+    "tanzanian": "tanzania",
+    "guatemalan": "guatemala",
+    "vietnamese": "vietnam",
+    "european": "europe",
+    "american": "america",
+    "asian": "asia",
+    "should": "strategy",
+    "strategies": "strategy",
+    "approach": "strategy",
+    "cost": "price",
+    "costs": "price",
+    "no": "not",
+    "never": "not",
+    "without": "not",
+    "cannot": "not",
+}
+
+# Coffee origins and markets, recognized as key terms even when written in lowercase
+_PLACES = frozenset("""
+rwanda kenya ethiopia colombia brazil burundi uganda tanzania guatemala vietnam indonesia honduras
+peru mexico yemen jamaica panama india china japan korea europe america asia africa usa uk
+""".split())
+
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ers", "er", "ed", "es", "s", "e")
+
+
+def _stem(word: str) -> str:
+    """Strip a common English suffix so "pricing", "prices" and "price" share a stem."""
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def _concept(word: str) -> str:
+    """Map a lowercase word onto its domain concept, if it has one."""
+    return _CONCEPTS.get(word, word)
+
+
+def _words(text: str) -> List[str]:
+    """Split text into words, with contracted negations spelled out."""
+    return _WORD_RE.findall(_CONTRACTED_NOT_RE.sub(" not", text))
+
+
+def key_terms(text: str) -> FrozenSet[str]:
+    """
+    Extract the terms two questions must share to be the same question.
+
+    Numbers (years, grades, quantities), coffee origins and markets, acronyms,
+    capitalized words after the first and negations are key terms, mapped onto
+    their domain concept so "Rwandan" and "BAHO" agree.
+
+    Args:
+        text: Raw question text
+
+    Returns:
+        Set of lowercase key terms (empty for a question that names none)
+    """
+    terms = set()
+    for position, word in enumerate(_words(text)):
+        lower = word.lower()
+        concept = _concept(lower)
+        if (
+            any(char.isdigit() for char in word)
+            or concept in _PLACES
+            or concept == "not"
+            or (len(word) > 1 and word.isupper())
+            or (position > 0 and word[0].isupper() and lower not in _STOPWORDS)
+        ):
+            terms.add(concept)
+    return frozenset(terms)
+
+
+def _key_terms_signature(text: str) -> int:
+    """Stable (cross-process) fingerprint of a question's key terms."""
+    return zlib.crc32("\x1f".join(sorted(key_terms(text))).encode("utf-8"))
+
+
+class HashingEmbedder:
+    """
+    Signed feature-hashing embedder over word stems and stem bigrams.
+
+    Deterministic across processes (CRC32, not Python's salted hash), so
+    vectors computed by different workers are comparable.
+    """
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = (_concept(word) for word in _words(text.lower()))
+        return [_stem(word) for word in words if word not in _STOPWORDS]
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        stems = self._features(text)
+        bigrams = [f"{first} {second}" for first, second in zip(stems, stems[1:])]
+        for features, weight in ((stems, 1.0), (bigrams, BIGRAM_WEIGHT)):
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vector[digest % self.dim] += weight if digest & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "SentenceTransformerEmbedder requires the sentence-transformers package: "
+                "pip install sentence-transformers"
+            ) from e
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def __call__(self, text: str) -> np.ndarray:
+        return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class LatencyTracker:
+    """Counts and recent samples of an operation's latency, in milliseconds."""
+
+    def __init__(self, sample_size: int = LATENCY_SAMPLE_SIZE):
+        self._samples: Deque[float] = deque(maxlen=sample_size)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        self._samples.append(elapsed_ms)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def summary(self) -> Dict[str, float]:
+        samples = np.fromiter(self._samples, dtype=np.float64)
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if samples.size else (0.0, 0.0, 0.0)
+        return {
+            "lookups": self.count,
+            "avg_ms": (self.total_ms / self.count) if self.count else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": self.max_ms,
+        }
+
+
+class SemanticResponseCache(QuestionCache):
+    """
+    In-process cache that matches questions by embedding similarity.
+
+    Entries live in fixed slots of a (max_entries x dim) matrix. When the
+    cache is full, the least recently used slot is overwritten. A slot
+    matches a question of the same agent and data version whose key terms
+    are the same and whose embedding is within the similarity threshold.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        super().__init__(ttl_seconds, max_entries)
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.latency = LatencyTracker()
+        dim = getattr(self.embedder, "dim", None) or len(self.embedder("probe"))
+
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._namespaces = np.full(max_entries, -1, dtype=np.int64)
+        self._signatures = np.zeros(max_entries, dtype=np.int64)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._answers: List[Optional[str]] = [None] * max_entries
+        # (agent, version) -> namespace id; only namespaces some slot still holds are kept
+        self._namespace_ids: Dict[str, int] = {}
+        self._next_namespace_id = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _namespace(self, agent_name: str, version: str, create: bool = False) -> Optional[int]:
+        key = f"{agent_name}\x1f{version}"
+        namespace = self._namespace_ids.get(key)
+        if namespace is None and create:
+            # A new version usually retires the old one: forget the namespaces no slot holds any more
+            held = set(np.unique(self._namespaces[: self._size]).tolist())
+            self._namespace_ids = {name: ns for name, ns in self._namespace_ids.items() if ns in held}
+            namespace = self._next_namespace_id
+            self._next_namespace_id += 1
+            self._namespace_ids[key] = namespace
+        return namespace
+
+    def lookup(self, agent_name: str, query: str, version: str = "") -> Optional[str]:
+        started = time.perf_counter()
+        vector = self.embedder(query)
+        signature = _key_terms_signature(query)
+        now = time.monotonic()
+        with self._lock:
+            namespace = self._namespace(agent_name, version)
+            answer = None
+            if self._size and namespace is not None:
+                similarities = self._vectors[: self._size] @ vector
+                valid = (
+                    (self._namespaces[: self._size] == namespace)
+                    & (self._signatures[: self._size] == signature)
+                    & (self._expires_at[: self._size] > now)
+                )
+                similarities = np.where(valid, similarities, -1.0)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    answer = self._answers[best]
+                    self._last_used[best] = now
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.latency.record((time.perf_counter() - started) * 1000)
+        return answer
+
+    def store(self, agent_name: str, query: str, version: str, answer: str) -> None:
+        vector = self.embedder(query)
+        signature = _key_terms_signature(query)
+        now = time.monotonic()
+        with self._lock:
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            # Freed before the namespace lookup, so an overwritten slot no longer holds its old namespace
+            self._namespaces[slot] = -1
+            self._vectors[slot] = vector
+            self._namespaces[slot] = self._namespace(agent_name, version, create=True)
+            self._signatures[slot] = signature
+            self._expires_at[slot] = now + self.ttl_seconds
+            self._last_used[slot] = now
+            self._answers[slot] = answer
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces[:] = -1
+            self._answers = [None] * self.max_entries
+            self._namespace_ids.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return size, hit/miss counters, hit ratio and lookup latency."""
+        stats = super().stats()
+        stats["threshold"] = self.threshold
+        stats["namespaces"] = len(self._namespace_ids)
+        stats.update({f"lookup_{name}": value for name, value in self.latency.summary().items()})
+        return stats
+
+
+# Environment variables configuring the semantic cache shared by both agents
+SEMANTIC_CACHE_ENV_VAR = "COFFEE_SEMANTIC_CACHE"  # "off", "hashing" or "sentence-transformers"
+SEMANTIC_CACHE_MODEL_ENV_VAR = "COFFEE_SEMANTIC_CACHE_MODEL"
+SEMANTIC_CACHE_THRESHOLD_ENV_VAR = "COFFEE_SEMANTIC_CACHE_THRESHOLD"
+
+_shared_cache: Optional[SemanticResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_semantic_cache() -> Optional[SemanticResponseCache]:
+    """
+    Return the process-wide semantic cache configured by environment variables.
+
+    COFFEE_SEMANTIC_CACHE selects the embedder: "off" (default), "hashing" for
+    the built-in HashingEmbedder, or "sentence-transformers" for a local model
+    named by COFFEE_SEMANTIC_CACHE_MODEL. COFFEE_SEMANTIC_CACHE_THRESHOLD sets
+    the cosine similarity needed for a hit. Entries are namespaced by agent, so
+    both agents can share one instance.
+
+    Returns:
+        SemanticResponseCache, or None when disabled
+    """
+    global _shared_cache
+    backend = os.environ.get(SEMANTIC_CACHE_ENV_VAR, "off").strip().lower()
+    if backend in ("", "off", "none", "0", "false"):
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            if backend == "sentence-transformers":
+                embedder = SentenceTransformerEmbedder(
+                    os.environ.get(SEMANTIC_CACHE_MODEL_ENV_VAR, "all-MiniLM-L6-v2")
+                )
+            elif backend in ("hashing", "on", "1", "true"):
+                embedder = HashingEmbedder()
+            else:
+                raise ValueError(
+                    f"Unknown {SEMANTIC_CACHE_ENV_VAR} value '{backend}'. "
+                    "Use 'off', 'hashing' or 'sentence-transformers'."
+                )
+            threshold = float(os.environ.get(SEMANTIC_CACHE_THRESHOLD_ENV_VAR, DEFAULT_SIMILARITY_THRESHOLD))
+            _shared_cache = SemanticResponseCache(embedder=embedder, threshold=threshold)
+            register_cache("semantic_response", _shared_cache)
+        return _shared_cache
@@ -0,0 +1,25 @@
+"""
+Clients Package
+"""
+
+from .batch_runner import BatchResult, BatchRunner
+from .load_balancer import BalancedTransport
+from .model_scheduler import ModelScheduler, create_gemini, shared_model_scheduler
+from .http_pool import close_shared_http_clients, create_http_client, shared_http_client
+from .remote_agent import AgentCardCache, CachingRemoteA2aAgent, RemoteKnowledgeVersion, shared_agent_card_cache
+
+__all__ = [
+    "BatchResult",
+    "BatchRunner",
+    "BalancedTransport",
+    "ModelScheduler",
+    "create_gemini",
+    "shared_model_scheduler",
+    "close_shared_http_clients",
+    "create_http_client",
+    "shared_http_client",
+    "AgentCardCache",
+    "CachingRemoteA2aAgent",
+    "RemoteKnowledgeVersion",
+    "shared_agent_card_cache",
+]
@@ -0,0 +1,79 @@
+"""
+Batch Client Command Line
+Usage:
+    python -m clients batch <questions.txt> [--concurrency N] [--output answers.jsonl] [--agent baho|trends] [--stream]
+
+Reads one question per line (blank lines and lines starting with # are
+skipped) and writes one JSON object per answer, in completion order, to the
+output file or stdout. The BAHO agent needs the Coffee Trends Agent server
+running; --agent trends answers with the Coffee Trends Agent in-process.
+With --stream, models stream their output and each answer records the time
+to its first words (first_token).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Iterator
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from clients.batch_runner import DEFAULT_CONCURRENCY, BatchRunner
+
+
+def read_questions(path: str) -> Iterator[str]:
+    """Yield the questions in a text file, one per non-empty, non-comment line."""
+    with open(path, encoding="utf-8") as questions:
+        for line in questions:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+async def run_batch(args) -> int:
+    if args.agent == "trends":
+        from agents import build_coffee_trends_agent
+        agent = build_coffee_trends_agent()
+    else:
+        from agents import build_baho_strategy_agent
+        agent = build_baho_strategy_agent()
+
+    runner = BatchRunner(agent, app_name=f"{agent.name}_batch", concurrency=args.concurrency, streaming=args.stream)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    answered = failed = 0
+    try:
+        async for result in runner.run(read_questions(args.questions)):
+            output.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+            output.flush()
+            answered += 1
+            failed += not result.ok
+            print(f"[{answered}] {'✅' if result.ok else '❌'} {result.elapsed:.1f}s  {result.query[:70]}", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        await runner.close()
+
+    print(f"Answered {answered} question(s), {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m clients", description="Ask an agent many questions concurrently.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    batch = commands.add_parser("batch", help="answer every question in a text file")
+    batch.add_argument("questions", help="text file with one question per line")
+    batch.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                       help=f"questions in flight (default {DEFAULT_CONCURRENCY})")
+    batch.add_argument("--output", help="JSONL file to write answers to (default stdout)")
+    batch.add_argument("--agent", choices=["baho", "trends"], default="baho", help="agent to ask (default baho)")
+    batch.add_argument("--stream", action="store_true", help="stream model output and record time to first words")
+    args = parser.parse_args(argv)
+    return asyncio.run(run_batch(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Batch Query Runner
+Asks an agent many independent questions concurrently and yields each answer
+as soon as it is ready.
+
+One Runner and one session service are shared by every question; each
+question gets a fresh session that is deleted once it is answered, so a batch
+of hundreds of questions keeps only the in-flight sessions in memory. A fixed
+pool of worker tasks bounds how many questions are in flight, and a failing
+question is reported in its result instead of stopping the batch.
+
+With streaming=True the agents run with server-sent-event streaming: model
+output (including the Coffee Trends Agent's, relayed chunk by chunk over A2A)
+arrives as partial events, stream() yields it as it is generated, and every
+BatchResult records the time to the first answer text.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+
+from sessions import session_service_from_env
+
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class BatchResult:
+    """Answer to one question of a batch."""
+
+    index: int
+    query: str
+    answer: str
+    elapsed: float
+    error: Optional[str] = None
+    first_token: Optional[float] = None  # seconds until the first answer text
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class BatchRunner:
+    """
+    Runs questions against one agent with a bounded number in flight.
+
+    Example:
+        runner = BatchRunner(baho_strategy_agent, concurrency=16)
+        async for result in runner.run(questions):
+            print(result.index, result.answer)
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        app_name: str = "baho_strategy_app",
+        user_id: str = "batch_user",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_service: Optional[BaseSessionService] = None,
+        streaming: bool = False,
+    ):
+        """
+        Args:
+            agent: Agent answering the questions
+            app_name: Application name sessions are created under
+            user_id: User the sessions belong to
+            concurrency: Maximum number of questions in flight
+            session_service: Session storage (default: session_service_from_env())
+            streaming: Stream model output as it is generated
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self.app_name = app_name
+        self.user_id = user_id
+        self.concurrency = concurrency
+        self.session_service = session_service or session_service_from_env()
+        self.runner = Runner(agent=agent, app_name=app_name, session_service=self.session_service)
+        self.run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+
+    async def _answer_text(self, session_id: str, query: str) -> AsyncIterator[str]:
+        """Yield the answer's text: partial chunks as they arrive, otherwise whole final responses."""
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        streamed = False
+        async for event in self.runner.run_async(
+            user_id=self.user_id, session_id=session_id, new_message=message, run_config=self.run_config
+        ):
+            if not event.content or not event.content.parts:
+                continue
+            text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+            if event.partial:
+                if text:
+                    streamed = True
+                    yield text
+            elif event.is_final_response():
+                # A final response repeats the chunks streamed before it
+                if text and not streamed:
+                    yield text
+                streamed = False
+            else:
+                streamed = False
+
+    async def stream(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Answer one question, yielding the answer's text as it is generated.
+
+        Args:
+            query: Question text
+            session_id: Existing session to continue (default: a new session,
+                        deleted once the question is answered)
+
+        Yields:
+            Pieces of the answer, in order; with streaming off, whole responses
+        """
+        if session_id is not None:
+            async for text in self._answer_text(session_id, query):
+                yield text
+            return
+
+        session_id = f"batch_{uuid.uuid4().hex}"
+        await self.session_service.create_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=session_id
+        )
+        try:
+            async for text in self._answer_text(session_id, query):
+                yield text
+        finally:
+            await self.session_service.delete_session(
+                app_name=self.app_name, user_id=self.user_id, session_id=session_id
+            )
+
+    async def ask(self, query: str, index: int = 0) -> BatchResult:
+        """
+        Answer one question in a new session.
+
+        Args:
+            query: Question text
+            index: Position of the question in its batch
+
+        Returns:
+            BatchResult; errors are captured in result.error
+        """
+        started = time.perf_counter()
+        first_token = None
+        answer_parts: List[str] = []
+        error = None
+        try:
+            async for text in self.stream(query):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                answer_parts.append(text)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return BatchResult(index, query, "".join(answer_parts), time.perf_counter() - started, error, first_token)
+
+    async def run(self, queries: Iterable[str]) -> AsyncIterator[BatchResult]:
+        """
+        Answer questions concurrently, yielding results in completion order.
+
+        Questions are pulled from the iterable only as workers free up, so it
+        may be a lazy stream. Leaving the loop early cancels the questions
+        still in flight.
+
+        Args:
+            queries: Questions to ask
+
+        Yields:
+            BatchResult for every question, each as soon as it is answered
+        """
+        pending = iter(enumerate(queries))
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def worker() -> None:
+            try:
+                for index, query in pending:
+                    await results.put(await self.ask(query, index))
+            finally:
+                await results.put(done)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            remaining = len(workers)
+            while remaining:
+                result = await results.get()
+                if result is done:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run_all(self, queries: Iterable[str]) -> List[BatchResult]:
+        """Answer questions concurrently and return the results in input order."""
+        results = [result async for result in self.run(queries)]
+        return sorted(results, key=lambda result: result.index)
+
+    async def close(self) -> None:
+        """Release the runner's resources."""
+        await self.runner.close()
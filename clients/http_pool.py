@@ -0,0 +1,115 @@
+"""
+Shared HTTP Client
+One pooled, keep-alive httpx.AsyncClient per process for agent-to-agent calls.
+
+Every RemoteA2aAgent built by the factories shares this client, so A2A calls
+reuse warm TCP/TLS connections instead of each agent instance opening its own.
+Pool size, keep-alive expiry, timeout and HTTP/2 come from AgentConfig. When
+COFFEE_TRENDS_URL lists several trends servers, the client balances requests
+over them (see clients/load_balancer.py).
+
+httpx connections belong to the event loop that opened them; a process is
+expected to run its agents on one loop (as the demos, the batch runner and
+uvicorn do).
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import httpx
+
+from config import AgentConfig
+
+_clients: Dict[Tuple, httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _settings_key(config: AgentConfig) -> Tuple:
+    return (
+        config.http_max_connections,
+        config.http_max_keepalive_connections,
+        config.http_keepalive_expiry,
+        config.http_timeout,
+        config.http2,
+        config.coffee_trends_urls,
+        config.balancer,
+        config.circuit_failure_threshold,
+        config.circuit_reset_timeout,
+        config.health_check_interval,
+        config.telemetry,
+    )
+
+
+def create_http_client(config: AgentConfig) -> httpx.AsyncClient:
+    """
+    Create a pooled, keep-alive async HTTP client.
+
+    With more than one URL in config.coffee_trends_urls, requests to any of
+    them are balanced over all of them by a BalancedTransport. Unless
+    telemetry is off, requests are traced and carry their trace context.
+
+    Args:
+        config: Settings with the http_* pool and timeout options
+
+    Returns:
+        httpx.AsyncClient
+
+    Raises:
+        ImportError: If HTTP/2 is requested but the h2 package is missing
+    """
+    if config.http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError as e:
+            raise ImportError("HTTP/2 requires the h2 package: pip install 'httpx[http2]'") from e
+    limits = httpx.Limits(
+        max_connections=config.http_max_connections,
+        max_keepalive_connections=config.http_max_keepalive_connections,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(config.http_timeout)
+    transport = httpx.AsyncHTTPTransport(http2=config.http2, limits=limits)
+    if len(config.coffee_trends_urls) > 1:
+        from clients.load_balancer import BalancedTransport
+
+        transport = BalancedTransport(
+            config.coffee_trends_urls,
+            transport,
+            policy=config.balancer,
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_timeout,
+            health_check_interval=config.health_check_interval,
+        )
+    if config.telemetry != "off":
+        from telemetry import TracingTransport
+
+        # Outermost, so a request retried on another replica is still one client span
+        transport = TracingTransport(transport)
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+def shared_http_client(config: AgentConfig) -> httpx.AsyncClient:
+    """
+    Return the process-wide client for these settings, creating it on first use.
+
+    Args:
+        config: Settings with the http_* pool and timeout options
+
+    Returns:
+        httpx.AsyncClient shared by every caller with the same settings
+    """
+    key = _settings_key(config)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = _clients[key] = create_http_client(config)
+        return client
+
+
+async def close_shared_http_clients() -> None:
+    """Close every shared client, e.g. when an application shuts down."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.aclose()
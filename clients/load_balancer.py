@@ -0,0 +1,307 @@
+"""
+Replica Load Balancer
+httpx transport that spreads A2A calls over several Coffee Trends Agent servers.
+
+Requests addressed to any configured replica go to the replica picked by the
+balancing policy:
+    p2c                 Pick two available replicas at random and use the one
+                        with fewer requests in flight (power of two choices).
+    least_outstanding   Use the available replica with the fewest requests in flight.
+A request counts as in flight until its (possibly streamed) response is
+closed, so a replica that answers slowly accumulates requests and stops being
+picked, without the balancer measuring latency.
+
+Every replica has a circuit breaker. After circuit_failure_threshold
+consecutive failures (connection errors, timeouts, 502/503/504) the replica is
+taken out of rotation for circuit_reset_timeout seconds; then its agent card
+endpoint is probed and it rejoins only if the probe succeeds. Every replica is
+also probed every health_check_interval seconds; a failed probe of a replica
+in rotation counts toward the same failure threshold. A request that never reached
+a replica (connection refused, connect timeout) or was turned away with 503 is
+retried once on each other replica in rotation; a 503 with no replica left to
+try is returned as it is.
+
+Requests to hosts that are not replicas pass through unchanged.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("p2c", "least_outstanding")
+AGENT_CARD_PATH = "/.well-known/agent-card.json"
+FAILURE_STATUS_CODES = (502, 503, 504)
+RETRY_STATUS_CODES = (503,)
+PROBE_TIMEOUT_SECONDS = 2.0
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+Origin = Tuple[str, str, int]
+
+
+def url_origin(url) -> Origin:
+    """(scheme, host, port) of a URL, with the scheme's default port filled in."""
+    url = httpx.URL(str(url))
+    return url.scheme, url.host.lower(), url.port or _DEFAULT_PORTS.get(url.scheme, 0)
+
+
+class Replica:
+    """One trends server and its circuit breaker state."""
+
+    CLOSED = "closed"  # in rotation
+    OPEN = "open"  # out of rotation until a probe succeeds
+
+    def __init__(self, url: str):
+        self.base_url = httpx.URL(url.rstrip("/"))
+        self.origin = url_origin(self.base_url)
+        self.state = self.CLOSED
+        self.open_until = 0.0
+        self.probing = False
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.state == self.CLOSED
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": str(self.base_url),
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class _InFlightStream(httpx.AsyncByteStream):
+    """Response body that releases its replica's in-flight slot when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, replica: Replica):
+        self._stream = stream
+        self._replica = replica
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._released:
+            self._released = True
+            self._replica.outstanding -= 1
+        await self._stream.aclose()
+
+
+class BalancedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport that balances requests over replicas of one service.
+
+    Example:
+        transport = BalancedTransport(
+            ["http://trends-1:8001", "http://trends-2:8001"],
+            httpx.AsyncHTTPTransport(limits=httpx.Limits(max_keepalive_connections=20)),
+        )
+        client = httpx.AsyncClient(transport=transport)
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        policy: str = "p2c",
+        failure_threshold: int = 3,
+        reset_timeout: float = 10.0,
+        health_check_interval: float = 10.0,
+    ):
+        """
+        Args:
+            urls: Base URLs of the replicas
+            transport: Transport that sends the requests (default: a new AsyncHTTPTransport)
+            policy: "p2c" or "least_outstanding"
+            failure_threshold: Consecutive failures that open a replica's circuit
+            reset_timeout: Seconds an open circuit waits before its replica is probed
+            health_check_interval: Seconds between probes of every replica (0 to disable)
+        """
+        if not urls:
+            raise ValueError("at least one replica URL is required")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
+        self.replicas = [Replica(url) for url in urls]
+        self.policy = policy
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.health_check_interval = health_check_interval
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._by_origin = {replica.origin: replica for replica in self.replicas}
+        self._random = random.Random()
+        self._next_health_check = time.monotonic() + health_check_interval
+        self._probes: Set[asyncio.Task] = set()
+
+    @property
+    def origins(self) -> Set[Origin]:
+        return set(self._by_origin)
+
+    def _choose(self, exclude: Set[Replica]) -> Optional[Replica]:
+        candidates = [replica for replica in self.replicas if replica.available and replica not in exclude]
+        if not candidates:
+            return None
+        if self.policy == "p2c" and len(candidates) > 2:
+            first, second = self._random.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+        return min(candidates, key=lambda replica: (replica.outstanding, replica.requests))
+
+    def _record_success(self, replica: Replica) -> None:
+        replica.consecutive_failures = 0
+
+    def _record_failure(self, replica: Replica) -> None:
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.available and replica.consecutive_failures >= self.failure_threshold:
+            self._open(replica)
+
+    def _open(self, replica: Replica) -> None:
+        if replica.available:
+            logger.warning("Replica %s taken out of rotation for %.0fs", replica.base_url, self.reset_timeout)
+        replica.state = Replica.OPEN
+        replica.open_until = time.monotonic() + self.reset_timeout
+
+    def _close(self, replica: Replica) -> None:
+        if not replica.available:
+            logger.info("Replica %s is healthy again", replica.base_url)
+        replica.state = Replica.CLOSED
+        replica.consecutive_failures = 0
+
+    def _due_for_probe(self) -> List[Replica]:
+        now = time.monotonic()
+        due = [r for r in self.replicas if not r.available and not r.probing and now >= r.open_until]
+        if self.health_check_interval > 0 and now >= self._next_health_check:
+            self._next_health_check = now + self.health_check_interval
+            due = [r for r in self.replicas if not r.probing and (r.available or now >= r.open_until)]
+        return due
+
+    async def _probe(self, replica: Replica) -> bool:
+        replica.probing = True
+        request = httpx.Request(
+            "GET",
+            replica.base_url.copy_with(path=AGENT_CARD_PATH),
+            extensions={"timeout": httpx.Timeout(PROBE_TIMEOUT_SECONDS).as_dict()},
+        )
+        try:
+            response = await self._transport.handle_async_request(request)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            healthy = response.status_code == 200
+        except httpx.TransportError:
+            healthy = False
+        finally:
+            replica.probing = False
+        if healthy:
+            self._close(replica)
+        elif replica.available:
+            # A periodic probe of a replica in rotation counts like a failed request
+            self._record_failure(replica)
+        else:
+            self._open(replica)
+        return healthy
+
+    async def check_health(self, replicas: Optional[Sequence[Replica]] = None) -> Dict[str, bool]:
+        """
+        Probe the agent card endpoint of replicas and update their circuits.
+
+        Args:
+            replicas: Replicas to probe (default: all)
+
+        Returns:
+            Dictionary mapping replica URL to whether its probe succeeded
+        """
+        replicas = list(self.replicas if replicas is None else replicas)
+        results = await asyncio.gather(*(self._probe(replica) for replica in replicas))
+        return {str(replica.base_url): healthy for replica, healthy in zip(replicas, results)}
+
+    def _schedule_probes(self) -> None:
+        for replica in self._due_for_probe():
+            replica.probing = True
+            task = asyncio.ensure_future(self._probe(replica))
+            self._probes.add(task)
+            task.add_done_callback(self._probes.discard)
+
+    @staticmethod
+    def _retarget(request: httpx.Request, replica: Replica) -> httpx.Request:
+        base = replica.base_url
+        url = request.url.copy_with(scheme=base.scheme, host=base.host, port=base.port)
+        headers = request.headers.copy()
+        headers["Host"] = url.netloc.decode("ascii")
+        return httpx.Request(request.method, url, headers=headers, stream=request.stream, extensions=request.extensions)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if url_origin(request.url) not in self._by_origin:
+            return await self._transport.handle_async_request(request)
+
+        self._schedule_probes()
+        # Only a body held in memory can be sent a second time
+        retryable = isinstance(request.stream, httpx.ByteStream)
+        tried: Set[Replica] = set()
+        last_error: Optional[Exception] = None
+        # Replica a 503 is retried on, picked before the 503 is given up
+        retry_on: Optional[Replica] = None
+        while True:
+            replica, retry_on = retry_on or self._choose(tried), None
+            if replica is None and not tried:
+                # Every circuit is open: probe the replicas that are due instead of failing outright
+                await self.check_health(self._due_for_probe())
+                replica = self._choose(tried)
+            if replica is None:
+                if last_error is not None:
+                    raise last_error
+                raise httpx.ConnectError("No healthy Coffee Trends Agent replica available", request=request)
+            tried.add(replica)
+
+            replica.outstanding += 1
+            replica.requests += 1
+            try:
+                response = await self._transport.handle_async_request(self._retarget(request, replica))
+            except httpx.TransportError as e:
+                replica.outstanding -= 1
+                self._record_failure(replica)
+                if retryable and isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    logger.info("Replica %s unreachable (%s); trying another", replica.base_url, e)
+                    last_error = e
+                    continue
+                raise
+            except BaseException:
+                # Cancelled or failed otherwise: the request no longer occupies the replica
+                replica.outstanding -= 1
+                raise
+
+            if response.status_code in FAILURE_STATUS_CODES:
+                self._record_failure(replica)
+                if retryable and response.status_code in RETRY_STATUS_CODES:
+                    # Retry only where another replica can take it; otherwise the 503 is the answer
+                    retry_on = self._choose(tried)
+                if retry_on is not None:
+                    replica.outstanding -= 1
+                    await response.aclose()
+                    continue
+            else:
+                self._record_success(replica)
+            response.stream = _InFlightStream(response.stream, replica)
+            return response
+
+    def stats(self) -> Dict:
+        return {"policy": self.policy, "replicas": [replica.to_dict() for replica in self.replicas]}
+
+    async def aclose(self) -> None:
+        for task in list(self._probes):
+            task.cancel()
+        await self._transport.aclose()
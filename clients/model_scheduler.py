@@ -0,0 +1,412 @@
+"""
+Model Request Scheduler
+Paces, limits and retries the agents' Gemini calls so rate limits degrade throughput smoothly.
+
+google.genai's own retry (HttpRetryOptions) retries every request on its own:
+with exponential backoff and at most a second of jitter, a burst of 429s makes
+every request in flight sleep and retry at nearly the same moments, each round
+of retries runs into the quota again, and new requests keep arriving
+meanwhile. A ModelScheduler, shared by every agent in the process,
+coordinates the calls instead:
+
+    token bucket    at most model_rate_limit calls per second (bursts of
+                    model_burst), when a quota is known
+    AIMD limiter    calls in flight are capped by a limit that grows by one per
+                    limit's worth of successful calls and shrinks by a quarter
+                    on a 429 (once per burst: 429s of calls admitted before
+                    the last decrease are ignored), between
+                    model_min_concurrency and model_max_concurrency
+    pause           a Retry-After (header, or RetryInfo in the error details)
+                    pauses every new call until it has passed, not just the
+                    throttled one
+    backoff         retries (of retry_http_status_codes, timeouts and connection
+                    errors) wait a random delay up to
+                    retry_initial_delay * 2^(attempt - 1), capped at
+                    retry_max_delay, so they spread out instead of arriving
+                    together
+
+benchmarks/model_rate_limit.py compares the two against a simulated quota.
+
+Only calls that have not yielded a response yet are retried; a stream that
+fails halfway raises as before. ScheduledGemini routes a Gemini model's calls
+through the scheduler; create_gemini() builds one from AgentConfig.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, AsyncGenerator, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import httpx
+
+from config import AgentConfig
+from telemetry import MODEL_RETRIES, MODEL_WAIT_SECONDS
+
+if TYPE_CHECKING:
+    from google.adk.models.google_llm import Gemini
+    from google.adk.models.llm_request import LlmRequest
+    from google.adk.models.llm_response import LlmResponse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THROTTLED_STATUS = 429
+# Share of the concurrency limit kept after a 429
+DECREASE_FACTOR = 0.75
+_RETRY_DELAY_RE = re.compile(r"^\s*([0-9.]+)s\s*$")
+# Connection failures and timeouts the google.genai client would itself retry
+TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.ConnectError)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a google.genai APIError (or anything with an int .code)."""
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read how long the server asked clients to wait before retrying.
+
+    Args:
+        error: Error raised by the model call
+
+    Returns:
+        Seconds from the Retry-After header or a google.rpc.RetryInfo detail, or None
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass  # an HTTP date; fall back to the error details
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details if isinstance(details, list) else ():
+        if isinstance(detail, dict) and detail.get("@type", "").endswith("google.rpc.RetryInfo"):
+            match = _RETRY_DELAY_RE.match(str(detail.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Paces calls to a steady rate with bounded bursts; callers reserve their token and wait their turn."""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Tokens the bucket holds when idle
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go negative: later callers queue behind earlier reservations
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps calls in flight with a limit that grows additively on success and shrinks multiplicatively on throttling."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        """
+        Args:
+            initial: Starting limit
+            minimum: Lowest limit after throttling
+            maximum: Highest limit after successes
+        """
+        if not 1 <= minimum <= maximum:
+            raise ValueError("expected 1 <= minimum <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        # Bumped on every decrease; calls remember the epoch they were admitted in
+        self.epoch = 0
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller gave up
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Slots go to waiters in arrival order, so new callers cannot overtake them
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_throttle(self, epoch: int) -> None:
+        """Lower the limit for a throttled call admitted in `epoch`, unless it was lowered since."""
+        # Calls that started before the last decrease were part of the same burst
+        if epoch == self.epoch:
+            self.epoch += 1
+            self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+            logger.info("Model concurrency limit lowered to %d after a 429", int(self.limit))
+
+
+class ModelScheduler:
+    """
+    Admission, pacing and retries for model calls shared by every agent in a process.
+
+    Its limiter hands slots to waiting calls through asyncio futures, so the
+    calls of one scheduler run on one event loop at a time (the server's, or
+    the demo's).
+    """
+
+    def __init__(
+        self,
+        rate_limit: float = 0.0,
+        burst: int = 10,
+        max_concurrency: int = 32,
+        min_concurrency: int = 1,
+        attempts: int = 5,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        retry_status_codes: Iterable[int] = (429, 500, 503, 504),
+    ):
+        """
+        Args:
+            rate_limit: Calls per second to stay under (0: no pacing)
+            burst: Calls allowed at once after an idle period, with rate_limit
+            max_concurrency: Highest (and starting) number of calls in flight
+            min_concurrency: Lowest number of calls in flight after throttling
+            attempts: Tries per call, the first included
+            initial_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Backoff ceiling for later retries, in seconds
+            retry_status_codes: HTTP statuses worth retrying
+        """
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit > 0 else None
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency, min_concurrency, max_concurrency)
+        self.attempts = max(1, attempts)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self._resume_at = 0.0
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number `attempt` (1 for the first retry)."""
+        return random.uniform(0, min(self.max_delay, self.initial_delay * 2 ** (attempt - 1)))
+
+    def _retry_delay(self, error: BaseException, attempt: int, epoch: int) -> Optional[float]:
+        """Seconds to wait before retrying after error, or None if it should be raised."""
+        if attempt >= self.attempts:
+            return None
+        status = _status_code(error)
+        if status not in self.retry_status_codes and not isinstance(error, TRANSIENT_ERRORS):
+            return None
+        delay = self.backoff(attempt)
+        if status == THROTTLED_STATUS:
+            self.throttled += 1
+            self.limiter.on_throttle(epoch)
+            retry_after = retry_after_seconds(error)
+            if retry_after is not None:
+                # Everyone, this call included, waits out the server's Retry-After in _admit();
+                # this call only adds jitter on top, so it does not wait it out twice
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+                delay = random.uniform(0, self.initial_delay)
+        return delay
+
+    async def _admit(self) -> None:
+        started = time.perf_counter()
+        await self.limiter.acquire()
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            # Checked last, so calls that were already waiting also sit out a Retry-After
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause <= 0:
+                    break
+                await asyncio.sleep(pause + random.uniform(0, self.initial_delay))
+        except BaseException:
+            self.limiter.release()
+            raise
+        MODEL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+    async def stream(self, call: Callable[[], AsyncIterator[T]]) -> AsyncGenerator[T, None]:
+        """
+        Run a streaming model call under the scheduler, retrying it if it fails before its first item.
+
+        Args:
+            call: Starts the call and returns its response stream; called again for each retry
+
+        Yields:
+            The call's items
+        """
+        attempt = 1
+        while True:
+            await self._admit()
+            epoch = self.limiter.epoch
+            self.calls += 1
+            started_streaming = False
+            delay: Optional[float] = None
+            try:
+                async for item in call():
+                    started_streaming = True
+                    yield item
+                self.limiter.on_success()
+                return
+            except Exception as e:
+                delay = None if started_streaming else self._retry_delay(e, attempt, epoch)
+                if delay is None:
+                    raise
+                self.retries += 1
+                reason = str(_status_code(e) or type(e).__name__)
+                MODEL_RETRIES.inc(status=reason)
+                logger.debug(
+                    "Model call failed with %s (attempt %d/%d); retrying in %.1fs", reason, attempt, self.attempts, delay
+                )
+            finally:
+                self.limiter.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current concurrency limit, calls in flight and call counters."""
+        return {
+            "concurrency_limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+
+def _settings_key(config: AgentConfig) -> Tuple:
+    return (
+        config.model_rate_limit,
+        config.model_burst,
+        config.model_max_concurrency,
+        config.model_min_concurrency,
+        config.retry_attempts,
+        config.retry_initial_delay,
+        config.retry_max_delay,
+        config.retry_http_status_codes,
+    )
+
+
+_schedulers: Dict[Tuple, ModelScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def model_schedulers() -> List[ModelScheduler]:
+    """Return the schedulers created in this process so far."""
+    with _schedulers_lock:
+        return list(_schedulers.values())
+
+
+def shared_model_scheduler(config: AgentConfig) -> ModelScheduler:
+    """
+    Return the process-wide scheduler for these settings, creating it on first use.
+
+    Args:
+        config: Settings with the model_* limits and retry_* options
+
+    Returns:
+        ModelScheduler shared by every agent built with the same settings
+    """
+    key = _settings_key(config)
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = ModelScheduler(
+                rate_limit=config.model_rate_limit,
+                burst=config.model_burst,
+                max_concurrency=config.model_max_concurrency,
+                min_concurrency=config.model_min_concurrency,
+                attempts=config.retry_attempts,
+                initial_delay=config.retry_initial_delay,
+                max_delay=config.retry_max_delay,
+                retry_status_codes=config.retry_http_status_codes,
+            )
+    return scheduler
+
+
+def _scheduled_gemini_class():
+    from google.adk.models.google_llm import Gemini
+    from pydantic import PrivateAttr
+
+    class ScheduledGemini(Gemini):
+        """Gemini model whose calls are admitted, paced and retried by a ModelScheduler."""
+
+        _scheduler: Optional[ModelScheduler] = PrivateAttr(default=None)
+
+        async def generate_content_async(
+            self, llm_request: "LlmRequest", stream: bool = False
+        ) -> AsyncGenerator["LlmResponse", None]:
+            parent = super()
+            async for response in self._scheduler.stream(lambda: parent.generate_content_async(llm_request, stream)):
+                yield response
+
+    return ScheduledGemini
+
+
+_gemini_class = None
+
+
+def create_gemini(config: AgentConfig) -> "Gemini":
+    """
+    Create a Gemini model for an agent, scheduled by the process's shared ModelScheduler.
+
+    Args:
+        config: Model name, limits and retry settings
+
+    Returns:
+        ScheduledGemini (a google.adk Gemini) whose own HTTP retries are off
+    """
+    global _gemini_class
+    if _gemini_class is None:
+        _gemini_class = _scheduled_gemini_class()
+    model = _gemini_class(model=config.model, retry_options=config.retry_options())
+    model._scheduler = shared_model_scheduler(config)
+    return model
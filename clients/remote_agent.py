@@ -0,0 +1,221 @@
+"""
+Remote Agent with a Cached Agent Card
+RemoteA2aAgent that shares agent cards through a process-wide TTL cache.
+
+A plain RemoteA2aAgent fetches its agent card on first use and keeps it for
+the life of the instance: every new instance pays a card fetch, and a
+long-running process never notices a changed card. CachingRemoteA2aAgent
+resolves cards through an AgentCardCache instead, so all instances in a
+process share one fetch per URL, concurrent first calls wait for a single
+request, and the card is fetched again once its time-to-live has passed.
+
+When the trends agent runs as several replicas behind a balancing HTTP client,
+the card may come from any of them and name that replica as its RPC endpoint.
+ADK only accepts a card naming the origin it was requested from, so an agent
+given replica_urls also accepts cards naming any of the configured replicas.
+
+RemoteKnowledgeVersion tracks the knowledge base version the remote trends
+server is serving, for caches of answers built from its replies.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+from a2a.client.card_resolver import A2ACardResolver
+from google.adk.a2a._compat import agent_card_rpc_urls
+from google.adk.agents.remote_a2a_agent import AgentCardResolutionError, RemoteA2aAgent
+
+from cache import register_cache
+from clients.http_pool import shared_http_client
+from clients.load_balancer import url_origin
+from config import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CARD_TTL_SECONDS = 300.0
+# How long a remote knowledge version is trusted before the server is asked again
+DEFAULT_VERSION_TTL_SECONDS = 30.0
+# Trends server route whose responses carry the version of the knowledge base it serves
+KNOWLEDGE_VERSION_PATH = "/reports/strategy"
+KNOWLEDGE_VERSION_HEADER = "X-Knowledge-Version"
+
+
+class AgentCardCache:
+    """Agent cards by URL, each kept for ttl_seconds after it was fetched."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_CARD_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.fetches = 0
+        self._entries: Dict[str, Tuple[float, object]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def is_fresh(self, url: str) -> bool:
+        """True if a card for url is cached and has not expired."""
+        entry = self._entries.get(url)
+        return entry is not None and entry[0] > time.monotonic()
+
+    async def get(self, url: str, client: httpx.AsyncClient):
+        """
+        Return the agent card at url, fetching it if absent or expired.
+
+        Args:
+            url: Full agent card URL
+            client: HTTP client to fetch with
+
+        Returns:
+            AgentCard
+        """
+        entry = self._entries.get(url)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        # Callers arriving while a fetch is running share its result
+        future = self._in_flight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(url, client))
+            self._in_flight[url] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        return await asyncio.shield(future)
+
+    async def _fetch(self, url: str, client: httpx.AsyncClient):
+        parsed = urlparse(url)
+        resolver = A2ACardResolver(httpx_client=client, base_url=f"{parsed.scheme}://{parsed.netloc}")
+        card = await resolver.get_agent_card(relative_card_path=parsed.path)
+        with self._lock:
+            self.fetches += 1
+            self._entries[url] = (time.monotonic() + self.ttl_seconds, card)
+        return card
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Forget the card for url, or every card."""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "fetches": self.fetches,
+        }
+
+
+_card_caches: Dict[float, AgentCardCache] = {}
+_card_caches_lock = threading.Lock()
+
+
+def shared_agent_card_cache(ttl_seconds: float = DEFAULT_CARD_TTL_SECONDS) -> AgentCardCache:
+    """Return the process-wide agent card cache for a TTL, creating it on first use."""
+    with _card_caches_lock:
+        if ttl_seconds not in _card_caches:
+            name = "agent_cards" if not _card_caches else f"agent_cards_{ttl_seconds:g}s"
+            _card_caches[ttl_seconds] = AgentCardCache(ttl_seconds)
+            register_cache(name, _card_caches[ttl_seconds])
+        return _card_caches[ttl_seconds]
+
+
+class CachingRemoteA2aAgent(RemoteA2aAgent):
+    """RemoteA2aAgent that resolves URL agent cards through an AgentCardCache."""
+
+    def __init__(
+        self,
+        *args,
+        card_cache: Optional[AgentCardCache] = None,
+        replica_urls: Sequence[str] = (),
+        **kwargs,
+    ):
+        """
+        Args:
+            card_cache: Cache to resolve cards through (default: the shared cache)
+            replica_urls: Base URLs of every replica of the remote agent, when its
+                          calls are balanced over several servers
+            *args, **kwargs: RemoteA2aAgent arguments
+        """
+        super().__init__(*args, **kwargs)
+        self._card_cache = card_cache or shared_agent_card_cache()
+        self._replica_origins = {url_origin(url) for url in replica_urls}
+
+    async def _resolve_agent_card_from_url(self, url: str, ctx=None):
+        try:
+            return await self._card_cache.get(url, await self._ensure_httpx_client())
+        except Exception as e:
+            raise AgentCardResolutionError(f"Failed to resolve AgentCard from URL {url}: {e}") from e
+
+    async def _ensure_resolved(self, ctx=None):
+        source = self._agent_card_source
+        if (
+            self._agent_card is not None
+            and isinstance(source, str)
+            and source.startswith(("http://", "https://"))
+            and not self._card_cache.is_fresh(source)
+        ):
+            # The card's TTL has passed: resolve it again and build a client for it.
+            # The HTTP client is shared, so the old A2A client needs no cleanup.
+            self._agent_card = None
+            self._a2a_client = None
+            self._is_resolved = False
+        return await super()._ensure_resolved(ctx)
+
+    def _validate_card_rpc_targets(self, agent_card) -> None:
+        # Any configured replica may have served the card; the operator chose them all
+        if self._replica_origins and all(
+            url_origin(url) in self._replica_origins for url in agent_card_rpc_urls(agent_card)
+        ):
+            return
+        super()._validate_card_rpc_targets(agent_card)
+
+
+class RemoteKnowledgeVersion:
+    """
+    Knowledge base version of a remote Coffee Trends Agent server, rechecked every ttl_seconds.
+
+    The server sends its version with the strategy report. The report's ETag is
+    sent back, so rechecking an unchanged report costs an empty 304. Callers
+    arriving while a check runs, or while the server cannot be reached, get the
+    last version seen ("" before the first answer).
+    """
+
+    def __init__(self, config: AgentConfig, ttl_seconds: float = DEFAULT_VERSION_TTL_SECONDS):
+        """
+        Args:
+            config: Settings naming the trends server and HTTP pool
+            ttl_seconds: How long a version is used before the server is asked again
+        """
+        self.config = config
+        self.ttl_seconds = ttl_seconds
+        self.url = f"{config.coffee_trends_url}{KNOWLEDGE_VERSION_PATH}"
+        self.version = ""
+        self._etag: Optional[str] = None
+        self._expires_at = 0.0
+
+    async def __call__(self) -> str:
+        if time.monotonic() >= self._expires_at:
+            # Set before the request, so concurrent callers keep the known version instead of asking too
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            await self._refresh()
+        return self.version
+
+    async def _refresh(self) -> None:
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        try:
+            response = await shared_http_client(self.config).get(self.url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.debug("Checking the knowledge version at %s failed: %s", self.url, e)
+            return
+        version = response.headers.get(KNOWLEDGE_VERSION_HEADER)
+        if response.status_code in (200, 304) and version:
+            self.version = version
+            self._etag = response.headers.get("ETag", self._etag)
+        else:
+            logger.debug("%s sent no knowledge version (HTTP %s)", self.url, response.status_code)
@@ -2,5 +2,6 @@
 Configuration Package
 """
 
-__all__ = []
+from .settings import AgentConfig, ServerConfig
 
+__all__ = ["AgentConfig", "ServerConfig"]
@@ -0,0 +1,205 @@
+"""
+Agent Settings
+Model, network and retry settings shared by the agent factories.
+
+Settings are read from environment variables when a factory is called, not at
+import time, so a process can adjust its environment (or pass an explicit
+AgentConfig) before any agent is built.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+# Environment variables read by AgentConfig.from_env()
+MODEL_ENV_VAR = "COFFEE_AGENT_MODEL"
+TRENDS_HOST_ENV_VAR = "COFFEE_TRENDS_HOST"
+TRENDS_PORT_ENV_VAR = "COFFEE_TRENDS_PORT"
+TRENDS_URL_ENV_VAR = "COFFEE_TRENDS_URL"  # base URL(s), comma separated, the BAHO agent uses to reach the trends agent
+HTTP_MAX_CONNECTIONS_ENV_VAR = "COFFEE_TRENDS_HTTP_MAX_CONNECTIONS"
+HTTP_MAX_KEEPALIVE_ENV_VAR = "COFFEE_TRENDS_HTTP_MAX_KEEPALIVE"
+HTTP_KEEPALIVE_EXPIRY_ENV_VAR = "COFFEE_TRENDS_HTTP_KEEPALIVE_EXPIRY"  # seconds
+HTTP_TIMEOUT_ENV_VAR = "COFFEE_TRENDS_HTTP_TIMEOUT"  # seconds
+HTTP2_ENV_VAR = "COFFEE_TRENDS_HTTP2"
+AGENT_CARD_TTL_ENV_VAR = "COFFEE_TRENDS_AGENT_CARD_TTL"  # seconds
+BALANCER_ENV_VAR = "COFFEE_TRENDS_BALANCER"  # p2c | least_outstanding
+CIRCUIT_FAILURES_ENV_VAR = "COFFEE_TRENDS_CIRCUIT_FAILURES"
+CIRCUIT_RESET_ENV_VAR = "COFFEE_TRENDS_CIRCUIT_RESET"  # seconds
+HEALTH_INTERVAL_ENV_VAR = "COFFEE_TRENDS_HEALTH_INTERVAL"  # seconds
+STREAMING_ENV_VAR = "COFFEE_TRENDS_STREAMING"  # on | off
+CONTEXT_BUDGET_ENV_VAR = "COFFEE_CONTEXT_BUDGET_TOKENS"  # 0 to send the whole history
+FAST_PATH_ENV_VAR = "COFFEE_TRENDS_FAST_PATH"  # on | off
+SINGLE_FLIGHT_ENV_VAR = "COFFEE_TRENDS_SINGLE_FLIGHT"  # on | off
+TELEMETRY_ENV_VAR = "COFFEE_TELEMETRY"  # metrics | memory | console | off
+TOOL_WORKERS_ENV_VAR = "COFFEE_TRENDS_TOOL_WORKERS"  # 0 to run the tools on the event loop
+TOOL_QUEUE_ENV_VAR = "COFFEE_TRENDS_TOOL_QUEUE"
+TOOL_QUEUE_TIMEOUT_ENV_VAR = "COFFEE_TRENDS_TOOL_QUEUE_TIMEOUT"  # seconds
+MODEL_RATE_LIMIT_ENV_VAR = "COFFEE_MODEL_RATE_LIMIT"  # calls per second, 0 for no pacing
+MODEL_BURST_ENV_VAR = "COFFEE_MODEL_BURST"
+MODEL_MAX_CONCURRENCY_ENV_VAR = "COFFEE_MODEL_MAX_CONCURRENCY"
+MODEL_MIN_CONCURRENCY_ENV_VAR = "COFFEE_MODEL_MIN_CONCURRENCY"
+MODEL_RETRY_ATTEMPTS_ENV_VAR = "COFFEE_MODEL_RETRY_ATTEMPTS"
+MODEL_RETRY_MAX_DELAY_ENV_VAR = "COFFEE_MODEL_RETRY_MAX_DELAY"  # seconds
+
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+DEFAULT_TRENDS_HOST = "localhost"
+DEFAULT_TRENDS_PORT = 8001
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    """Settings used to build the agents and the A2A application."""
+
+    model: str = DEFAULT_MODEL
+    trends_host: str = DEFAULT_TRENDS_HOST
+    trends_port: int = DEFAULT_TRENDS_PORT
+    trends_url: Optional[str] = None
+    # Gemini calls of every agent in the process share one scheduler (see clients/model_scheduler.py):
+    # retries with jittered backoff, a token bucket (model_rate_limit 0: no pacing)
+    # and a concurrency limit that shrinks on 429s and grows back on successes
+    retry_attempts: int = 5
+    retry_initial_delay: float = 1
+    retry_max_delay: float = 30.0
+    retry_http_status_codes: Tuple[int, ...] = field(default=(429, 500, 503, 504))
+    model_rate_limit: float = 0.0
+    model_burst: int = 10
+    model_max_concurrency: int = 32
+    model_min_concurrency: int = 1
+    # HTTP client used by the BAHO agent to call the Coffee Trends Agent
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 600.0
+    http2: bool = False
+    agent_card_ttl: float = 300.0
+    # Balancing across several trends servers (COFFEE_TRENDS_URL with more than one URL)
+    balancer: str = "p2c"
+    circuit_failure_threshold: int = 3
+    circuit_reset_timeout: float = 10.0
+    health_check_interval: float = 10.0
+    # Stream the trends agent's model output to A2A clients as it is generated
+    streaming: bool = True
+    # Approximate tokens of conversation history each agent sends per model call (0: no limit)
+    context_budget_tokens: int = 8000
+    # Answer plain trend / Rwanda category lookups with the tool alone, without the model
+    fast_path: bool = True
+    # Concurrent identical first questions to the trends agent share one model run (see agents/single_flight.py)
+    single_flight: bool = True
+    # Spans and /metrics histograms: metrics | memory | console | off (see telemetry/tracing.py)
+    telemetry: str = "metrics"
+    # Threads running the trends agent's knowledge tools off the event loop (0: on the loop),
+    # callers allowed to wait for one and how long (see agents/tool_pool.py)
+    tool_workers: int = 2
+    tool_queue_size: int = 32
+    tool_queue_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "AgentConfig":
+        """
+        Read settings from COFFEE_AGENT_MODEL, COFFEE_TRENDS_HOST,
+        COFFEE_TRENDS_PORT, COFFEE_TRENDS_URL, COFFEE_TRENDS_STREAMING,
+        COFFEE_TRENDS_FAST_PATH, COFFEE_TRENDS_SINGLE_FLIGHT, COFFEE_CONTEXT_BUDGET_TOKENS, COFFEE_TELEMETRY, the
+        COFFEE_MODEL_*, COFFEE_TRENDS_TOOL_*, COFFEE_TRENDS_HTTP_* and the balancer
+        variables, using defaults for unset values.
+
+        Returns:
+            AgentConfig
+        """
+        defaults = cls()
+        return cls(
+            model=os.environ.get(MODEL_ENV_VAR, DEFAULT_MODEL),
+            trends_host=os.environ.get(TRENDS_HOST_ENV_VAR, DEFAULT_TRENDS_HOST),
+            trends_port=int(os.environ.get(TRENDS_PORT_ENV_VAR, DEFAULT_TRENDS_PORT)),
+            trends_url=os.environ.get(TRENDS_URL_ENV_VAR) or None,
+            http_max_connections=int(os.environ.get(HTTP_MAX_CONNECTIONS_ENV_VAR, defaults.http_max_connections)),
+            http_max_keepalive_connections=int(
+                os.environ.get(HTTP_MAX_KEEPALIVE_ENV_VAR, defaults.http_max_keepalive_connections)
+            ),
+            http_keepalive_expiry=float(os.environ.get(HTTP_KEEPALIVE_EXPIRY_ENV_VAR, defaults.http_keepalive_expiry)),
+            http_timeout=float(os.environ.get(HTTP_TIMEOUT_ENV_VAR, defaults.http_timeout)),
+            http2=os.environ.get(HTTP2_ENV_VAR, "").strip().lower() in ("1", "true", "on", "yes"),
+            agent_card_ttl=float(os.environ.get(AGENT_CARD_TTL_ENV_VAR, defaults.agent_card_ttl)),
+            balancer=os.environ.get(BALANCER_ENV_VAR, defaults.balancer),
+            circuit_failure_threshold=int(os.environ.get(CIRCUIT_FAILURES_ENV_VAR, defaults.circuit_failure_threshold)),
+            circuit_reset_timeout=float(os.environ.get(CIRCUIT_RESET_ENV_VAR, defaults.circuit_reset_timeout)),
+            health_check_interval=float(os.environ.get(HEALTH_INTERVAL_ENV_VAR, defaults.health_check_interval)),
+            streaming=os.environ.get(STREAMING_ENV_VAR, "on").strip().lower() not in ("0", "false", "off", "no"),
+            fast_path=os.environ.get(FAST_PATH_ENV_VAR, "on").strip().lower() not in ("0", "false", "off", "no"),
+            single_flight=os.environ.get(SINGLE_FLIGHT_ENV_VAR, "on").strip().lower() not in ("0", "false", "off", "no"),
+            context_budget_tokens=int(os.environ.get(CONTEXT_BUDGET_ENV_VAR, defaults.context_budget_tokens)),
+            telemetry=os.environ.get(TELEMETRY_ENV_VAR, defaults.telemetry).strip().lower(),
+            tool_workers=int(os.environ.get(TOOL_WORKERS_ENV_VAR, defaults.tool_workers)),
+            tool_queue_size=int(os.environ.get(TOOL_QUEUE_ENV_VAR, defaults.tool_queue_size)),
+            tool_queue_timeout=float(os.environ.get(TOOL_QUEUE_TIMEOUT_ENV_VAR, defaults.tool_queue_timeout)),
+            retry_attempts=int(os.environ.get(MODEL_RETRY_ATTEMPTS_ENV_VAR, defaults.retry_attempts)),
+            retry_max_delay=float(os.environ.get(MODEL_RETRY_MAX_DELAY_ENV_VAR, defaults.retry_max_delay)),
+            model_rate_limit=float(os.environ.get(MODEL_RATE_LIMIT_ENV_VAR, defaults.model_rate_limit)),
+            model_burst=int(os.environ.get(MODEL_BURST_ENV_VAR, defaults.model_burst)),
+            model_max_concurrency=int(os.environ.get(MODEL_MAX_CONCURRENCY_ENV_VAR, defaults.model_max_concurrency)),
+            model_min_concurrency=int(os.environ.get(MODEL_MIN_CONCURRENCY_ENV_VAR, defaults.model_min_concurrency)),
+        )
+
+    @property
+    def coffee_trends_urls(self) -> Tuple[str, ...]:
+        """Base URLs of the Coffee Trends Agent servers (trends_url may list several, comma separated)."""
+        urls = [url.strip().rstrip("/") for url in (self.trends_url or "").split(",") if url.strip()]
+        return tuple(urls) or (f"http://{self.trends_host}:{self.trends_port}",)
+
+    @property
+    def coffee_trends_url(self) -> str:
+        """Base URL of the (first) Coffee Trends Agent server."""
+        return self.coffee_trends_urls[0]
+
+    def retry_options(self):
+        """
+        Return the google.genai HttpRetryOptions for the agents' Gemini models.
+
+        The client makes a single attempt: the model scheduler retries, so its
+        backoff and concurrency limit see every failure.
+        """
+        from google.genai import types
+
+        return types.HttpRetryOptions(attempts=1)
+
+
+# Environment variables read by ServerConfig.from_env()
+BIND_HOST_ENV_VAR = "COFFEE_TRENDS_BIND_HOST"
+WORKERS_ENV_VAR = "COFFEE_TRENDS_WORKERS"
+KEEP_ALIVE_ENV_VAR = "COFFEE_TRENDS_KEEP_ALIVE"  # seconds
+BACKLOG_ENV_VAR = "COFFEE_TRENDS_BACKLOG"
+LIMIT_CONCURRENCY_ENV_VAR = "COFFEE_TRENDS_LIMIT_CONCURRENCY"
+GRACEFUL_TIMEOUT_ENV_VAR = "COFFEE_TRENDS_GRACEFUL_TIMEOUT"  # seconds
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Process and socket settings for serving the Coffee Trends Agent."""
+
+    host: str = DEFAULT_TRENDS_HOST
+    port: int = DEFAULT_TRENDS_PORT
+    workers: int = 1
+    keep_alive: float = 5.0
+    backlog: int = 2048
+    limit_concurrency: Optional[int] = None
+    graceful_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """
+        Read settings from COFFEE_TRENDS_BIND_HOST, COFFEE_TRENDS_PORT,
+        COFFEE_TRENDS_WORKERS, COFFEE_TRENDS_KEEP_ALIVE, COFFEE_TRENDS_BACKLOG,
+        COFFEE_TRENDS_LIMIT_CONCURRENCY and COFFEE_TRENDS_GRACEFUL_TIMEOUT.
+
+        Returns:
+            ServerConfig
+        """
+        limit_concurrency = os.environ.get(LIMIT_CONCURRENCY_ENV_VAR)
+        return cls(
+            host=os.environ.get(BIND_HOST_ENV_VAR) or os.environ.get(TRENDS_HOST_ENV_VAR, DEFAULT_TRENDS_HOST),
+            port=int(os.environ.get(TRENDS_PORT_ENV_VAR, DEFAULT_TRENDS_PORT)),
+            workers=int(os.environ.get(WORKERS_ENV_VAR, 1)),
+            keep_alive=float(os.environ.get(KEEP_ALIVE_ENV_VAR, 5.0)),
+            backlog=int(os.environ.get(BACKLOG_ENV_VAR, 2048)),
+            limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
+            graceful_timeout=float(os.environ.get(GRACEFUL_TIMEOUT_ENV_VAR, 30.0)),
+        )
@@ -10,11 +10,7 @@ import json
 import requests
 import subprocess
 import time
-import uuid
 import asyncio
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 
 import sys
 from pathlib import Path
@@ -23,8 +19,12 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-# Import agents
-from agents import coffee_trends_agent, baho_strategy_agent
+# Import agents (the BAHO agent only needs the A2A client side)
+from agents import baho_strategy_agent
+from clients import BatchRunner, BatchResult
+
+# Test queries asked at the same time
+DEMO_CONCURRENCY = int(os.environ.get("COFFEE_DEMO_CONCURRENCY", "3"))
 
 
 def setup_environment():
@@ -105,53 +105,26 @@ def view_agent_card():
         return False
 
 
-async def test_baho_strategy_agent(user_query: str):
-    """
-    Test the BAHO Strategy Agent with a user query.
-    The agent will communicate with Coffee Trends Agent via A2A.
-    """
-    # Setup session management
-    session_service = InMemorySessionService()
-    
-    # Session identifiers
-    app_name = "baho_strategy_app"
-    user_id = "demo_user"
-    session_id = f"demo_session_{uuid.uuid4().hex[:8]}"
-    
-    # Create session
-    session = await session_service.create_session(
-        app_name=app_name, user_id=user_id, session_id=session_id
-    )
-    
-    # Create runner
-    runner = Runner(
-        agent=baho_strategy_agent,
-        app_name=app_name,
-        session_service=session_service
-    )
-    
-    # Create user message
-    test_content = types.Content(parts=[types.Part(text=user_query)])
-    
-    # Display query
-    print(f"\n👤 Question: {user_query}")
+def print_result(result: BatchResult, total: int):
+    """Print one answered question of the demo batch."""
+    timing = f"{result.elapsed:.1f}s"
+    if result.first_token is not None:
+        timing = f"first words after {result.first_token:.1f}s, {timing}"
+    print(f"\n\n📊 Test {result.index + 1}/{total} ({timing})")
+    print(f"\n👤 Question: {result.query}")
     print(f"\n🎯 BAHO Strategy Agent Response:")
     print("-" * 80)
-    
-    # Run the agent
-    async for event in runner.run_async(
-        user_id=user_id, session_id=session_id, new_message=test_content
-    ):
-        if event.is_final_response() and event.content:
-            for part in event.content.parts:
-                if hasattr(part, "text"):
-                    print(part.text)
-    
+    print(result.answer if result.ok else f"❌ {result.error}")
     print("-" * 80)
 
 
-async def run_demo():
-    """Run the complete A2A communication demo."""
+async def run_demo(concurrency: int = DEMO_CONCURRENCY):
+    """
+    Run the complete A2A communication demo.
+    
+    Args:
+        concurrency: Number of test queries asked at the same time
+    """
     print("=" * 80)
     print("☕ Coffee Trends Agent - A2A Communication Demo")
     print("=" * 80)
@@ -186,11 +159,13 @@ async def run_demo():
         "What are the key trends in Rwandan coffee that BAHO should leverage?",
     ]
     
-    for i, query in enumerate(test_queries, 1):
-        print(f"\n\n📊 Test {i}/{len(test_queries)}")
-        await test_baho_strategy_agent(query)
-        if i < len(test_queries):
-            time.sleep(2)  # Brief pause between queries
+    # One runner for every query; answers print as they arrive
+    runner = BatchRunner(baho_strategy_agent, user_id="demo_user", concurrency=concurrency, streaming=True)
+    try:
+        async for result in runner.run(test_queries):
+            print_result(result, total=len(test_queries))
+    finally:
+        await runner.close()
     
     print("\n" + "=" * 80)
     print("✅ Demo Complete!")
@@ -5,9 +5,7 @@ Simple script to interact with the BAHO Strategy Agent
 
 import os
 import asyncio
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+import time
 
 import sys
 from pathlib import Path
@@ -18,10 +16,11 @@ sys.path.insert(0, str(project_root))
 
 # Import the BAHO Strategy Agent
 from agents import baho_strategy_agent
+from clients import BatchRunner
 
 
 async def chat_with_baho_agent():
-    """Interactive chat with BAHO Strategy Agent."""
+    """Interactive chat with BAHO Strategy Agent; answers are printed as they are generated."""
     print("=" * 80)
     print("☕ BAHO Coffee Strategy Agent - Interactive Demo")
     print("=" * 80)
@@ -30,21 +29,19 @@ async def chat_with_baho_agent():
     print("\nType 'quit' or 'exit' to end the conversation.\n")
     print("=" * 80)
     
-    # Setup session
-    session_service = InMemorySessionService()
-    app_name = "baho_strategy_app"
-    user_id = "interactive_user"
+    # Setup session: one conversation, streamed. With COFFEE_SESSION_STORE set
+    # to a SQLite file, the conversation is resumed after a restart.
     session_id = "interactive_session"
-    
-    await session_service.create_session(
-        app_name=app_name, user_id=user_id, session_id=session_id
-    )
-    
-    runner = Runner(
-        agent=baho_strategy_agent,
-        app_name=app_name,
-        session_service=session_service
+    runner = BatchRunner(baho_strategy_agent, user_id="interactive_user", streaming=True)
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=runner.user_id, session_id=session_id
     )
+    if session is None:
+        await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=runner.user_id, session_id=session_id
+        )
+    else:
+        print(f"\n📂 Resuming the previous conversation ({len(session.events)} stored events)")
     
     print("\n💬 Start asking questions about coffee trends and BAHO strategy!\n")
     
@@ -62,19 +59,18 @@ async def chat_with_baho_agent():
             print("\n🎯 BAHO Strategy Agent:")
             print("-" * 80)
             
-            # Create message
-            test_content = types.Content(parts=[types.Part(text=user_input)])
-            
-            # Run agent
-            async for event in runner.run_async(
-                user_id=user_id, session_id=session_id, new_message=test_content
-            ):
-                if event.is_final_response() and event.content:
-                    for part in event.content.parts:
-                        if hasattr(part, "text"):
-                            print(part.text)
+            # Run agent, printing the answer as it streams in
+            started = time.perf_counter()
+            first_token = None
+            async for text in runner.stream(user_input, session_id=session_id):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                print(text, end="", flush=True)
             
+            print()
             print("-" * 80)
+            if first_token is not None:
+                print(f"⏱️  First words after {first_token:.1f}s, complete after {time.perf_counter() - started:.1f}s")
             
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
@@ -7,16 +7,89 @@ from .coffee_trends_knowledge import (
     search_coffee_trends,
     get_rwanda_coffee_info,
     get_trends_for_baho_strategy,
+    filter_coffee_trends,
+    get_trend_store,
+    set_trend_store,
+    get_knowledge_snapshot,
+    get_knowledge_version,
+    reload_knowledge,
     COFFEE_TRENDS_DB,
     RWANDA_COFFEE_INFO,
 )
+from .facets import ImpactLevel, TrendFacets, parse_impact
+from .records import Trend, TrendView
+from .snapshot import KnowledgeDiff, KnowledgeSnapshot
+from .strategy_report import (
+    StrategyReport,
+    build_strategy_report,
+    current_strategy_report,
+    get_strategy_report,
+    precompute_strategy_report,
+)
+from .search_index import TrendSearchIndex, tokenize
+from .trend_store import (
+    TrendStore,
+    DictTrendStore,
+    SQLiteTrendStore,
+    open_trend_store,
+    write_sqlite_store,
+)
+
+# Price analytics need NumPy; load them on first use so importing the package
+# stays cheap for callers that only look up trends.
+_PRICE_ATTRIBUTES = (
+    "PriceTable",
+    "get_price_table",
+    "get_coffee_prices",
+    "get_coffee_price_premiums",
+    "list_price_series",
+)
+
+
+def __getattr__(name: str):
+    if name in _PRICE_ATTRIBUTES:
+        from . import prices
+
+        return getattr(prices, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "get_coffee_trend",
     "search_coffee_trends",
     "get_rwanda_coffee_info",
     "get_trends_for_baho_strategy",
+    "filter_coffee_trends",
+    "get_trend_store",
+    "set_trend_store",
+    "get_knowledge_snapshot",
+    "get_knowledge_version",
+    "reload_knowledge",
     "COFFEE_TRENDS_DB",
     "RWANDA_COFFEE_INFO",
+    "ImpactLevel",
+    "TrendFacets",
+    "parse_impact",
+    "Trend",
+    "TrendView",
+    "KnowledgeDiff",
+    "KnowledgeSnapshot",
+    "StrategyReport",
+    "build_strategy_report",
+    "current_strategy_report",
+    "get_strategy_report",
+    "precompute_strategy_report",
+    "TrendSearchIndex",
+    "tokenize",
+    "TrendStore",
+    "DictTrendStore",
+    "SQLiteTrendStore",
+    "open_trend_store",
+    "write_sqlite_store",
+    "PriceTable",
+    "get_price_table",
+    "get_coffee_prices",
+    "get_coffee_price_premiums",
+    "list_price_series",
 ]
 
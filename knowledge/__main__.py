@@ -0,0 +1,65 @@
+"""
+Knowledge Base Command Line
+Usage:
+    python -m knowledge export <path.sqlite>                   Export the built-in dataset to a SQLite trend store
+    python -m knowledge ingest <path.sqlite> <file>...         Add trends and prices from CSV/JSONL files to a store
+
+Ingestion validates every row, skips invalid ones (the first are listed) and
+replaces the store file atomically. Serve the result with
+COFFEE_TRENDS_STORE=<path.sqlite>, or load it into a running server with
+POST /admin/reload {"path": "<path.sqlite>"}.
+"""
+
+import argparse
+import sys
+import time
+
+from .coffee_trends_knowledge import COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO
+from .trend_store import write_sqlite_store
+
+
+def ingest(args) -> int:
+    from .ingest import ingest_files
+
+    started = time.perf_counter()
+    try:
+        report = ingest_files(args.store, args.files)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - started
+    for error in report.errors:
+        print(f"⚠️  {error}", file=sys.stderr)
+    if report.invalid > len(report.errors):
+        print(f"⚠️  ... and {report.invalid - len(report.errors)} more invalid row(s)", file=sys.stderr)
+    print(
+        f"✅ Read {report.rows} row(s) in {elapsed:.1f}s: {report.trends} new trend(s), {report.prices} new price(s), "
+        f"{report.duplicates} replaced, {report.invalid} invalid -> {args.store}"
+    )
+    return 0
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog="python -m knowledge", description="Manage the coffee trends knowledge base.")
+    commands = parser.add_subparsers(dest="command")
+    export_parser = commands.add_parser("export", help="Export the built-in dataset to a SQLite trend store")
+    export_parser.add_argument("path", help="SQLite file to write")
+    ingest_parser = commands.add_parser("ingest", help="Add trends and prices from CSV/JSONL files to a trend store")
+    ingest_parser.add_argument("store", help="SQLite trend store to add to (created from the built-in dataset if missing)")
+    ingest_parser.add_argument("files", nargs="+", help="CSV or JSONL files of trend and price records")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        output = write_sqlite_store(args.path, COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO)
+        print(f"✅ Exported {len(COFFEE_TRENDS_DB)} trends to {output}")
+        return 0
+    if args.command == "ingest":
+        return ingest(args)
+
+    print(__doc__.strip())
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,14 +3,24 @@ Coffee Trends Knowledge Base
 Comprehensive database of global coffee trends relevant for specialty coffee producers
 """
 
-from typing import Dict, List, Optional
+import threading
+import weakref
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
+from telemetry import KNOWLEDGE_SECONDS, traced
+
+from .facets import ImpactLevel, parse_impact
+from .records import Trend, TrendView
+from .snapshot import KnowledgeDiff, KnowledgeSnapshot
+from .trend_store import DictTrendStore, TrendStore, open_trend_store
+
 # Global Coffee Market Trends Database
 COFFEE_TRENDS_DB = {
     # Market Trends
     "specialty_coffee_growth": {
         "trend": "Specialty Coffee Market Growth",
+        "category": "market",
         "description": "The specialty coffee market is experiencing 13-15% annual growth globally, driven by consumer demand for quality, origin stories, and sustainable practices.",
         "impact": "High - Directly relevant for BAHO as a specialty producer",
         "opportunity": "Position BAHO as a premium Rwandan specialty brand with unique origin story",
@@ -24,6 +34,7 @@ COFFEE_TRENDS_DB = {
     
     "sustainability_demand": {
         "trend": "Sustainability and Ethical Sourcing",
+        "category": "market",
         "description": "Consumers increasingly prioritize sustainable, ethically sourced coffee with transparent supply chains. Fair trade and direct trade models are gaining traction.",
         "impact": "Critical - Essential for market access and premium positioning",
         "opportunity": "Highlight BAHO's direct relationships with Rwandan farmers and sustainable practices",
@@ -37,6 +48,7 @@ COFFEE_TRENDS_DB = {
     
     "origin_story_importance": {
         "trend": "Origin Story and Terroir Focus",
+        "category": "market",
         "description": "Coffee drinkers want to know where their coffee comes from. Single-origin, terroir-driven coffees command premium prices. Rwanda's unique volcanic soil and high altitude create distinctive flavor profiles.",
         "impact": "High - Core differentiator for BAHO",
         "opportunity": "Emphasize Rwanda's unique terroir: volcanic soil, high altitude (1500-2000m), ideal climate",
@@ -50,6 +62,7 @@ COFFEE_TRENDS_DB = {
     
     "processing_methods": {
         "trend": "Innovative Processing Methods",
+        "category": "market",
         "description": "Natural, honey, and experimental processing methods are gaining popularity. Consumers seek unique flavor profiles beyond traditional washed coffees.",
         "impact": "Medium-High - Opportunity for product diversification",
         "opportunity": "Offer variety: washed (clean, bright), natural (fruity, complex), honey (balanced)",
@@ -63,6 +76,7 @@ COFFEE_TRENDS_DB = {
     
     "roast_preferences": {
         "trend": "Lighter Roast Preferences",
+        "category": "market",
         "description": "Specialty coffee market shifting toward lighter roasts that preserve origin characteristics. Medium-light to light roasts dominate specialty segment.",
         "impact": "Medium - Affects product positioning",
         "opportunity": "Position BAHO coffees as light-medium roast to highlight origin flavors",
@@ -76,6 +90,7 @@ COFFEE_TRENDS_DB = {
     
     "direct_to_consumer": {
         "trend": "Direct-to-Consumer (D2C) Growth",
+        "category": "market",
         "description": "Coffee producers are increasingly selling directly to consumers via online platforms, subscription services, and e-commerce. This model offers higher margins and direct customer relationships.",
         "impact": "High - Revenue diversification opportunity",
         "opportunity": "BAHO can establish D2C channels: website, subscription service, online marketplace",
@@ -89,6 +104,7 @@ COFFEE_TRENDS_DB = {
     
     "cold_brew_nitro": {
         "trend": "Cold Brew and Nitro Coffee",
+        "category": "market",
         "description": "Cold brew and nitro coffee continue to grow, especially in ready-to-drink (RTD) formats. These products command premium prices and appeal to younger demographics.",
         "impact": "Medium - Product extension opportunity",
         "opportunity": "Consider RTD cold brew products featuring BAHO coffee",
@@ -102,6 +118,7 @@ COFFEE_TRENDS_DB = {
     
     "functional_coffee": {
         "trend": "Functional and Health-Focused Coffee",
+        "category": "market",
         "description": "Coffee with added functional benefits (adaptogens, probiotics, vitamins) is emerging. However, specialty coffee purists prefer clean, high-quality beans without additives.",
         "impact": "Low-Medium - Niche opportunity",
         "opportunity": "Focus on natural health benefits of high-quality Rwandan coffee (antioxidants, natural energy)",
@@ -115,6 +132,7 @@ COFFEE_TRENDS_DB = {
     
     "price_premiums": {
         "trend": "Premium Pricing Acceptance",
+        "category": "market",
         "description": "Consumers are increasingly accepting of premium pricing for specialty coffee, especially when tied to quality, origin story, and sustainability.",
         "impact": "High - Revenue opportunity",
         "opportunity": "BAHO can command premium pricing ($18-30/lb) for specialty Rwandan coffee",
@@ -129,6 +147,7 @@ COFFEE_TRENDS_DB = {
     # Rwanda-Specific Trends
     "rwanda_coffee_reputation": {
         "trend": "Rwandan Coffee Market Position",
+        "category": "rwanda",
         "description": "Rwandan coffee is gaining recognition in specialty markets for its quality, unique flavor profile, and compelling origin story. The country's focus on quality and women's empowerment in coffee is a strong narrative.",
         "impact": "Critical - Core brand positioning",
         "opportunity": "Leverage Rwanda's growing reputation and unique story (post-genocide recovery, women in coffee)",
@@ -142,6 +161,7 @@ COFFEE_TRENDS_DB = {
     
     "african_coffee_rising": {
         "trend": "African Coffee Origin Recognition",
+        "category": "rwanda",
         "description": "African coffee origins (Ethiopia, Kenya, Rwanda, Burundi) are gaining prominence in specialty markets. Consumers are discovering unique flavor profiles from the continent.",
         "impact": "High - Market tailwind",
         "opportunity": "Position BAHO as part of rising African specialty coffee movement",
@@ -156,6 +176,7 @@ COFFEE_TRENDS_DB = {
     # Consumer Behavior Trends
     "home_brewing": {
         "trend": "Home Brewing Equipment Investment",
+        "category": "consumer",
         "description": "Consumers are investing in quality home brewing equipment (pour-over, espresso machines, grinders). This creates demand for whole bean specialty coffee.",
         "impact": "High - Direct market opportunity",
         "opportunity": "BAHO should focus on whole bean sales and provide brewing guides",
@@ -169,6 +190,7 @@ COFFEE_TRENDS_DB = {
     
     "subscription_models": {
         "trend": "Coffee Subscription Services",
+        "category": "consumer",
         "description": "Subscription coffee services are popular, offering convenience and discovery. Consumers subscribe to receive regular deliveries of specialty coffee.",
         "impact": "High - Recurring revenue opportunity",
         "opportunity": "BAHO can offer subscription service with rotating single-origins and processing methods",
@@ -182,6 +204,7 @@ COFFEE_TRENDS_DB = {
     
     "social_media_influence": {
         "trend": "Social Media and Coffee Culture",
+        "category": "consumer",
         "description": "Instagram, TikTok, and coffee-focused social media drive discovery and purchase decisions. Visual storytelling and origin narratives perform well.",
         "impact": "High - Marketing channel",
         "opportunity": "BAHO should invest in visual storytelling: farm photos, processing videos, origin stories",
@@ -196,6 +219,7 @@ COFFEE_TRENDS_DB = {
     # Competitive Landscape
     "competition_intensity": {
         "trend": "Specialty Coffee Competition",
+        "category": "competitive",
         "description": "Specialty coffee market is competitive with many roasters and producers. Differentiation through quality, story, and direct relationships is key.",
         "impact": "High - Requires strong positioning",
         "opportunity": "BAHO must differentiate through: Rwanda-specific terroir, direct trade, quality, and story",
@@ -210,6 +234,7 @@ COFFEE_TRENDS_DB = {
     # Technology Trends
     "blockchain_traceability": {
         "trend": "Blockchain and Supply Chain Transparency",
+        "category": "technology",
         "description": "Some producers are using blockchain to provide complete traceability from farm to cup. This appeals to consumers who value transparency.",
         "impact": "Low-Medium - Future consideration",
         "opportunity": "Consider implementing traceability technology to show farm-to-cup journey",
@@ -223,6 +248,7 @@ COFFEE_TRENDS_DB = {
     
     "ai_roasting": {
         "trend": "AI and Precision Roasting",
+        "category": "technology",
         "description": "AI-assisted roasting is emerging but specialty market still values human expertise and artisanal approach.",
         "impact": "Low - Not critical for BAHO",
         "opportunity": "Emphasize artisanal, human-driven quality over automation",
@@ -284,89 +310,258 @@ RWANDA_COFFEE_INFO = {
 }
 
 
-def get_coffee_trend(trend_key: str) -> Dict:
+def _traced(function):
+    """Trace a knowledge function as knowledge.<name> and time it in coffee_knowledge_seconds."""
+    return traced(f"knowledge.{function.__name__}", KNOWLEDGE_SECONDS, function=function.__name__)(function)
+
+
+# Knowledge snapshot currently being served. Readers take one reference per call;
+# reload_knowledge() publishes a new snapshot with a single assignment.
+_SNAPSHOT, _ = KnowledgeSnapshot.build(
+    open_trend_store() or DictTrendStore(COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO)
+)
+
+# Serializes reloads; readers never take this lock
+_RELOAD_LOCK = threading.Lock()
+
+
+def get_knowledge_snapshot() -> KnowledgeSnapshot:
+    """
+    Get the knowledge snapshot currently being served.
+    
+    Returns:
+        Active KnowledgeSnapshot
+    """
+    return _SNAPSHOT
+
+
+def get_knowledge_version() -> str:
+    """
+    Get the content version of the knowledge base being served.
+    
+    Returns:
+        Hash that changes whenever any trend or Rwandan coffee data changes
+    """
+    return _SNAPSHOT.version
+
+
+def get_trend_store() -> TrendStore:
+    """
+    Get the trend store backing the knowledge functions.
+    
+    Returns:
+        Active TrendStore
+    """
+    return _SNAPSHOT.store
+
+
+@_traced
+def reload_knowledge(store: Optional[TrendStore] = None) -> KnowledgeDiff:
+    """
+    Load a new dataset and swap it in without interrupting readers.
+    
+    The new dataset is diffed against the one being served and only changed
+    trends are re-indexed. Calls already in progress finish on the old snapshot;
+    its store is closed once the last of them lets go of it.
+    
+    Args:
+        store: TrendStore to serve from. Defaults to reopening the store named by
+               COFFEE_TRENDS_STORE, or the built-in dataset when it is unset.
+    
+    Returns:
+        KnowledgeDiff describing what changed
+    """
+    global _SNAPSHOT
+    if store is None:
+        store = open_trend_store() or DictTrendStore(COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO)
+    
+    with _RELOAD_LOCK:
+        previous = _SNAPSHOT
+        snapshot, diff = KnowledgeSnapshot.build(store, previous=previous)
+        _SNAPSHOT = snapshot
+    if previous.store is not store:
+        weakref.finalize(previous, previous.store.close)
+    return diff
+
+
+def set_trend_store(store: TrendStore) -> None:
+    """
+    Replace the trend store backing the knowledge functions.
+    
+    Args:
+        store: TrendStore to serve from
+    """
+    reload_knowledge(store)
+
+
+@_traced
+def get_coffee_trend(trend_key: str, snapshot: Optional[KnowledgeSnapshot] = None) -> Union[Trend, Dict]:
     """
     Get detailed information about a specific coffee trend.
     
     Args:
         trend_key: Key identifying the trend (e.g., "specialty_coffee_growth")
+        snapshot: Optional snapshot to read from (defaults to the one being served)
     
     Returns:
-        Dictionary with trend information
+        The trend record (a read-only Trend mapping), or a dictionary with an error
     """
-    if trend_key.lower() in COFFEE_TRENDS_DB:
-        return COFFEE_TRENDS_DB[trend_key.lower()]
+    store = (snapshot or _SNAPSHOT).store
+    trend_data = store.get_trend(trend_key.lower())
+    if trend_data is not None:
+        return trend_data
     else:
-        available_trends = list(COFFEE_TRENDS_DB.keys())
+        available_trends = store.trend_keys()
         return {
             "error": f"Trend '{trend_key}' not found.",
             "available_trends": available_trends
         }
 
 
-def search_coffee_trends(query: str) -> List[Dict]:
+@_traced
+def search_coffee_trends(
+    query: str,
+    limit: Optional[int] = None,
+    operator: str = "or",
+    snapshot: Optional[KnowledgeSnapshot] = None,
+) -> List[TrendView]:
     """
-    Search for coffee trends matching a query.
+    Search for coffee trends matching a query, best matches first.
     
     Args:
         query: Search query (e.g., "sustainability", "pricing", "Rwanda")
+        limit: Optional maximum number of results
+        operator: "or" to match any query term, "and" to require all of them
+        snapshot: Optional snapshot to read from (defaults to the one being served)
     
     Returns:
-        List of matching trends
+        Matching trends ranked by BM25 score, as read-only views reading like
+        {"key": ..., "score": ..., **record}
     """
-    query_lower = query.lower()
-    matches = []
-    
-    for key, trend_data in COFFEE_TRENDS_DB.items():
-        # Search in trend name, description, and relevance
-        searchable_text = f"{trend_data['trend']} {trend_data['description']} {trend_data.get('relevance_to_baho', '')}".lower()
-        
-        if query_lower in searchable_text or query_lower in key:
-            matches.append({
-                "key": key,
-                **trend_data
-            })
-    
-    return matches
+    snapshot = snapshot or _SNAPSHOT
+    store = snapshot.store
+    views = []
+    for key, score in snapshot.index.search(query, limit=limit, operator=operator):
+        record = store.get_trend(key)
+        # Skip a row the store no longer has rather than failing the whole search
+        if record is not None:
+            views.append(TrendView(record, score=round(score, 4)))
+    return views
 
 
-def get_rwanda_coffee_info(category: Optional[str] = None) -> Dict:
+@_traced
+def get_rwanda_coffee_info(category: Optional[str] = None, snapshot: Optional[KnowledgeSnapshot] = None) -> Dict:
     """
     Get information about Rwandan coffee.
     
     Args:
         category: Optional category (terroir, processing_methods, regions, quality_grades, market_positioning)
+        snapshot: Optional snapshot to read from (defaults to the one being served)
     
     Returns:
         Dictionary with Rwandan coffee information
     """
+    store = (snapshot or _SNAPSHOT).store
     if category:
-        if category.lower() in RWANDA_COFFEE_INFO:
-            return RWANDA_COFFEE_INFO[category.lower()]
+        category_data = store.get_rwanda_category(category.lower())
+        if category_data is not None:
+            return category_data
         else:
             return {
                 "error": f"Category '{category}' not found.",
-                "available_categories": list(RWANDA_COFFEE_INFO.keys())
+                "available_categories": store.rwanda_categories()
             }
     else:
-        return RWANDA_COFFEE_INFO
+        return store.get_rwanda_info()
 
 
-def get_trends_for_baho_strategy() -> Dict:
+@_traced
+def filter_coffee_trends(
+    impact: Optional[str] = None,
+    min_impact: Optional[str] = None,
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    snapshot: Optional[KnowledgeSnapshot] = None,
+) -> Dict:
+    """
+    Find coffee trends by impact level, category and region using precomputed facets.
+    
+    Args:
+        impact: Exact impact level (low, low-medium, medium, medium-high, high, critical)
+        min_impact: Lowest impact level to include (e.g., "high" also returns critical trends)
+        category: Trend category (market, rwanda, consumer, competitive, technology)
+        region: Coffee origin (e.g., "africa", "ethiopia") or Rwandan region (e.g., "huye")
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+    
+    Returns:
+        Dictionary with matching trends (read-only views reading like
+        {"key": ..., "impact_level": ..., **record}) and, for a Rwandan region,
+        its flavor profile
+    """
+    snapshot = snapshot or _SNAPSHOT
+    facets = snapshot.facets
+    
+    levels = {}
+    for name, value in (("impact", impact), ("min_impact", min_impact)):
+        if value:
+            level = parse_impact(value)
+            if level is ImpactLevel.UNKNOWN:
+                return {
+                    "error": f"Impact level '{value}' not recognized.",
+                    "available_impact_levels": [level.label for level in ImpactLevel if level],
+                }
+            levels[name] = level
+    if category and category.lower() not in facets.by_category:
+        return {
+            "error": f"Category '{category}' not found.",
+            "available_categories": facets.categories(),
+        }
+    if region and region.lower() not in facets.regions():
+        return {
+            "error": f"Region '{region}' not found.",
+            "available_regions": facets.regions(),
+        }
+    
+    keys = facets.filter(
+        impact=levels.get("impact"),
+        min_impact=levels.get("min_impact"),
+        category=category or None,
+        region=region or None,
+    )
+    result = {
+        "trends": [
+            TrendView(record, impact_label=True)
+            for record in map(snapshot.store.get_trend, keys)
+            if record is not None
+        ],
+    }
+    if region and region.lower() in facets.rwanda_regions:
+        result["region_profile"] = facets.rwanda_regions[region.lower()]
+    return result
+
+
+@_traced
+def get_trends_for_baho_strategy(snapshot: Optional[KnowledgeSnapshot] = None, date: Optional[str] = None) -> Dict:
     """
     Get strategic insights combining all trends relevant to BAHO COFFEE COMPANY.
     
+    Args:
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+        date: Report date as YYYY-MM-DD (defaults to today)
+    
     Returns:
         Comprehensive strategic analysis
     """
+    snapshot = snapshot or _SNAPSHOT
+    store = snapshot.store
     high_impact_trends = [
-        trend for trend in COFFEE_TRENDS_DB.values()
-        if trend.get("impact") in ["High", "Critical"]
+        store.get_trend(key)
+        for key in snapshot.facets.filter(min_impact=ImpactLevel.HIGH)
     ]
     
     return {
         "summary": "Strategic Coffee Trends Analysis for BAHO COFFEE COMPANY",
-        "date": datetime.now().strftime("%Y-%m-%d"),
+        "date": date or datetime.now().strftime("%Y-%m-%d"),
         "high_impact_trends": high_impact_trends,
         "key_opportunities": [
             "Premium pricing through specialty positioning",
@@ -386,6 +581,6 @@ def get_trends_for_baho_strategy() -> Dict:
             "Target light-medium roasts to showcase origin flavors",
             "Build relationships with specialty roasters and cafés"
         ],
-        "market_positioning": RWANDA_COFFEE_INFO["market_positioning"]
+        "market_positioning": store.get_rwanda_category("market_positioning")
     }
 
@@ -0,0 +1,220 @@
+"""
+Coffee Trends Facets
+Normalized impact levels and secondary indexes (impact, category, region) for
+structured trend queries.
+
+Trend records store impact as free text such as "High - Directly relevant for
+BAHO", so the level is parsed once per record into an ImpactLevel and the
+facet lists are precomputed. A filter then touches only the keys in the
+smallest matching list instead of scanning the whole corpus.
+"""
+
+import re
+from enum import IntEnum
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .search_index import tokenize
+
+
+class ImpactLevel(IntEnum):
+    """Impact of a trend on BAHO, ordered from least to most important."""
+
+    UNKNOWN = 0
+    LOW = 1
+    LOW_MEDIUM = 2
+    MEDIUM = 3
+    MEDIUM_HIGH = 4
+    HIGH = 5
+    CRITICAL = 6
+
+    @property
+    def label(self) -> str:
+        return self.name.replace("_", "-").title()
+
+
+_IMPACT_PREFIX_RE = re.compile(r"^\s*([a-z]+(?:\s*-\s*[a-z]+)?)\s*(?:-|$)", re.IGNORECASE)
+
+
+def parse_impact(impact: Optional[str]) -> ImpactLevel:
+    """
+    Parse the leading level of a free-text impact description.
+
+    Args:
+        impact: Impact text (e.g., "Medium-High - Opportunity for product diversification")
+                or a bare level name (e.g., "high", "low_medium")
+
+    Returns:
+        ImpactLevel, or ImpactLevel.UNKNOWN if no level is recognized
+    """
+    if not impact:
+        return ImpactLevel.UNKNOWN
+    match = _IMPACT_PREFIX_RE.match(impact.replace("_", "-"))
+    if match:
+        name = re.sub(r"\s*-\s*", "_", match.group(1)).upper()
+        if name in ImpactLevel.__members__:
+            return ImpactLevel[name]
+        # Unrecognized compound such as "High-Priority"; fall back to the first word
+        first = name.split("_")[0]
+        if first in ImpactLevel.__members__:
+            return ImpactLevel[first]
+    return ImpactLevel.UNKNOWN
+
+
+# Coffee origins recognized in trend text, with the word forms that mention them
+ORIGIN_REGIONS: Dict[str, Tuple[str, ...]] = {
+    "africa": ("africa", "african"),
+    "rwanda": ("rwanda", "rwandan", "rwandans"),
+    "ethiopia": ("ethiopia", "ethiopian"),
+    "kenya": ("kenya", "kenyan"),
+    "burundi": ("burundi", "burundian"),
+}
+
+# Rwandan growing regions are part of the "rwanda" origin
+PARENT_REGION = "rwanda"
+
+_TEXT_FIELDS = ("trend", "description", "opportunity", "relevance_to_baho", "data_points")
+
+
+# Parsed facets of one trend record: (impact level, category, regions mentioned)
+RecordFacets = Tuple[ImpactLevel, str, Tuple[str, ...]]
+
+
+def derive_record_facets(record: Mapping, rwanda_regions: Iterable[str] = ()) -> RecordFacets:
+    """
+    Parse the facet values of one trend record.
+
+    Args:
+        record: Trend record
+        rwanda_regions: Names of Rwandan growing regions to look for in the text
+
+    Returns:
+        Tuple of (impact level, category, regions mentioned)
+    """
+    tokens = set()
+    for field in _TEXT_FIELDS:
+        value = record.get(field, "")
+        tokens.update(tokenize(" ".join(value) if isinstance(value, (list, tuple)) else value or ""))
+
+    regions = [region for region, forms in ORIGIN_REGIONS.items() if tokens.intersection(forms)]
+    regions.extend(region for region in rwanda_regions if region in tokens)
+    category = (record.get("category") or "uncategorized").lower()
+    # Trend records carry their impact level already parsed
+    impact = getattr(record, "impact_level", None)
+    if impact is None:
+        impact = parse_impact(record.get("impact"))
+    return impact, category, tuple(regions)
+
+
+class TrendFacets:
+    """
+    Precomputed impact, category and region lists of trend keys.
+
+    Every list holds keys in dataset order. The per-record facet values are
+    kept in record_facets so a reload can reuse them for unchanged records.
+    """
+
+    def __init__(self, record_facets: Mapping[str, RecordFacets], rwanda_regions: Optional[Mapping[str, str]] = None):
+        """
+        Build the facet lists.
+
+        Args:
+            record_facets: Mapping of trend key to derive_record_facets() output, in dataset order
+            rwanda_regions: RWANDA_COFFEE_INFO["regions"], mapping region name to its profile
+        """
+        self.record_facets: Dict[str, RecordFacets] = dict(record_facets)
+        self.rwanda_regions: Dict[str, str] = dict(rwanda_regions or {})
+        self._build()
+
+    def _build(self) -> None:
+        self.by_impact: Dict[ImpactLevel, List[str]] = {}
+        self.by_category: Dict[str, List[str]] = {}
+        self.by_region: Dict[str, List[str]] = {}
+        self._positions: Dict[str, int] = {}
+
+        for position, (key, (impact, category, regions)) in enumerate(self.record_facets.items()):
+            self._positions[key] = position
+            self.by_impact.setdefault(impact, []).append(key)
+            self.by_category.setdefault(category, []).append(key)
+            for region in regions:
+                self.by_region.setdefault(region, []).append(key)
+
+        # A Rwandan growing region also surfaces every trend about Rwanda as a whole
+        parent_keys = self.by_region.get(PARENT_REGION, [])
+        for region in self.rwanda_regions:
+            own_keys = set(self.by_region.get(region, []))
+            merged = own_keys.union(parent_keys)
+            self.by_region[region] = sorted(merged, key=self._positions.__getitem__)
+
+    def impact_of(self, trend_key: str) -> ImpactLevel:
+        """Return the parsed impact level of a trend."""
+        return self.record_facets[trend_key][0]
+
+    def categories(self) -> List[str]:
+        return list(self.by_category)
+
+    def regions(self) -> List[str]:
+        return list(ORIGIN_REGIONS) + [region for region in self.rwanda_regions if region not in ORIGIN_REGIONS]
+
+    def filter(
+        self,
+        impact: Optional[ImpactLevel] = None,
+        min_impact: Optional[ImpactLevel] = None,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Return trend keys matching every given facet, in dataset order.
+
+        Args:
+            impact: Exact impact level
+            min_impact: Lowest impact level to include
+            category: Trend category (e.g., "market", "consumer")
+            region: Origin or Rwandan region (e.g., "africa", "huye")
+
+        Returns:
+            Matching trend keys
+        """
+        candidates: List[List[str]] = []
+        if impact is not None:
+            candidates.append(self.by_impact.get(impact, []))
+        if category is not None:
+            category = category.lower()
+            candidates.append(self.by_category.get(category, []))
+        if region is not None:
+            region = region.lower()
+            candidates.append(self.by_region.get(region, []))
+        if min_impact is not None and not candidates:
+            levels = [level for level in self.by_impact if level >= min_impact]
+            keys = [key for level in levels for key in self.by_impact[level]]
+            candidates.append(sorted(keys, key=self._positions.__getitem__) if len(levels) > 1 else keys)
+
+        if not candidates:
+            return list(self.record_facets)
+
+        # Walk the smallest list and check the remaining facets per record,
+        # so the cost follows the number of candidates rather than the corpus size
+        smallest = min(candidates, key=len)
+        return [
+            key for key in smallest
+            if self._matches(key, impact, min_impact, category, region)
+        ]
+
+    def _matches(
+        self,
+        trend_key: str,
+        impact: Optional[ImpactLevel],
+        min_impact: Optional[ImpactLevel],
+        category: Optional[str],
+        region: Optional[str],
+    ) -> bool:
+        record_impact, record_category, record_regions = self.record_facets[trend_key]
+        if impact is not None and record_impact != impact:
+            return False
+        if min_impact is not None and record_impact < min_impact:
+            return False
+        if category is not None and record_category != category:
+            return False
+        if region is not None and region not in record_regions:
+            if not (region in self.rwanda_regions and PARENT_REGION in record_regions):
+                return False
+        return True
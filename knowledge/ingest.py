@@ -0,0 +1,324 @@
+"""
+Trend Dataset Ingestion
+Streams CSV and JSONL files of trend and price records into a SQLite trend store.
+
+    python -m knowledge ingest coffee_trends.sqlite market_report.csv prices.jsonl
+
+Files are read one row at a time and written in batches, so memory use does
+not grow with the size of the input. Every row is validated: a row with a
+"price" field is a price record, anything else a trend record.
+
+    trend   key (optional, derived from the title), trend, description,
+            impact (starting with a level such as "High - ..."), category,
+            opportunity, relevance_to_baho, data_points (a list, or in CSV
+            a "|"-separated string). Other non-empty fields are kept.
+    price   date (YYYY-MM-DD), origin, grade, market ("green" or "retail"),
+            price (USD per lb)
+
+Rows are deduplicated by trend key, and prices by (date, origin, grade,
+market): a later row replaces an earlier one, in the input or in the store.
+New trends are added to the store's existing trends (the built-in dataset
+when the store does not exist yet), and the store file is replaced
+atomically at the end. Search indexes are not touched while rows are
+written; a server picks the new data up with one reload
+(POST /admin/reload), which indexes the whole store once. Writing any price
+also stores a new prices version in the store's store_meta table, which is
+how a reload knows to rebuild its price table.
+"""
+
+import csv
+import json
+import os
+import re
+import shutil
+import sqlite3
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .facets import ImpactLevel, parse_impact
+from .records import TREND_FIELDS
+from .trend_store import _SCHEMA, PRICES_VERSION_META, write_sqlite_store
+
+BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 20
+DATA_POINT_SEPARATOR = "|"
+PRICE_MARKETS = ("green", "retail")
+
+_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+Row = Dict[str, object]
+
+
+class RecordError(ValueError):
+    """A row that does not match the trend or price schema."""
+
+
+class IngestReport:
+    """Counts and the first errors of one ingestion run."""
+
+    def __init__(self):
+        self.rows = 0
+        self.trends = 0  # trends added to the store
+        self.prices = 0  # prices added to the store
+        self.duplicates = 0  # valid rows that replaced an earlier trend or price
+        self.invalid = 0
+        self.errors: List[str] = []
+
+    def add_error(self, source: str, line: int, error: Exception) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{source}:{line}: {error}")
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "trends": self.trends,
+            "prices": self.prices,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+def read_rows(path: Union[str, Path]) -> Iterator[Tuple[int, Row]]:
+    """
+    Yield the rows of a CSV or JSONL file one at a time.
+
+    Args:
+        path: File ending in .csv, or .jsonl / .ndjson
+
+    Yields:
+        (line number, row) pairs; a JSONL line that is not an object yields a
+        RecordError in place of the row
+    """
+    path = Path(path)
+    suffix = _file_type(path)
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as source:
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+    else:
+        with open(path, encoding="utf-8") as source:
+            for line_number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, RecordError(f"invalid JSON: {e.msg}")
+                    continue
+                yield line_number, row if isinstance(row, dict) else RecordError("expected a JSON object")
+
+
+def _file_type(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise ValueError(f"Unsupported file type '{path.suffix}' for {path} (expected .csv, .jsonl or .ndjson)")
+    return suffix
+
+
+def _text(row: Row, field: str, required: bool = False) -> Optional[str]:
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise RecordError(f"missing '{field}'")
+        return None
+    if not isinstance(value, str):
+        raise RecordError(f"'{field}' must be text")
+    return value.strip()
+
+
+def trend_key(text: str) -> str:
+    """Normalize a key or title to a trend key (lowercase words joined by underscores)."""
+    return _KEY_RE.sub("_", text.lower()).strip("_")
+
+
+def validate_trend(row: Row) -> Tuple[str, Dict]:
+    """
+    Check a trend row against the trend schema.
+
+    Args:
+        row: Raw CSV or JSONL row
+
+    Returns:
+        Tuple of (trend key, record)
+
+    Raises:
+        RecordError: If a required field is missing or a value is malformed
+    """
+    title = _text(row, "trend", required=True)
+    key = trend_key(_text(row, "key") or title)
+    if not key:
+        raise RecordError("key has no letters or digits")
+
+    record: Dict[str, object] = {"trend": title}
+    for field in ("category", "description", "impact", "opportunity", "relevance_to_baho"):
+        value = _text(row, field, required=field in ("description", "impact"))
+        if value is not None:
+            record[field] = value.lower() if field == "category" else value
+    if parse_impact(record["impact"]) is ImpactLevel.UNKNOWN:
+        levels = ", ".join(level.label for level in ImpactLevel if level)
+        raise RecordError(f"impact '{record['impact']}' does not start with a level ({levels})")
+
+    data_points = row.get("data_points")
+    if isinstance(data_points, str):
+        data_points = [point.strip() for point in data_points.split(DATA_POINT_SEPARATOR)]
+    if data_points:
+        if not isinstance(data_points, list) or not all(isinstance(point, str) for point in data_points):
+            raise RecordError("'data_points' must be a list of text")
+        record["data_points"] = [point for point in data_points if point]
+
+    for field, value in row.items():
+        if field not in TREND_FIELDS and field != "key" and field and value not in (None, ""):
+            record[field] = value
+    return key, record
+
+
+def validate_price(row: Row) -> Tuple[str, str, str, str, float]:
+    """
+    Check a price row against the price schema.
+
+    Args:
+        row: Raw CSV or JSONL row
+
+    Returns:
+        Tuple of (ISO date, origin, grade, market, price in USD per lb)
+
+    Raises:
+        RecordError: If a required field is missing or a value is malformed
+    """
+    day = _text(row, "date", required=True)
+    try:
+        day = date.fromisoformat(day[:10]).isoformat()
+    except ValueError:
+        raise RecordError(f"date '{day}' is not YYYY-MM-DD") from None
+    origin = _text(row, "origin", required=True).lower()
+    grade = _text(row, "grade", required=True).lower()
+    market = _text(row, "market", required=True).lower()
+    if market not in PRICE_MARKETS:
+        raise RecordError(f"market '{market}' must be one of {', '.join(PRICE_MARKETS)}")
+    try:
+        price = float(row["price"])
+    except (TypeError, ValueError):
+        raise RecordError(f"price '{row['price']}' is not a number") from None
+    if not price > 0:
+        raise RecordError(f"price must be positive, got {price}")
+    return day, origin, grade, market, price
+
+
+def _row_counts(connection: sqlite3.Connection) -> Tuple[int, int]:
+    return (
+        connection.execute("SELECT COUNT(*) FROM trends").fetchone()[0],
+        connection.execute("SELECT COUNT(*) FROM prices").fetchone()[0],
+    )
+
+
+def _prepare_store(path: Path, temp_path: Path) -> None:
+    """Start the new store from the existing one, or from the built-in dataset."""
+    if path.exists():
+        shutil.copyfile(path, temp_path)
+    else:
+        from .coffee_trends_knowledge import COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO
+
+        write_sqlite_store(temp_path, COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO)
+
+
+def ingest_files(
+    store_path: Union[str, Path],
+    sources: Iterable[Union[str, Path]],
+    batch_size: int = BATCH_SIZE,
+) -> IngestReport:
+    """
+    Validate trend and price rows from CSV/JSONL files and write them to a SQLite trend store.
+
+    Args:
+        store_path: Trend store to add to (created from the built-in dataset if missing)
+        sources: CSV or JSONL files, read in order
+        batch_size: Rows written per executemany call
+
+    Returns:
+        IngestReport; invalid rows are counted and skipped
+
+    Raises:
+        ValueError: If a source has an unsupported file type
+    """
+    store_path = Path(store_path)
+    temp_path = store_path.with_name(f".{store_path.name}.{os.getpid()}.ingest")
+    if temp_path.exists():
+        temp_path.unlink()
+    sources = [Path(source) for source in sources]
+    for source in sources:
+        _file_type(source)
+        if not source.exists():
+            raise FileNotFoundError(f"Source '{source}' does not exist.")
+
+    report = IngestReport()
+    _prepare_store(store_path, temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(_SCHEMA)
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        next_position = connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM trends").fetchone()[0]
+        trends_before, prices_before = _row_counts(connection)
+        trend_batch: List[Tuple] = []
+        price_batch: List[Tuple] = []
+        valid_trends = valid_prices = 0
+
+        def flush() -> None:
+            # position keeps a trend's place when a later row replaces it
+            connection.executemany(
+                "INSERT INTO trends (position, key, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET payload = excluded.payload",
+                trend_batch,
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO prices (date, origin, grade, market, price) VALUES (?, ?, ?, ?, ?)",
+                price_batch,
+            )
+            trend_batch.clear()
+            price_batch.clear()
+
+        for source in sources:
+            for line_number, row in read_rows(source):
+                report.rows += 1
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    if "price" in row and row["price"] not in (None, ""):
+                        price_batch.append(validate_price(row))
+                        valid_prices += 1
+                    else:
+                        key, record = validate_trend(row)
+                        valid_trends += 1
+                        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                        trend_batch.append((next_position, key, payload))
+                        next_position += 1
+                except RecordError as e:
+                    report.add_error(source.name, line_number, e)
+                if len(trend_batch) + len(price_batch) >= batch_size:
+                    flush()
+        flush()
+        if valid_prices:
+            # Any price written may have changed a value, so servers must rebuild their price tables
+            connection.execute(
+                "INSERT OR REPLACE INTO store_meta (name, value) VALUES (?, ?)", (PRICES_VERSION_META, uuid.uuid4().hex)
+            )
+        connection.commit()
+
+        # Rows that did not add a trend or price replaced one (earlier in the input or in the store)
+        trends_after, prices_after = _row_counts(connection)
+        report.trends = trends_after - trends_before
+        report.prices = prices_after - prices_before
+        report.duplicates = valid_trends - report.trends + valid_prices - report.prices
+    except BaseException:
+        connection.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    connection.close()
+
+    os.replace(temp_path, store_path)
+    return report
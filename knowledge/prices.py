@@ -0,0 +1,379 @@
+"""
+Coffee Price Analytics
+Columnar green and retail coffee price series with vectorized analytics.
+
+Prices are ingested into a SQLite trend store by date, origin, grade (the
+Rwandan quality grades specialty / premium / standard, plus "commodity" for
+exchange-grade coffee) and market ("green" or "retail"):
+
+    python -m knowledge ingest coffee_trends.sqlite prices.csv
+
+On first use the prices of the snapshot being served are read once into a
+PriceTable: one int32 array of day numbers and one float64 array of prices,
+with every series stored contiguously and sorted by date. A series is then a
+pair of array slices, and rolling means, volatility and premiums over the
+commodity benchmark are computed with NumPy over whole series instead of
+row-by-row queries. The table is shared by all calls on a snapshot and kept
+across reloads that do not change the prices.
+
+Windows are measured in calendar days, so series with gaps (weekends,
+monthly reports) are handled the same way as daily ones.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .coffee_trends_knowledge import _traced, get_knowledge_snapshot
+from .snapshot import KnowledgeSnapshot
+from .trend_store import TrendStore
+
+# Grade of the exchange-traded benchmark that premiums are measured against
+COMMODITY_GRADE = "commodity"
+# Origin of the world benchmark (e.g. the ICE "C" price), used when an origin has no commodity series
+BENCHMARK_ORIGIN = "world"
+MOVING_AVERAGE_DAYS = (30, 90)
+DAYS_PER_YEAR = 365.25
+
+SeriesKey = Tuple[str, str, str]  # (origin, grade, market)
+
+_NO_PRICES_ERROR = (
+    "No price data is loaded. Import prices into a trend store with "
+    "'python -m knowledge ingest <store.sqlite> <prices.csv>' and serve it with COFFEE_TRENDS_STORE."
+)
+_TABLE_LOCK = threading.Lock()
+
+
+class PriceTable:
+    """All price series of a store in two contiguous NumPy arrays."""
+
+    __slots__ = ("days", "prices", "offsets")
+
+    def __init__(self, days: np.ndarray, prices: np.ndarray, offsets: Dict[SeriesKey, Tuple[int, int]]):
+        """
+        Args:
+            days: Day numbers (days since 1970-01-01), ascending within each series
+            prices: Prices in USD per lb, aligned with days
+            offsets: (start, stop) of each series in the arrays
+        """
+        self.days = days
+        self.prices = prices
+        self.offsets = offsets
+
+    @classmethod
+    def from_store(cls, store: TrendStore) -> "PriceTable":
+        """
+        Read every price series of a store into a table.
+
+        Args:
+            store: Trend store holding the prices
+
+        Returns:
+            PriceTable (empty when the store has no prices)
+        """
+        offsets: Dict[SeriesKey, Tuple[int, int]] = {}
+        position = 0
+        for origin, grade, market, count in store.price_series():
+            offsets[(origin, grade, market)] = (position, position + count)
+            position += count
+
+        days = np.empty(position, dtype=np.int32)
+        prices = np.empty(position, dtype=np.float64)
+        filled = 0
+        for batch in store.iter_price_batches():
+            rows = np.array(batch, dtype=np.float64)
+            days[filled:filled + len(rows)] = rows[:, 0]
+            prices[filled:filled + len(rows)] = rows[:, 1]
+            filled += len(rows)
+        return cls(days, prices, offsets)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def series(self, origin: str, grade: str, market: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get one price series.
+
+        Returns:
+            Tuple of (days, prices) array views, or None if there is no such series
+        """
+        bounds = self.offsets.get((origin, grade, market))
+        if bounds is None:
+            return None
+        start, stop = bounds
+        return self.days[start:stop], self.prices[start:stop]
+
+    def origins(self) -> List[str]:
+        return sorted({origin for origin, _, _ in self.offsets})
+
+    def grades(self, origin: str, market: str) -> List[str]:
+        return [grade for series_origin, grade, series_market in self.offsets
+                if series_origin == origin and series_market == market]
+
+
+def get_price_table(snapshot: Optional[KnowledgeSnapshot] = None) -> PriceTable:
+    """
+    Get the price table of a knowledge snapshot, reading it from the store on first use.
+
+    Args:
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+
+    Returns:
+        PriceTable
+    """
+    snapshot = snapshot or get_knowledge_snapshot()
+    table = snapshot.price_table
+    if table is None:
+        with _TABLE_LOCK:
+            table = snapshot.price_table
+            if table is None:
+                table = snapshot.price_table = PriceTable.from_store(snapshot.store)
+    return table
+
+
+def rolling_mean(days: np.ndarray, prices: np.ndarray, window_days: int) -> np.ndarray:
+    """
+    Moving average of a series over a calendar-day window.
+
+    Args:
+        days: Day numbers, ascending
+        prices: Prices aligned with days
+        window_days: Window length; each average covers the prices dated
+                     within window_days days up to and including its own date
+
+    Returns:
+        Array aligned with prices
+    """
+    totals = np.concatenate(([0.0], np.cumsum(prices)))
+    ends = np.arange(1, len(prices) + 1)
+    starts = np.searchsorted(days, days - (window_days - 1), side="left")
+    return (totals[ends] - totals[starts]) / (ends - starts)
+
+
+def rolling_volatility(days: np.ndarray, prices: np.ndarray, window_days: int) -> np.ndarray:
+    """
+    Annualized volatility (standard deviation of log returns) over a calendar-day window.
+
+    Returns are scaled by the square root of the number of observations per
+    year, estimated from the median spacing of the series.
+
+    Args:
+        days: Day numbers, ascending
+        prices: Prices aligned with days
+        window_days: Window length in days
+
+    Returns:
+        Array aligned with prices; NaN where the window holds fewer than two returns
+    """
+    volatility = np.full(len(prices), np.nan)
+    if len(prices) < 3:
+        return volatility
+    returns = np.diff(np.log(prices))
+    return_days = days[1:]
+    sums = np.concatenate(([0.0], np.cumsum(returns)))
+    squares = np.concatenate(([0.0], np.cumsum(returns * returns)))
+    ends = np.arange(1, len(returns) + 1)
+    starts = np.searchsorted(return_days, return_days - (window_days - 1), side="left")
+    counts = ends - starts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (sums[ends] - sums[starts]) / counts
+        variances = ((squares[ends] - squares[starts]) - counts * means * means) / (counts - 1)
+    variances = np.where(counts > 1, np.maximum(variances, 0.0), np.nan)
+    volatility[1:] = np.sqrt(variances * _periods_per_year(days))
+    return volatility
+
+
+def _periods_per_year(days: np.ndarray) -> float:
+    spacing = float(np.median(np.diff(days))) if len(days) > 1 else 1.0
+    return DAYS_PER_YEAR / max(spacing, 1.0)
+
+
+def _iso_date(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _window_start(days: np.ndarray, window_days: int) -> int:
+    """Index of the first price within window_days of the series' latest date."""
+    return int(np.searchsorted(days, days[-1] - (window_days - 1), side="left"))
+
+
+def _series_summary(days: np.ndarray, prices: np.ndarray, window_days: int) -> Dict:
+    start = _window_start(days, window_days)
+    window = prices[start:]
+    summary = {
+        "latest_date": _iso_date(days[-1]),
+        "latest_price": _round(prices[-1]),
+        "period_start": _iso_date(days[start]),
+        "observations": int(len(window)),
+        "average_price": _round(window.mean()),
+        "low": _round(window.min()),
+        "high": _round(window.max()),
+        "change_pct": _round((window[-1] / window[0] - 1.0) * 100.0, 1),
+    }
+    for average_days in MOVING_AVERAGE_DAYS:
+        summary[f"moving_average_{average_days}d"] = _round(rolling_mean(days, prices, average_days)[-1])
+    volatility = rolling_volatility(days[start:], window, window_days)[-1] if len(window) > 2 else math.nan
+    summary["annualized_volatility_pct"] = _round(volatility * 100.0, 1)
+    return summary
+
+
+def _benchmark(table: PriceTable, origin: str, market: str) -> Optional[Tuple[str, np.ndarray, np.ndarray]]:
+    """The commodity series premiums of an origin are measured against, with its origin."""
+    for benchmark_origin in (origin, BENCHMARK_ORIGIN):
+        series = table.series(benchmark_origin, COMMODITY_GRADE, market)
+        if series is not None:
+            return (benchmark_origin,) + series
+    return None
+
+
+def _unknown_origin(table: PriceTable, origin: str) -> Dict:
+    if not table.offsets:
+        return {"error": _NO_PRICES_ERROR}
+    return {
+        "error": f"No prices for origin '{origin}'.",
+        "available_origins": table.origins(),
+    }
+
+
+@_traced
+def get_coffee_prices(
+    origin: str,
+    grade: Optional[str] = None,
+    market: str = "green",
+    days: int = 365,
+    snapshot: Optional[KnowledgeSnapshot] = None,
+) -> Dict:
+    """
+    Summarize recent coffee prices for an origin.
+
+    Args:
+        origin: Producing origin (e.g., "rwanda", "ethiopia")
+        grade: Optional grade (specialty, premium, standard, commodity); defaults to every grade
+        market: "green" (exporter / importer prices) or "retail"
+        days: Length of the period summarized, ending at the latest price
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+
+    Returns:
+        Dictionary with, per grade, the latest price, the period's average,
+        range and change, moving averages and annualized volatility (USD per
+        lb), or a dictionary with an error
+    """
+    table = get_price_table(snapshot)
+    origin, market = origin.lower(), market.lower()
+    grades = table.grades(origin, market)
+    if not grades:
+        if origin not in table.origins():
+            return _unknown_origin(table, origin)
+        return {"error": f"No {market} prices for origin '{origin}'."}
+    if grade is not None:
+        if grade.lower() not in grades:
+            return {
+                "error": f"No {market} prices for grade '{grade}' from '{origin}'.",
+                "available_grades": grades,
+            }
+        grades = [grade.lower()]
+
+    days = max(int(days), 1)
+    return {
+        "origin": origin,
+        "market": market,
+        "currency": "USD/lb",
+        "period_days": days,
+        "grades": {name: _series_summary(*table.series(origin, name, market), days) for name in grades},
+    }
+
+
+@_traced
+def get_coffee_price_premiums(
+    origin: str = "rwanda",
+    market: str = "green",
+    days: int = 365,
+    snapshot: Optional[KnowledgeSnapshot] = None,
+) -> Dict:
+    """
+    Measure how far each grade of an origin is priced above commodity coffee.
+
+    The benchmark is the origin's own "commodity" grade, or the "world"
+    commodity price when the origin has none. Only dates priced in both
+    series are compared.
+
+    Args:
+        origin: Producing origin (e.g., "rwanda")
+        market: "green" or "retail"
+        days: Length of the period compared, ending at the latest common date
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+
+    Returns:
+        Dictionary with, per grade, the latest and average premium in USD per
+        lb and in percent, and its range, or a dictionary with an error
+    """
+    table = get_price_table(snapshot)
+    origin, market = origin.lower(), market.lower()
+    if origin not in table.origins():
+        return _unknown_origin(table, origin)
+    benchmark = _benchmark(table, origin, market)
+    if benchmark is None:
+        return {
+            "error": f"No {market} {COMMODITY_GRADE} benchmark for '{origin}' or '{BENCHMARK_ORIGIN}'.",
+        }
+    benchmark_origin, benchmark_days, benchmark_prices = benchmark
+
+    days = max(int(days), 1)
+    premiums: Dict[str, Dict] = {}
+    for grade in table.grades(origin, market):
+        if grade == COMMODITY_GRADE:
+            continue
+        grade_days, grade_prices = table.series(origin, grade, market)
+        common, grade_index, benchmark_index = np.intersect1d(
+            grade_days, benchmark_days, assume_unique=True, return_indices=True
+        )
+        if not len(common):
+            continue
+        start = _window_start(common, days)
+        premium = grade_prices[grade_index[start:]] - benchmark_prices[benchmark_index[start:]]
+        premium_pct = premium / benchmark_prices[benchmark_index[start:]] * 100.0
+        premiums[grade] = {
+            "latest_date": _iso_date(common[-1]),
+            "latest_premium": _round(premium[-1]),
+            "latest_premium_pct": _round(premium_pct[-1], 1),
+            "average_premium": _round(premium.mean()),
+            "average_premium_pct": _round(premium_pct.mean(), 1),
+            "min_premium": _round(premium.min()),
+            "max_premium": _round(premium.max()),
+            "observations": int(len(premium)),
+        }
+    if not premiums:
+        return {"error": f"No {market} prices from '{origin}' share dates with the {COMMODITY_GRADE} benchmark."}
+
+    return {
+        "origin": origin,
+        "market": market,
+        "currency": "USD/lb",
+        "period_days": days,
+        "benchmark": f"{benchmark_origin} {COMMODITY_GRADE}",
+        "premiums": premiums,
+    }
+
+
+def list_price_series(snapshot: Optional[KnowledgeSnapshot] = None) -> List[Dict]:
+    """
+    List the price series that are loaded.
+
+    Args:
+        snapshot: Optional snapshot to read from (defaults to the one being served)
+
+    Returns:
+        One {"origin", "grade", "market", "observations"} entry per series
+    """
+    table = get_price_table(snapshot)
+    return [
+        {"origin": origin, "grade": grade, "market": market, "observations": stop - start}
+        for (origin, grade, market), (start, stop) in table.offsets.items()
+    ]
@@ -0,0 +1,145 @@
+"""
+Trend Records
+Compact, read-only trend records and views for the knowledge base.
+
+A trend held as a dict costs a hash table per record, and every search or
+filter result used to copy its record into a new dict to add the key and
+score. Trend keeps the fields of a record in __slots__, with the impact level
+parsed once into the shared ImpactLevel enum and the key and category
+interned. TrendView adds the key, a search score or an impact label to a
+record without copying it.
+
+Both are read-only Mappings with the same keys as the dict records they
+replace (record["trend"], record.get("data_points"), dict(record), ...), so
+code written against the dict form keeps working. data_points is a tuple.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .facets import ImpactLevel, parse_impact
+
+# Record fields, in the order of COFFEE_TRENDS_DB entries
+TREND_FIELDS = ("trend", "category", "description", "impact", "opportunity", "data_points", "relevance_to_baho")
+_TREND_FIELD_SET = frozenset(TREND_FIELDS)
+
+
+class Trend(Mapping):
+    """One trend record. Fields outside TREND_FIELDS are kept in a small side dict."""
+
+    __slots__ = TREND_FIELDS + ("key", "impact_level", "_extra")
+
+    def __init__(
+        self,
+        key: str,
+        trend: Optional[str] = None,
+        category: Optional[str] = None,
+        description: Optional[str] = None,
+        impact: Optional[str] = None,
+        opportunity: Optional[str] = None,
+        data_points: Optional[Tuple[str, ...]] = None,
+        relevance_to_baho: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.key = sys.intern(key)
+        self.trend = trend
+        self.category = sys.intern(category) if category is not None else None
+        self.description = description
+        self.impact = impact
+        self.opportunity = opportunity
+        self.data_points = tuple(data_points) if data_points is not None else None
+        self.relevance_to_baho = relevance_to_baho
+        self.impact_level: ImpactLevel = parse_impact(impact)
+        self._extra = extra or None
+
+    @classmethod
+    def from_record(cls, key: str, record: Mapping) -> "Trend":
+        """
+        Build a Trend from a dict record (as in COFFEE_TRENDS_DB or a store payload).
+
+        Args:
+            key: Trend key
+            record: Trend record; a Trend is returned as is
+
+        Returns:
+            Trend
+        """
+        if isinstance(record, Trend):
+            return record
+        fields = {name: value for name, value in record.items() if name in _TREND_FIELD_SET}
+        extra = {name: value for name, value in record.items() if name not in _TREND_FIELD_SET}
+        return cls(key, **fields, extra=extra)
+
+    def __getitem__(self, name: str) -> Any:
+        if name in _TREND_FIELD_SET:
+            value = getattr(self, name)
+            if value is not None:
+                return value
+        elif self._extra is not None and name in self._extra:
+            return self._extra[name]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in TREND_FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Trend({self.key!r}, trend={self.trend!r}, impact_level={self.impact_level.label})"
+
+
+class TrendView(Mapping):
+    """
+    A trend record seen with its key and optional result fields, without copying it.
+
+    Reads as {"key": ..., "score": ..., "impact_level": ..., **record}, with
+    score and impact_level present only when given. Other attributes
+    (view.trend, view.data_points, ...) are read from the record.
+    """
+
+    __slots__ = ("record", "score", "_impact_label")
+
+    def __init__(self, record: Trend, score: Optional[float] = None, impact_label: bool = False):
+        """
+        Args:
+            record: Trend being viewed
+            score: Search score to show under "score"
+            impact_label: Show the parsed impact level's label under "impact_level"
+        """
+        self.record = record
+        self.score = score
+        self._impact_label = impact_label
+
+    def __getitem__(self, name: str) -> Any:
+        if name == "key":
+            return self.record.key
+        if name == "score" and self.score is not None:
+            return self.score
+        if name == "impact_level" and self._impact_label:
+            return self.record.impact_level.label
+        return self.record[name]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "key"
+        if self.score is not None:
+            yield "score"
+        if self._impact_label:
+            yield "impact_level"
+        yield from self.record
+
+    def __len__(self) -> int:
+        return 1 + (self.score is not None) + self._impact_label + len(self.record)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "record":
+            raise AttributeError(name)
+        return getattr(self.record, name)
+
+    def __repr__(self) -> str:
+        return f"TrendView({self.record.key!r}, score={self.score!r})"
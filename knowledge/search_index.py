@@ -0,0 +1,217 @@
+"""
+Coffee Trends Search Index
+Tokenized inverted index with BM25 ranking over the coffee trends database
+"""
+
+import heapq
+import math
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Fields that are indexed for each trend, with their BM25F-style weights.
+# The trend key itself is indexed too so "subscription" still finds "subscription_models".
+SEARCH_FIELDS = {
+    "key": 2.0,
+    "trend": 2.0,
+    "description": 1.0,
+    "relevance_to_baho": 1.0,
+    "opportunity": 1.0,
+    "data_points": 1.0,
+}
+
+# BM25 tuning parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multiplier for vocabulary terms reached by prefix expansion ("rwanda" -> "rwandan")
+PREFIX_MATCH_WEIGHT = 0.5
+MIN_PREFIX_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _field_text(trend_key: str, trend_data: Mapping, field: str) -> str:
+    """Return the indexable text for one field of a trend record."""
+    if field == "key":
+        return trend_key.replace("_", " ")
+    value = trend_data.get(field, "")
+    if isinstance(value, (list, tuple)):
+        return " ".join(value)
+    return value or ""
+
+
+def _term_frequencies(trend_key: str, trend_data: Mapping) -> Tuple[Tuple[str, float], ...]:
+    """Weighted term frequencies of one trend record, with interned terms."""
+    term_freqs: Counter = Counter()
+    for field, weight in SEARCH_FIELDS.items():
+        for token in tokenize(_field_text(trend_key, trend_data, field)):
+            term_freqs[sys.intern(token)] += weight
+    return tuple(term_freqs.items())
+
+
+class TrendSearchIndex:
+    """
+    Inverted index over trend records, built once and queried many times.
+
+    BM25 weights are precomputed per posting at build time, so a query only
+    sums the postings of its terms and selects the top results with a heap.
+    Per-record term frequencies are kept so updated() can re-tokenize only
+    the records that changed.
+    """
+
+    def __init__(self, trends: Union[Mapping[str, Mapping], Iterable[Tuple[str, Mapping]]] = ()):
+        """
+        Build the index.
+
+        Args:
+            trends: Mapping of trend key to trend record (same shape as COFFEE_TRENDS_DB),
+                    or an iterable of (key, record) pairs so records can be streamed from a store
+        """
+        self._keys: List[str] = []
+        self._doc_terms: List[Tuple[Tuple[str, float], ...]] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._vocabulary: List[str] = []
+
+        for key, trend_data in (trends.items() if isinstance(trends, Mapping) else trends):
+            self._keys.append(key)
+            self._doc_terms.append(_term_frequencies(key, trend_data))
+        self._build()
+
+    def updated(self, keys: Sequence[str], changed_records: Mapping[str, Mapping]) -> "TrendSearchIndex":
+        """
+        Build a new index for a changed dataset, leaving this one untouched.
+
+        Only records in changed_records are re-tokenized; every other key reuses
+        its term frequencies from this index. BM25 weights depend on corpus-wide
+        statistics, so they are recomputed for all postings.
+
+        Args:
+            keys: Every trend key of the new dataset, in dataset order
+            changed_records: Records that are new or modified since this index was built
+
+        Returns:
+            New TrendSearchIndex
+        """
+        doc_positions = {key: position for position, key in enumerate(self._keys)}
+        index = TrendSearchIndex()
+        for key in keys:
+            index._keys.append(key)
+            if key in changed_records:
+                index._doc_terms.append(_term_frequencies(key, changed_records[key]))
+            else:
+                index._doc_terms.append(self._doc_terms[doc_positions[key]])
+        index._build()
+        return index
+
+    def _build(self) -> None:
+        doc_lengths = [sum(freq for _, freq in term_freqs) for term_freqs in self._doc_terms]
+        num_docs = len(self._keys)
+        # Documents that tokenize to nothing (or none at all) must not zero the length normalization
+        avg_length = (sum(doc_lengths) / num_docs if num_docs else 0.0) or 1.0
+
+        raw_postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, term_freqs in enumerate(self._doc_terms):
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length)
+            for term, freq in term_freqs:
+                raw_postings[term].append((doc_id, freq * (BM25_K1 + 1) / (freq + length_norm)))
+
+        for term, postings in raw_postings.items():
+            doc_freq = len(postings)
+            idf = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            self._postings[term] = [(doc_id, idf * tf_weight) for doc_id, tf_weight in postings]
+
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Map a query term to indexed terms: the exact term plus prefix completions."""
+        expansions = []
+        if term in self._postings:
+            expansions.append((term, 1.0))
+        if len(term) >= MIN_PREFIX_LENGTH:
+            position = bisect_left(self._vocabulary, term)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+                candidate = self._vocabulary[position]
+                if candidate != term:
+                    expansions.append((candidate, PREFIX_MATCH_WEIGHT))
+                position += 1
+        return expansions
+
+    def _score_term(self, term: str) -> Dict[int, float]:
+        """Best score per document for a single query term across its expansions."""
+        scores: Dict[int, float] = {}
+        for indexed_term, weight in self._expand(term):
+            for doc_id, posting_score in self._postings[indexed_term]:
+                score = posting_score * weight
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None, operator: str = "or") -> List[Tuple[str, float]]:
+        """
+        Rank trends against a query.
+
+        Args:
+            query: Free-text query. An uppercase "AND" between words requires all terms to match.
+            limit: Maximum number of results (None returns every match)
+            operator: "or" to match any term, "and" to require every term
+
+        Returns:
+            List of (trend_key, score) tuples, best match first
+        """
+        operator = operator.lower()
+        if operator not in ("or", "and"):
+            raise ValueError(f"Unknown search operator '{operator}'. Use 'and' or 'or'.")
+
+        words = query.split()
+        if "AND" in words:
+            operator = "and"
+        terms = list(dict.fromkeys(
+            token for word in words if word not in ("AND", "OR") for token in tokenize(word)
+        ))
+        if not terms:
+            return []
+
+        totals: Dict[int, float] = {}
+        for position, term in enumerate(terms):
+            term_scores = self._score_term(term)
+            if operator == "and":
+                if position == 0:
+                    totals = term_scores
+                else:
+                    totals = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in totals.items() if doc_id in term_scores
+                    }
+                if not totals:
+                    return []
+            else:
+                for doc_id, score in term_scores.items():
+                    totals[doc_id] = totals.get(doc_id, 0.0) + score
+
+        # Ties keep database order so results are stable between calls
+        ranked: Iterable[Tuple[int, float]] = totals.items()
+        sort_key = lambda item: (item[1], -item[0])
+        if limit is None:
+            ranked = sorted(ranked, key=sort_key, reverse=True)
+        else:
+            ranked = heapq.nlargest(max(limit, 0), ranked, key=sort_key)
+        return [(self._keys[doc_id], score) for doc_id, score in ranked]
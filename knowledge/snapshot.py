@@ -0,0 +1,175 @@
+"""
+Knowledge Base Snapshots
+Immutable view of a trend store plus its search index and facets, swapped atomically on reload.
+
+Every knowledge function reads the current snapshot once and works against
+that object only, so a call that is in flight while a reload happens keeps a
+consistent view of the old data. A reload builds the next snapshot off to the
+side, re-tokenizing only records whose content changed, and then publishes
+it with a single reference assignment.
+"""
+
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .facets import RecordFacets, TrendFacets, derive_record_facets
+from .search_index import TrendSearchIndex
+from .trend_store import TrendStore
+
+
+class KnowledgeDiff(NamedTuple):
+    """Differences between two knowledge snapshots."""
+
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    rwanda_changed: bool
+    prices_changed: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed or self.rwanda_changed or self.prices_changed)
+
+    def to_dict(self) -> Dict:
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "rwanda_changed": self.rwanda_changed,
+            "prices_changed": self.prices_changed,
+        }
+
+
+def _as_dict(value):
+    # Trend records are Mappings; hash them exactly like the dicts they replace
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def fingerprint(data) -> str:
+    """
+    Content hash of a knowledge record, independent of dict ordering.
+
+    Args:
+        data: JSON-serializable record
+
+    Returns:
+        Short hex digest
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_as_dict)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class KnowledgeSnapshot:
+    """A trend store with its search index, facets and content fingerprints at one point in time."""
+
+    __slots__ = (
+        "store", "index", "facets", "fingerprints", "rwanda_fingerprint", "prices_signature", "version",
+        "price_table", "__weakref__",
+    )
+
+    def __init__(
+        self,
+        store: TrendStore,
+        index: TrendSearchIndex,
+        facets: TrendFacets,
+        fingerprints: Dict[str, str],
+        rwanda_fingerprint: str,
+        prices_signature: Optional[str] = None,
+    ):
+        self.store = store
+        self.index = index
+        self.facets = facets
+        self.fingerprints = fingerprints
+        self.rwanda_fingerprint = rwanda_fingerprint
+        self.prices_signature = store.prices_signature() if prices_signature is None else prices_signature
+        parts = [list(fingerprints.items()), rwanda_fingerprint]
+        if self.prices_signature:
+            parts.append(self.prices_signature)
+        self.version = fingerprint(parts)
+        # Columnar prices, loaded from the store on first use by knowledge.prices
+        self.price_table = None
+
+    @classmethod
+    def build(
+        cls,
+        store: TrendStore,
+        previous: Optional["KnowledgeSnapshot"] = None,
+    ) -> Tuple["KnowledgeSnapshot", KnowledgeDiff]:
+        """
+        Build a snapshot for a store, reusing index work from a previous snapshot.
+
+        Args:
+            store: Store holding the new dataset
+            previous: Snapshot currently being served, if any
+
+        Returns:
+            Tuple of (new snapshot, diff against previous)
+        """
+        fingerprints: Dict[str, str] = {}
+        record_facets: Dict[str, RecordFacets] = {}
+        rwanda_info = store.get_rwanda_info()
+        rwanda_fingerprint = fingerprint(rwanda_info)
+        rwanda_regions = rwanda_info.get("regions") or {}
+
+        if previous is None:
+            index = TrendSearchIndex(
+                _record_fingerprints(store.iter_trends(), fingerprints, record_facets, rwanda_regions)
+            )
+            facets = TrendFacets(record_facets, rwanda_regions)
+            snapshot = cls(store, index, facets, fingerprints, rwanda_fingerprint)
+            return snapshot, KnowledgeDiff(list(fingerprints), [], [], True, bool(snapshot.prices_signature))
+
+        # Facets mention Rwandan regions by name, so a region list change re-derives them all
+        reusable_facets = previous.facets.record_facets
+        if set(rwanda_regions) != set(previous.facets.rwanda_regions):
+            reusable_facets = {}
+
+        changed_records = {}
+        for key, record in store.iter_trends():
+            fingerprints[key] = fingerprint(record)
+            unchanged = previous.fingerprints.get(key) == fingerprints[key]
+            if not unchanged:
+                changed_records[key] = record
+            if unchanged and key in reusable_facets:
+                record_facets[key] = reusable_facets[key]
+            else:
+                record_facets[key] = derive_record_facets(record, rwanda_regions)
+
+        prices_signature = store.prices_signature()
+        diff = KnowledgeDiff(
+            added=[key for key in changed_records if key not in previous.fingerprints],
+            changed=[key for key in changed_records if key in previous.fingerprints],
+            removed=[key for key in previous.fingerprints if key not in fingerprints],
+            rwanda_changed=rwanda_fingerprint != previous.rwanda_fingerprint,
+            prices_changed=prices_signature != previous.prices_signature,
+        )
+
+        if changed_records or diff.removed or list(fingerprints) != list(previous.fingerprints):
+            index = previous.index.updated(list(fingerprints), changed_records)
+        else:
+            index = previous.index
+        if diff.is_empty and list(fingerprints) == list(previous.fingerprints):
+            facets = previous.facets
+        else:
+            facets = TrendFacets(record_facets, rwanda_regions)
+        snapshot = cls(store, index, facets, fingerprints, rwanda_fingerprint, prices_signature)
+        if not diff.prices_changed:
+            snapshot.price_table = previous.price_table
+        return snapshot, diff
+
+
+def _record_fingerprints(
+    trends: Iterable[Tuple[str, Dict]],
+    fingerprints: Dict[str, str],
+    record_facets: Dict[str, RecordFacets],
+    rwanda_regions: Iterable[str],
+) -> Iterator[Tuple[str, Dict]]:
+    """Pass (key, record) pairs through while recording each record's fingerprint and facets."""
+    for key, record in trends:
+        fingerprints[key] = fingerprint(record)
+        record_facets[key] = derive_record_facets(record, rwanda_regions)
+        yield key, record
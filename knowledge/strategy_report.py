@@ -0,0 +1,151 @@
+"""
+Strategy Report
+The BAHO strategy report, built once per knowledge version and day and served as is.
+
+get_trends_for_baho_strategy() filters the high-impact trends and assembles
+the opportunity and recommendation lists, and rendering the result produces
+a multi-kilobyte report. Neither changes until the knowledge base is reloaded
+or the date changes, so get_strategy_report() keeps the latest report, both
+structured (JSON) and rendered (text), each with its own ETag, and rebuilds
+it only when the snapshot's version or the day differs from the one it was
+built for. precompute_strategy_report() builds it ahead of the first request;
+the server does so at startup, after a knowledge reload and just after
+midnight (see servers/reports.py).
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Mapping, NamedTuple, Optional
+
+from telemetry import KNOWLEDGE_SECONDS, traced
+
+from .coffee_trends_knowledge import get_knowledge_snapshot, get_trends_for_baho_strategy
+from .snapshot import KnowledgeSnapshot, _as_dict
+
+
+class StrategyReport(NamedTuple):
+    """The strategy report for one knowledge version and day, in both served forms."""
+
+    version: str
+    date: str
+    data: Dict
+    text: str
+    json: str
+    text_etag: str
+    json_etag: str
+
+    def is_current(self, version: str, date: str) -> bool:
+        return self.version == version and self.date == date
+
+
+def render_strategy_report(strategy: Mapping) -> str:
+    """
+    Render the BAHO strategy analysis as tool output.
+
+    Args:
+        strategy: Result of get_trends_for_baho_strategy()
+
+    Returns:
+        Formatted report
+    """
+    lines = [
+        f"🎯 {strategy['summary']}",
+        f"Date: {strategy['date']}",
+        "",
+        "📈 HIGH IMPACT TRENDS:",
+    ]
+    for i, trend in enumerate(strategy['high_impact_trends'], 1):
+        lines.append("")
+        lines.append(f"{i}. {trend['trend']}")
+        lines.append(f"   Impact: {trend['impact']}")
+        lines.append(f"   {trend['description'][:200]}...")
+
+    lines.extend(["", "", "💡 KEY OPPORTUNITIES:"])
+    lines.extend(f"{i}. {opp}" for i, opp in enumerate(strategy['key_opportunities'], 1))
+
+    lines.extend(["", "", "🎯 STRATEGIC RECOMMENDATIONS:"])
+    lines.extend(f"{i}. {rec}" for i, rec in enumerate(strategy['strategic_recommendations'], 1))
+
+    mp = strategy['market_positioning']
+    lines.extend(["", "", "📊 MARKET POSITIONING:", "", "Strengths:"])
+    lines.extend(f"  • {strength}" for strength in mp['strengths'])
+    lines.extend(["", "Challenges:"])
+    lines.extend(f"  • {challenge}" for challenge in mp['challenges'])
+    lines.extend(["", "Opportunities:"])
+    lines.extend(f"  • {opp}" for opp in mp['opportunities'])
+    return "\n".join(lines) + "\n"
+
+
+def _etag(body: str) -> str:
+    """Strong ETag of a response body."""
+    return '"' + hashlib.blake2b(body.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+@traced("knowledge.build_strategy_report", KNOWLEDGE_SECONDS, function="build_strategy_report")
+def build_strategy_report(snapshot: Optional[KnowledgeSnapshot] = None, date: Optional[str] = None) -> StrategyReport:
+    """
+    Build the strategy report from a knowledge snapshot.
+
+    Args:
+        snapshot: Snapshot to read from (defaults to the one being served)
+        date: Report date as YYYY-MM-DD (defaults to today)
+
+    Returns:
+        StrategyReport
+    """
+    snapshot = snapshot or get_knowledge_snapshot()
+    date = date or _today()
+    # Trend records become plain dicts, so the report holds no store objects
+    data = json.loads(json.dumps(get_trends_for_baho_strategy(snapshot=snapshot, date=date), default=_as_dict))
+    text = render_strategy_report(data)
+    body = json.dumps({"version": snapshot.version, **data}, ensure_ascii=False, indent=2)
+    return StrategyReport(snapshot.version, date, data, text, body, _etag(text), _etag(body))
+
+
+_report: Optional[StrategyReport] = None
+_report_lock = threading.Lock()
+
+
+def current_strategy_report() -> Optional[StrategyReport]:
+    """Return the stored report if it is current for the snapshot being served and today, else None."""
+    report = _report
+    if report is not None and report.is_current(get_knowledge_snapshot().version, _today()):
+        return report
+    return None
+
+
+def get_strategy_report(snapshot: Optional[KnowledgeSnapshot] = None) -> StrategyReport:
+    """
+    Return the strategy report for a snapshot and today, building it if it is not current.
+
+    Args:
+        snapshot: Snapshot to read from (defaults to the one being served)
+
+    Returns:
+        StrategyReport, shared by every caller until the version or the day changes
+    """
+    global _report
+    snapshot = snapshot or get_knowledge_snapshot()
+    date = _today()
+    report = _report
+    if report is not None and report.is_current(snapshot.version, date):
+        return report
+    with _report_lock:
+        report = _report
+        if report is None or not report.is_current(snapshot.version, date):
+            report = build_strategy_report(snapshot, date)
+            # A call on an older snapshot (a reload raced it) does not replace a newer report
+            if snapshot is get_knowledge_snapshot():
+                _report = report
+    return report
+
+
+def precompute_strategy_report() -> StrategyReport:
+    """Build the report for the snapshot being served and today, unless it is already current."""
+    return get_strategy_report()
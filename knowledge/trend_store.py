@@ -0,0 +1,363 @@
+"""
+Coffee Trends Store
+Storage backends for the coffee trends knowledge base.
+
+The built-in dataset lives in coffee_trends_knowledge.py and is served by
+DictTrendStore. Every store hands out records as compact Trend objects (see
+records.py). For larger corpora, export it (or an ingested dataset) to a
+SQLite file and point COFFEE_TRENDS_STORE at it: every worker then opens the
+file read-only with memory-mapped I/O, so pages are shared through the OS
+page cache instead of being duplicated as Python dicts per process.
+
+    python -m knowledge export coffee_trends.sqlite
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .records import Trend
+
+# Environment variable naming a SQLite trend store to load instead of the built-in dataset
+TREND_STORE_ENV_VAR = "COFFEE_TRENDS_STORE"
+
+# Upper bound on the memory-mapped region per connection (SQLite maps at most the file size)
+SQLITE_MMAP_SIZE = 1 << 30
+
+# store_meta row that ingestion sets to a new value whenever it writes prices
+PRICES_VERSION_META = "prices_version"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trends (
+    position INTEGER NOT NULL,
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rwanda_info (
+    position INTEGER NOT NULL,
+    category TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trends_by_position ON trends (position);
+CREATE TABLE IF NOT EXISTS prices (
+    origin TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    market TEXT NOT NULL,
+    date TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (origin, grade, market, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class TrendStore(ABC):
+    """
+    Read interface the knowledge functions use to reach trend and Rwanda data.
+
+    Keys are stored lowercase; lookups are expected to be lowercased by the caller.
+    """
+
+    @abstractmethod
+    def get_trend(self, trend_key: str) -> Optional[Trend]:
+        """Return one trend record, or None if the key is unknown."""
+
+    @abstractmethod
+    def trend_keys(self) -> List[str]:
+        """Return all trend keys in dataset order."""
+
+    @abstractmethod
+    def iter_trends(self) -> Iterator[Tuple[str, Trend]]:
+        """Yield (key, record) pairs in dataset order."""
+
+    @abstractmethod
+    def get_rwanda_category(self, category: str) -> Optional[Union[Dict, List, str]]:
+        """Return one Rwandan coffee category, or None if unknown."""
+
+    @abstractmethod
+    def rwanda_categories(self) -> List[str]:
+        """Return all Rwandan coffee categories in dataset order."""
+
+    def get_rwanda_info(self) -> Dict:
+        """Return every Rwandan coffee category as a dict."""
+        return {category: self.get_rwanda_category(category) for category in self.rwanda_categories()}
+
+    def price_series(self) -> List[Tuple[str, str, str, int]]:
+        """Return (origin, grade, market, number of prices) of every price series, in storage order."""
+        return []
+
+    def iter_price_batches(self, batch_size: int = 100_000) -> Iterator[List[Tuple[int, float]]]:
+        """Yield (day number since 1970-01-01, price) rows of all series, in price_series() order and by date."""
+        return iter(())
+
+    def prices_signature(self) -> str:
+        """Marker that changes whenever the prices change ("" without prices)."""
+        return ""
+
+    def __len__(self) -> int:
+        return len(self.trend_keys())
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class DictTrendStore(TrendStore):
+    """Store backed by in-process records, used for the built-in dataset."""
+
+    def __init__(self, trends: Mapping[str, Mapping], rwanda_info: Mapping[str, object]):
+        """
+        Args:
+            trends: Mapping of trend key to record (dict or Trend); dicts are converted to Trend
+            rwanda_info: Mapping of Rwandan coffee category to its data
+        """
+        self._trends: Dict[str, Trend] = {
+            sys.intern(key): Trend.from_record(key, record) for key, record in trends.items()
+        }
+        self._rwanda_info = rwanda_info
+
+    def get_trend(self, trend_key: str) -> Optional[Trend]:
+        return self._trends.get(trend_key)
+
+    def trend_keys(self) -> List[str]:
+        return list(self._trends.keys())
+
+    def iter_trends(self) -> Iterator[Tuple[str, Trend]]:
+        return iter(self._trends.items())
+
+    def get_rwanda_category(self, category: str) -> Optional[Union[Dict, List, str]]:
+        return self._rwanda_info.get(category)
+
+    def rwanda_categories(self) -> List[str]:
+        return list(self._rwanda_info.keys())
+
+    def get_rwanda_info(self) -> Dict:
+        return self._rwanda_info
+
+    def __len__(self) -> int:
+        return len(self._trends)
+
+
+class _StoreReplaced(RuntimeError):
+    """The store's path names a different file than the one the store opened."""
+
+
+class SQLiteTrendStore(TrendStore):
+    """
+    Read-only store backed by a SQLite file opened with memory-mapped I/O.
+
+    Records are kept as compact JSON rows and decoded on access, so a worker
+    only holds the records it is actually serving. The store stays on the file
+    it opened even when ingestion or an export replaces that path: all threads
+    share one connection, taken under a lock, and the file is held open so a
+    forked worker can check that the path still names it before reconnecting.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Trend store '{self.path}' does not exist.")
+        self._lock = threading.RLock()
+        self._file = None
+        self._db = None
+        self._pid = None
+        # Pin the file first, then connect to the path only while it still names the pinned file
+        for _ in range(3):
+            self._file = os.open(self.path, os.O_RDONLY)
+            try:
+                self._connection()
+                break
+            except _StoreReplaced:
+                os.close(self._file)
+                self._file = None
+        else:
+            raise RuntimeError(f"Trend store '{self.path}' kept being replaced while it was opened.")
+        self._keys = [row[0] for row in self._execute("SELECT key FROM trends ORDER BY position")]
+        self._categories = [row[0] for row in self._execute("SELECT category FROM rwanda_info ORDER BY position")]
+        # Stores exported before price ingestion (or its version marker) existed lack these tables
+        tables = {row[0] for row in self._execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self._has_prices = "prices" in tables
+        self._has_meta = "store_meta" in tables
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with the lock held (or from __init__); a forked worker must not reuse its parent's connection
+        if self._db is not None and self._pid == os.getpid():
+            return self._db
+        if self._file is None:
+            raise sqlite3.ProgrammingError(f"Trend store '{self.path}' is closed.")
+        connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            connection.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+            connection.execute("PRAGMA query_only = ON")
+            # Reading the schema makes SQLite open the file; only then compare it with the pinned one
+            connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+            pinned, current = os.fstat(self._file), os.stat(self.path)
+            if (pinned.st_dev, pinned.st_ino) != (current.st_dev, current.st_ino):
+                raise _StoreReplaced(
+                    f"Trend store '{self.path}' was replaced after it was opened; reload the knowledge base."
+                )
+        except BaseException:
+            connection.close()
+            raise
+        self._db = connection
+        self._pid = os.getpid()
+        return connection
+
+    def _execute(self, sql: str, parameters: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connection().execute(sql, parameters).fetchall()
+
+    def _iter_rows(self, sql: str, batch_size: int) -> Iterator[List[Tuple]]:
+        """Yield the rows of a query in batches, holding the lock only while fetching each one."""
+        with self._lock:
+            cursor = self._connection().execute(sql)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            with self._lock:
+                cursor.close()
+
+    def get_trend(self, trend_key: str) -> Optional[Trend]:
+        rows = self._execute("SELECT payload FROM trends WHERE key = ?", (trend_key,))
+        return Trend.from_record(trend_key, json.loads(rows[0][0])) if rows else None
+
+    def trend_keys(self) -> List[str]:
+        return list(self._keys)
+
+    def iter_trends(self) -> Iterator[Tuple[str, Trend]]:
+        for rows in self._iter_rows("SELECT key, payload FROM trends ORDER BY position", 1000):
+            for key, payload in rows:
+                yield key, Trend.from_record(key, json.loads(payload))
+
+    def get_rwanda_category(self, category: str) -> Optional[Union[Dict, List, str]]:
+        rows = self._execute("SELECT payload FROM rwanda_info WHERE category = ?", (category,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def rwanda_categories(self) -> List[str]:
+        return list(self._categories)
+
+    def price_series(self) -> List[Tuple[str, str, str, int]]:
+        if not self._has_prices:
+            return []
+        return self._execute(
+            "SELECT origin, grade, market, COUNT(*) FROM prices GROUP BY origin, grade, market "
+            "ORDER BY origin, grade, market"
+        )
+
+    def iter_price_batches(self, batch_size: int = 100_000) -> Iterator[List[Tuple[int, float]]]:
+        if not self._has_prices:
+            return
+        # Primary key order, so SQLite reads the table front to back without sorting
+        yield from self._iter_rows(
+            "SELECT CAST(julianday(date) - 2440587.5 AS INTEGER), price FROM prices "
+            "ORDER BY origin, grade, market, date",
+            batch_size,
+        )
+
+    def prices_signature(self) -> str:
+        if not self._has_prices or not self._execute("SELECT 1 FROM prices LIMIT 1"):
+            return ""
+        if self._has_meta:
+            rows = self._execute("SELECT value FROM store_meta WHERE name = ?", (PRICES_VERSION_META,))
+            if rows:
+                return rows[0][0]
+        # No marker (prices written by other tools): digest every row, which costs one full read
+        digest = hashlib.blake2b(digest_size=16)
+        for rows in self._iter_rows(
+            "SELECT origin, grade, market, date, price FROM prices ORDER BY origin, grade, market, date", 10_000
+        ):
+            for origin, grade, market, day, price in rows:
+                digest.update(f"{origin}\x1f{grade}\x1f{market}\x1f{day}\x1f".encode("utf-8"))
+                digest.update(struct.pack("<d", price))
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                if self._pid == os.getpid():
+                    self._db.close()
+                self._db = None
+            if self._file is not None:
+                os.close(self._file)
+                self._file = None
+
+
+def write_sqlite_store(
+    path: Union[str, Path],
+    trends: Mapping[str, Mapping],
+    rwanda_info: Mapping[str, object],
+) -> Path:
+    """
+    Write a dataset to a SQLite trend store, replacing any existing file atomically.
+
+    Args:
+        path: Destination file
+        trends: Mapping of trend key to trend record
+        rwanda_info: Mapping of Rwandan coffee category to its data
+
+    Returns:
+        Path of the written store
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(_SCHEMA)
+        connection.executemany(
+            "INSERT INTO trends (position, key, payload) VALUES (?, ?, ?)",
+            (
+                (position, key.lower(), json.dumps(dict(record), ensure_ascii=False, separators=(",", ":")))
+                for position, (key, record) in enumerate(trends.items())
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO rwanda_info (position, category, payload) VALUES (?, ?, ?)",
+            (
+                (position, category.lower(), json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+                for position, (category, data) in enumerate(rwanda_info.items())
+            ),
+        )
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(temp_path, path)
+    return path
+
+
+def open_trend_store(path: Optional[Union[str, Path]] = None) -> Optional[TrendStore]:
+    """
+    Open the configured on-disk trend store.
+
+    Args:
+        path: Store file; defaults to the COFFEE_TRENDS_STORE environment variable
+
+    Returns:
+        SQLiteTrendStore, or None when no store is configured
+    """
+    path = path or os.environ.get(TREND_STORE_ENV_VAR)
+    if not path:
+        return None
+    return SQLiteTrendStore(path)
+
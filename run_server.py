@@ -1,10 +1,11 @@
 """
 Main entry point to run the Coffee Trends Agent server
+
+Accepts the launcher's options, e.g. `python run_server.py --workers 4`.
 """
 
-from servers.coffee_trends_server import app
-import uvicorn
+import sys
+from servers.launcher import main
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=8001)
-
+    sys.exit(main())
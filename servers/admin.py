@@ -0,0 +1,104 @@
+"""
+Admin Routes for the Coffee Trends Agent Server
+Operational endpoints mounted next to the A2A routes.
+
+The routes are only registered when COFFEE_TRENDS_ADMIN_TOKEN is set, and every
+request must send it as a bearer token:
+
+    curl -X POST -H "Authorization: Bearer $COFFEE_TRENDS_ADMIN_TOKEN" \\
+         http://localhost:8001/admin/reload
+"""
+
+import hmac
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cache import cache_stats
+from knowledge import get_knowledge_version, open_trend_store, precompute_strategy_report, reload_knowledge
+
+# Environment variable holding the shared secret for admin routes
+ADMIN_TOKEN_ENV_VAR = "COFFEE_TRENDS_ADMIN_TOKEN"
+
+
+def _authorized(request: Request, token: str) -> bool:
+    """Check the request's bearer token against the admin token."""
+    header = request.headers.get("authorization", "")
+    scheme, _, provided = header.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(provided.strip(), token)
+
+
+def register_admin_routes(app: Starlette) -> bool:
+    """
+    Add admin routes to the A2A application.
+
+    Routes:
+        GET  /admin/knowledge  Current knowledge base version
+        GET  /admin/cache      Size, hit/miss ratio and lookup latency of every cache
+        POST /admin/reload     Reload the knowledge base. An optional JSON body
+                               {"path": "..."} names a SQLite trend store to load;
+                               otherwise COFFEE_TRENDS_STORE is reopened.
+
+    Args:
+        app: Starlette application returned by to_a2a()
+
+    Returns:
+        True if the routes were registered, False if no admin token is configured
+    """
+    token = os.environ.get(ADMIN_TOKEN_ENV_VAR)
+    if not token:
+        return False
+
+    async def knowledge_version(request: Request) -> JSONResponse:
+        if not _authorized(request, token):
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return JSONResponse({"version": get_knowledge_version()})
+
+    async def caches(request: Request) -> JSONResponse:
+        if not _authorized(request, token):
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return JSONResponse(cache_stats())
+
+    async def reload(request: Request) -> JSONResponse:
+        if not _authorized(request, token):
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+
+        body = await request.body()
+        path = None
+        if body:
+            try:
+                path = (await request.json()).get("path")
+            except (ValueError, AttributeError):
+                return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+
+        previous_version = get_knowledge_version()
+        try:
+            # Opening and indexing the new dataset runs off the event loop so
+            # requests keep being served from the current snapshot meanwhile.
+            store = await run_in_threadpool(open_trend_store, path) if path else None
+            diff = await run_in_threadpool(reload_knowledge, store)
+            # The next /reports/strategy request is served the new version's report at once
+            await run_in_threadpool(precompute_strategy_report)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            return JSONResponse({"error": f"Reload failed: {e}"}, status_code=400)
+
+        return JSONResponse({
+            "previous_version": previous_version,
+            "version": get_knowledge_version(),
+            **diff.to_dict(),
+        })
+
+    app.add_route("/admin/knowledge", knowledge_version, methods=["GET"])
+    app.add_route("/admin/cache", caches, methods=["GET"])
+    app.add_route("/admin/reload", reload, methods=["POST"])
+    return True
@@ -12,12 +12,29 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from agents import coffee_trends_a2a_app
+from config import AgentConfig
+from servers.admin import register_admin_routes
+from servers.metrics import register_metrics_route
+from servers.reports import register_report_routes
 
-# The app is already configured in coffee_trends_agent.py
-# This file just imports it for uvicorn to run
+# The agent and its A2A app are built on first access to coffee_trends_a2a_app
+# (see agents/coffee_trends_agent.py); this file exposes it for uvicorn to run
 app = coffee_trends_a2a_app
 
+# Knowledge reload endpoints (enabled by COFFEE_TRENDS_ADMIN_TOKEN)
+register_admin_routes(app)
+
+# Precomputed strategy report at /reports/strategy, with ETag revalidation
+register_report_routes(app)
+
+# Prometheus metrics (disabled by COFFEE_TELEMETRY=off)
+if AgentConfig.from_env().telemetry != "off":
+    register_metrics_route(app)
+
 if __name__ == "__main__":
+    # Single process for development; use servers/launcher.py for multiple workers
     import uvicorn
-    uvicorn.run(app, host="localhost", port=8001)
+    from config import ServerConfig
+    config = ServerConfig.from_env()
+    uvicorn.run(app, host=config.host, port=config.port)
 
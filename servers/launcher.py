@@ -0,0 +1,286 @@
+"""
+Production Launcher for the Coffee Trends Agent Server
+Runs the A2A app in several pre-forked uvicorn worker processes.
+
+Tool execution and JSON serialization are CPU-bound and a single process is
+limited to one core, so the server scales by adding worker processes. The
+master process builds the app and the knowledge base once, binds the listening
+socket, then forks the workers. The preloaded objects are frozen out of the
+garbage collector's reach before forking, so workers share those pages
+copy-on-write instead of each holding a private copy.
+
+Signals sent to the master:
+    SIGTERM / SIGINT  Stop accepting connections, let every worker finish its
+                      in-flight A2A requests (up to the graceful timeout), exit.
+    SIGHUP            Reload the knowledge base in the master, then replace the
+                      workers one generation at a time; old workers drain while
+                      new ones already accept connections.
+
+Usage:
+    python -m servers.launcher --workers 4 --host 0.0.0.0 --port 8001
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import ServerConfig
+from config.settings import TRENDS_PORT_ENV_VAR
+
+logger = logging.getLogger(__name__)
+
+# Extra time given to workers past the graceful timeout before they are killed
+SHUTDOWN_GRACE_MARGIN = 5.0
+
+# Minimum delay between respawns of a worker that keeps crashing
+RESPAWN_DELAY = 1.0
+
+
+def preload_app():
+    """
+    Import the server module, building the agent, its A2A app and the knowledge snapshot.
+
+    Returns:
+        The Starlette application
+    """
+    from servers.coffee_trends_server import app
+
+    return app
+
+
+def _bind_socket(config: ServerConfig) -> socket.socket:
+    """Create the listening socket shared by every worker."""
+    family = socket.AF_INET6 if ":" in config.host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((config.host, config.port))
+    sock.listen(config.backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _uvicorn_config(app, config: ServerConfig):
+    import uvicorn
+
+    return uvicorn.Config(
+        app,
+        host=config.host,
+        port=config.port,
+        backlog=config.backlog,
+        timeout_keep_alive=int(config.keep_alive),
+        limit_concurrency=config.limit_concurrency,
+        timeout_graceful_shutdown=int(config.graceful_timeout),
+    )
+
+
+def run_worker(app, config: ServerConfig, sock: Optional[socket.socket] = None) -> None:
+    """
+    Serve the app in this process until SIGTERM or SIGINT.
+
+    uvicorn handles the signals itself: it stops accepting connections, closes
+    idle keep-alive connections and waits up to the graceful timeout for
+    in-flight requests (including streaming A2A tasks) to complete.
+
+    Args:
+        app: ASGI application
+        config: Server settings
+        sock: Listening socket inherited from the master; None to bind host:port here
+    """
+    import uvicorn
+
+    server = uvicorn.Server(_uvicorn_config(app, config))
+    server.run(sockets=[sock] if sock is not None else None)
+
+
+class Supervisor:
+    """Master process that forks, monitors and replaces worker processes."""
+
+    def __init__(self, app, config: ServerConfig, sock: socket.socket):
+        self.app = app
+        self.config = config
+        self.sock = sock
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.retiring: Dict[int, float] = {}  # pid -> kill deadline
+        self._stopping = False
+        self._reload_requested = False
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Worker: uvicorn installs its own SIGTERM/SIGINT handlers
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                run_worker(self.app, self.config, self.sock)
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+        return pid
+
+    def _terminate(self, pids: List[int]) -> None:
+        deadline = time.monotonic() + self.config.graceful_timeout + SHUTDOWN_GRACE_MARGIN
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.retiring[pid] = deadline
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+    def _reload(self) -> None:
+        from knowledge import get_knowledge_version, reload_knowledge
+
+        try:
+            diff = reload_knowledge()
+        except Exception:
+            logger.exception("Knowledge reload failed; keeping the current workers")
+            return
+        logger.info("Knowledge reloaded (version %s, %s); replacing workers", get_knowledge_version(), diff.to_dict())
+        gc.freeze()
+        old_workers = list(self.workers)
+        for _ in old_workers:
+            self._spawn()
+        self._terminate(old_workers)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.retiring:
+                del self.retiring[pid]
+                continue
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            logger.warning("Worker %d exited unexpectedly (status %d)", pid, status)
+            if not self._stopping:
+                time.sleep(max(0.0, RESPAWN_DELAY - (time.monotonic() - started)))
+                self._spawn()
+
+    def run(self) -> int:
+        """Fork the workers and supervise them until shutdown. Returns the exit code."""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.config.workers):
+            self._spawn()
+
+        while self.workers or self.retiring:
+            if self._stopping and self.workers:
+                logger.info("Shutting down: draining %d worker(s)", len(self.workers))
+                # Workers close their copies as they stop accepting; once all are
+                # closed, new connections are refused instead of queueing
+                self.sock.close()
+                self._terminate(list(self.workers))
+            if self._reload_requested and not self._stopping:
+                self._reload_requested = False
+                self._reload()
+            self._reap()
+            now = time.monotonic()
+            for pid, deadline in list(self.retiring.items()):
+                if now > deadline:
+                    logger.warning("Worker %d did not drain in time; killing it", pid)
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        del self.retiring[pid]
+            time.sleep(0.1)
+
+        self.sock.close()
+        return 0
+
+
+def serve(config: Optional[ServerConfig] = None, app=None) -> int:
+    """
+    Preload the app and serve it with the configured number of workers.
+
+    With one worker, or on platforms without fork(), the app is served from
+    this process.
+
+    Args:
+        config: Server settings (default: ServerConfig.from_env())
+        app: Application to serve (default: the Coffee Trends Agent server app)
+
+    Returns:
+        Process exit code
+    """
+    config = config or ServerConfig.from_env()
+    if app is None:
+        app = preload_app()
+
+    if config.workers <= 1 or not hasattr(os, "fork"):
+        run_worker(app, config)
+        return 0
+
+    sock = _bind_socket(config)
+    # Move everything loaded so far out of the collector's generations so that
+    # collections in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    return Supervisor(app, config, sock).run()
+
+
+def main(argv=None) -> int:
+    defaults = ServerConfig.from_env()
+    parser = argparse.ArgumentParser(description="Serve the Coffee Trends Agent with pre-forked workers.")
+    parser.add_argument("--host", default=defaults.host, help=f"bind address (default {defaults.host})")
+    parser.add_argument("--port", type=int, default=defaults.port, help=f"port (default {defaults.port})")
+    parser.add_argument("--workers", type=int, default=defaults.workers,
+                        help=f"worker processes (default {defaults.workers}; usually one per core)")
+    parser.add_argument("--keep-alive", type=float, default=defaults.keep_alive,
+                        help=f"seconds to hold idle keep-alive connections (default {defaults.keep_alive:g})")
+    parser.add_argument("--backlog", type=int, default=defaults.backlog,
+                        help=f"listen backlog (default {defaults.backlog})")
+    parser.add_argument("--limit-concurrency", type=int, default=defaults.limit_concurrency,
+                        help="connections per worker before answering 503 (default unlimited)")
+    parser.add_argument("--graceful-timeout", type=float, default=defaults.graceful_timeout,
+                        help=f"seconds to drain in-flight requests on shutdown (default {defaults.graceful_timeout:g})")
+    args = parser.parse_args(argv)
+
+    config = replace(
+        defaults,
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency,
+        graceful_timeout=args.graceful_timeout,
+    )
+    # The agent card advertises the served port unless COFFEE_TRENDS_PORT/URL say otherwise
+    os.environ.setdefault(TRENDS_PORT_ENV_VAR, str(config.port))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+    print(f"🚀 Serving Coffee Trends Agent on http://{config.host}:{config.port} with {config.workers} worker(s)")
+    return serve(config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Metrics Route for the Coffee Trends Agent Server
+Serves the process's metrics to Prometheus at GET /metrics.
+
+    curl http://localhost:8001/metrics
+
+Reports the latency histograms of agent turns, model calls, tool calls,
+knowledge functions and HTTP requests, model token counts, the hit and miss
+counts of every registered cache, the tool pool's load and the model
+scheduler's concurrency limit (see telemetry/metrics.py, agents/tool_pool.py
+and clients/model_scheduler.py). With several workers, each scrape is answered
+by one worker with its own values.
+"""
+
+import sys
+from pathlib import Path
+from typing import Iterable, List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.tool_pool import get_tool_pool
+from clients.model_scheduler import model_schedulers
+from cache import cache_stats
+from telemetry import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricFamily, render_prometheus
+
+# Statistics of cache.cache_stats() reported per cache, as (stats key, metric, type, help)
+_CACHE_METRICS = (
+    ("hits", "coffee_cache_hits_total", "counter", "Lookups answered from the cache."),
+    ("misses", "coffee_cache_misses_total", "counter", "Lookups the cache could not answer."),
+    ("size", "coffee_cache_entries", "gauge", "Entries held by the cache."),
+)
+
+
+def collect_cache_metrics() -> Iterable[MetricFamily]:
+    """Read hit, miss and size counts of every registered cache."""
+    stats = cache_stats()
+    for key, name, kind, documentation in _CACHE_METRICS:
+        samples: List = [
+            ({"cache": cache}, values[key])
+            for cache, values in stats.items()
+            if isinstance(values.get(key), (int, float))
+        ]
+        if samples:
+            yield MetricFamily(name, kind, documentation, samples)
+
+
+def collect_tool_pool_metrics() -> Iterable[MetricFamily]:
+    """Read how many tool calls are running on and waiting for the tool pool."""
+    pool = get_tool_pool()
+    if pool is None:
+        return
+    stats = pool.stats()
+    yield MetricFamily("coffee_tool_pool_running", "gauge", "Tool calls running on the tool pool.", [({}, stats["running"])])
+    yield MetricFamily("coffee_tool_pool_waiting", "gauge", "Tool calls waiting for a tool pool worker.", [({}, stats["waiting"])])
+
+
+def collect_model_scheduler_metrics() -> Iterable[MetricFamily]:
+    """Read the adaptive concurrency limit and the model calls in flight of each model scheduler."""
+    stats = [scheduler.stats() for scheduler in model_schedulers()]
+    if not stats:
+        return
+    yield MetricFamily(
+        "coffee_model_concurrency_limit", "gauge", "Model calls the model scheduler currently allows in flight.",
+        [({"scheduler": str(i)}, values["concurrency_limit"]) for i, values in enumerate(stats)],
+    )
+    yield MetricFamily(
+        "coffee_model_in_flight", "gauge", "Model calls in flight.",
+        [({"scheduler": str(i)}, values["in_flight"]) for i, values in enumerate(stats)],
+    )
+
+
+def register_metrics_route(app: Starlette) -> None:
+    """
+    Add GET /metrics to the A2A application.
+
+    Args:
+        app: Starlette application returned by to_a2a()
+    """
+    REGISTRY.register_collector("caches", collect_cache_metrics)
+    REGISTRY.register_collector("tool_pool", collect_tool_pool_metrics)
+    REGISTRY.register_collector("model_scheduler", collect_model_scheduler_metrics)
+
+    async def metrics(request: Request) -> Response:
+        return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_route("/metrics", metrics, methods=["GET"])
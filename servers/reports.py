@@ -0,0 +1,122 @@
+"""
+Report Routes for the Coffee Trends Agent Server
+Serves the precomputed BAHO strategy report as a static HTTP resource.
+
+    curl http://localhost:8001/reports/strategy        # rendered text
+    curl http://localhost:8001/reports/strategy.json   # structured report
+
+The report changes only when the knowledge base is reloaded or the day
+changes (see knowledge/strategy_report.py), so it is served from memory with
+an ETag: a client that sends the ETag back in If-None-Match gets an empty
+304 Not Modified until the report changes. The report is built when the
+routes are registered (before the launcher forks its workers) and rebuilt by
+each worker just after midnight; a reload through /admin/reload rebuilds it
+straight away.
+"""
+
+import asyncio
+import logging
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Add parent directory to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from knowledge import StrategyReport, current_strategy_report, get_strategy_report, precompute_strategy_report
+
+logger = logging.getLogger(__name__)
+
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+# Clients may keep the report but must revalidate it (cheaply, with its ETag) before reuse
+CACHE_CONTROL = "no-cache"
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    tags = (tag.strip() for tag in header.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+def _report_response(request: Request, body: str, etag: str, media_type: str, version: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "X-Knowledge-Version": version}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, headers=headers, media_type=media_type)
+
+
+def _seconds_until_tomorrow() -> float:
+    now = datetime.now()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+async def refresh_strategy_report_daily() -> None:
+    """Rebuild the strategy report just after every midnight, for as long as the server runs."""
+    while True:
+        # A second past midnight, so the new day has begun on every clock reading
+        await asyncio.sleep(_seconds_until_tomorrow() + 1)
+        try:
+            report = await run_in_threadpool(precompute_strategy_report)
+            logger.info("Strategy report for %s precomputed (version %s)", report.date, report.version)
+        except Exception:
+            logger.exception("Precomputing the strategy report failed; it will be built on first request")
+
+
+async def _current_report() -> StrategyReport:
+    # Answered on the loop when the report is current; a rebuild (a new day, or a
+    # reload that bypassed /admin/reload) runs off it
+    return current_strategy_report() or await run_in_threadpool(get_strategy_report)
+
+
+def register_report_routes(app: Starlette) -> None:
+    """
+    Add the strategy report routes to the A2A application and keep the report precomputed.
+
+    Routes:
+        GET /reports/strategy       Rendered report (text)
+        GET /reports/strategy.json  Structured report (JSON), with the knowledge version
+
+    Args:
+        app: Starlette application returned by to_a2a()
+    """
+    precompute_strategy_report()
+
+    async def strategy_text(request: Request) -> Response:
+        report = await _current_report()
+        return _report_response(request, report.text, report.text_etag, TEXT_CONTENT_TYPE, report.version)
+
+    async def strategy_json(request: Request) -> Response:
+        report = await _current_report()
+        return _report_response(request, report.json, report.json_etag, JSON_CONTENT_TYPE, report.version)
+
+    app.add_route("/reports/strategy", strategy_text, methods=["GET"])
+    app.add_route("/reports/strategy.json", strategy_json, methods=["GET"])
+
+    # Each worker runs its own daily refresh next to the A2A app's lifespan
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with app_lifespan(app) as state:
+            refresher = asyncio.create_task(refresh_strategy_report_daily())
+            try:
+                yield state
+            finally:
+                refresher.cancel()
+
+    app.router.lifespan_context = lifespan
@@ -0,0 +1,7 @@
+"""
+Sessions Package
+"""
+
+from .session_store import SQLiteSessionService, session_service_from_env
+
+__all__ = ["SQLiteSessionService", "session_service_from_env"]
@@ -0,0 +1,473 @@
+"""
+Bounded Session Store
+ADK session service backed by SQLite, with a per-session history window,
+idle-session eviction and a cap on the number of sessions.
+
+ADK's InMemorySessionService keeps every event of every session in process
+memory for the life of the process: a long conversation grows without limit,
+its whole history is re-sent to the model on every turn, and everything is
+lost on restart and invisible to other worker processes.
+
+SQLiteSessionService stores sessions in a SQLite file shared by all processes
+on a host (or in memory with path ":memory:"), and bounds what it keeps:
+    max_events     Events kept per session. Older events are dropped whole
+                   turns at a time (the cut is always at a user message), so
+                   the model never sees a tool response without its call.
+    idle_timeout   Sessions not updated for this many seconds are deleted.
+    max_sessions   Least recently updated sessions beyond this are deleted;
+                   keep it well above the number of concurrent conversations.
+
+Session, user ("user:" keys) and app ("app:" keys) state are stored the way
+ADK's own persistent services store them, so agents see no difference. The
+async methods run their SQLite work on a thread of the service's own, so a
+slow disk or a busy database never stalls the event loop.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar, Union
+
+from google.adk.errors import StaleSessionError
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+# Environment variables read by session_service_from_env()
+SESSION_STORE_ENV_VAR = "COFFEE_SESSION_STORE"  # "memory" or a SQLite file path
+SESSION_MAX_EVENTS_ENV_VAR = "COFFEE_SESSION_MAX_EVENTS"
+SESSION_IDLE_TIMEOUT_ENV_VAR = "COFFEE_SESSION_IDLE_TIMEOUT"  # seconds
+SESSION_MAX_SESSIONS_ENV_VAR = "COFFEE_SESSION_MAX_SESSIONS"
+
+DEFAULT_MAX_EVENTS = 60
+DEFAULT_IDLE_TIMEOUT_SECONDS = 3600.0
+DEFAULT_MAX_SESSIONS = 1000
+
+# Minimum seconds between sweeps for idle sessions
+EVICTION_INTERVAL_SECONDS = 60.0
+
+T = TypeVar("T")
+
+
+class SQLiteSessionService(BaseSessionService):
+    """
+    Session service storing bounded session histories in SQLite.
+
+    Example:
+        session_service = SQLiteSessionService("sessions.db", max_events=40)
+        runner = Runner(agent=agent, app_name="baho_strategy_app", session_service=session_service)
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS app_states (
+        app_name TEXT PRIMARY KEY,
+        state TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS user_states (
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        PRIMARY KEY (app_name, user_id)
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        create_time REAL NOT NULL,
+        update_time REAL NOT NULL,
+        PRIMARY KEY (app_name, user_id, id)
+    );
+    CREATE INDEX IF NOT EXISTS sessions_by_update_time ON sessions (update_time);
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        author TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        event_data TEXT NOT NULL,
+        FOREIGN KEY (app_name, user_id, session_id) REFERENCES sessions (app_name, user_id, id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        max_events: Optional[int] = DEFAULT_MAX_EVENTS,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        max_sessions: Optional[int] = DEFAULT_MAX_SESSIONS,
+    ):
+        """
+        Args:
+            path: SQLite file, or ":memory:" for a store private to this process
+            max_events: Events kept per session (None for no limit)
+            idle_timeout: Seconds after its last update that a session is deleted (None to keep)
+            max_sessions: Sessions kept, least recently updated deleted first (None for no limit)
+        """
+        self.path = str(path)
+        self.max_events = max_events
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.evicted = 0
+        self.trimmed_events = 0
+        self._lock = threading.RLock()
+        self._connection_pid = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid = None
+        self._next_eviction = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process, never inherited by a forked worker
+        if self._db is None or self._connection_pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            if self.path != ":memory:":
+                db.execute("PRAGMA journal_mode = WAL")
+                db.execute("PRAGMA synchronous = NORMAL")
+            db.execute("PRAGMA foreign_keys = ON")
+            db.executescript(self._SCHEMA)
+            self._db = db
+            self._connection_pid = os.getpid()
+        return self._db
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # One thread: the connection serializes the work anyway. A forked worker starts its own.
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coffee-sessions")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    async def _run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Run blocking SQLite work on the service's thread and wait for its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(function, *args, **kwargs))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    @staticmethod
+    def _load_state(db: sqlite3.Connection, query: str, params: tuple) -> Dict[str, Any]:
+        row = db.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _merged_state(self, db: sqlite3.Connection, app_name: str, user_id: str, session_state: Dict) -> Dict:
+        app_state = self._load_state(db, "SELECT state FROM app_states WHERE app_name = ?", (app_name,))
+        user_state = self._load_state(
+            db, "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        )
+        merged = dict(session_state)
+        merged.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+        merged.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+        return merged
+
+    def _apply_state_delta(self, db: sqlite3.Connection, app_name: str, user_id: str, delta: Dict) -> Dict:
+        """Store the app and user parts of a state delta; return its session part."""
+        deltas = _session_util.extract_json_safe_state_delta(delta)
+        if deltas["app"]:
+            state = self._load_state(db, "SELECT state FROM app_states WHERE app_name = ?", (app_name,))
+            state.update(deltas["app"])
+            db.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (app_name, json.dumps(state))
+            )
+        if deltas["user"]:
+            state = self._load_state(
+                db, "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            )
+            state.update(deltas["user"])
+            db.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+        return deltas["session"]
+
+    def _evict(self, db: sqlite3.Connection, now: float, force: bool = False) -> None:
+        """Delete idle sessions and, past max_sessions, the least recently updated ones."""
+        if not force and now < self._next_eviction:
+            return
+        self._next_eviction = now + EVICTION_INTERVAL_SECONDS
+        deleted = 0
+        if self.idle_timeout is not None:
+            deleted += db.execute("DELETE FROM sessions WHERE update_time < ?", (now - self.idle_timeout,)).rowcount
+        if self.max_sessions is not None:
+            deleted += db.execute(
+                "DELETE FROM sessions WHERE rowid IN ("
+                " SELECT rowid FROM sessions ORDER BY update_time DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            ).rowcount
+        self.evicted += deleted
+
+    def _trim_history(self, db: sqlite3.Connection, app_name: str, user_id: str, session_id: str) -> None:
+        """Drop the oldest whole turns of a session until at most max_events remain."""
+        key = (app_name, user_id, session_id)
+        count = db.execute(
+            "SELECT COUNT(*) FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+        ).fetchone()[0]
+        if self.max_events is None or count <= self.max_events:
+            return
+        # The earliest turn start (a user message) leaving at most max_events events
+        row = db.execute(
+            "SELECT seq FROM ("
+            " SELECT seq, author, ROW_NUMBER() OVER (ORDER BY seq DESC) AS position FROM events"
+            " WHERE app_name = ? AND user_id = ? AND session_id = ?)"
+            " WHERE author = 'user' AND position <= ? ORDER BY seq LIMIT 1",
+            (*key, self.max_events),
+        ).fetchone()
+        if row is None:
+            return  # the current turn alone exceeds the window; never split it
+        self.trimmed_events += db.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq < ?", (*key, row[0])
+        ).rowcount
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        return await self._run(self._create_session, app_name, user_id, state, session_id)
+
+    def _create_session(self, app_name: str, user_id: str, state: Optional[Dict[str, Any]], session_id: str) -> Session:
+        now = time.time()
+        with self._transaction() as db:
+            self._evict(db, now)
+            if self.idle_timeout is not None:
+                # get_session() already treats an idle session as gone, so its id may come
+                # back (A2A reuses the context id) before the next sweep deletes it
+                self.evicted += db.execute(
+                    "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ? AND update_time < ?",
+                    (app_name, user_id, session_id, now - self.idle_timeout),
+                ).rowcount
+            session_state = self._apply_state_delta(db, app_name, user_id, state or {})
+            try:
+                db.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, json.dumps(session_state), now, now),
+                )
+            except sqlite3.IntegrityError:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            if self.max_sessions is not None:
+                count = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+                if count > self.max_sessions:
+                    self._evict(db, now, force=True)
+            merged = self._merged_state(db, app_name, user_id, session_state)
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged, events=[], last_update_time=now)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await self._run(self._get_session, app_name, user_id, session_id, config)
+
+    def _get_session(
+        self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]
+    ) -> Optional[Session]:
+        with self._lock:
+            db = self._connection()
+            row = db.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if self.idle_timeout is not None and row[1] < time.time() - self.idle_timeout:
+                return None  # idle; deleted by the next sweep
+
+            query = "SELECT event_data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: list = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY seq DESC"
+            if config and config.num_recent_events is not None:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            event_rows = db.execute(query, params).fetchall()
+            merged = self._merged_state(db, app_name, user_id, json.loads(row[0]))
+
+        events = [Event.model_validate_json(event_row[0]) for event_row in reversed(event_rows)]
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id, state=merged, events=events, last_update_time=row[1]
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await self._run(self._list_sessions, app_name, user_id)
+
+    def _list_sessions(self, app_name: str, user_id: Optional[str]) -> ListSessionsResponse:
+        with self._lock:
+            db = self._connection()
+            if user_id is None:
+                rows = db.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions WHERE app_name = ? ORDER BY update_time",
+                    (app_name,),
+                ).fetchall()
+            else:
+                rows = db.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions"
+                    " WHERE app_name = ? AND user_id = ? ORDER BY update_time",
+                    (app_name, user_id),
+                ).fetchall()
+            sessions = [
+                Session(
+                    app_name=app_name,
+                    user_id=row_user_id,
+                    id=session_id,
+                    state=self._merged_state(db, app_name, row_user_id, json.loads(state)),
+                    events=[],
+                    last_update_time=update_time,
+                )
+                for session_id, row_user_id, state, update_time in rows
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete_session, app_name, user_id, session_id)
+
+    def _delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", (app_name, user_id, session_id)
+            )
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await self._run(self._get_user_state, app_name, user_id)
+
+    def _get_user_state(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._load_state(
+                self._connection(),
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id),
+            )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        self._apply_temp_state(session, event)
+        event = self._trim_temp_delta_state(event)
+        await self._run(self._store_event, session, event)
+        session.last_update_time = event.timestamp
+        return self._commit_event_to_session(session, event)
+
+    def _store_event(self, session: Session, event: Event) -> None:
+        """Write an event and its state delta, unless the session changed since it was loaded."""
+        key = (session.app_name, session.user_id, session.id)
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+            ).fetchone()
+            if row is None:
+                raise SessionNotFoundError(f"Session {session.id} not found.")
+            if row[1] > session.last_update_time:
+                raise StaleSessionError(
+                    f"Session {session.id} was updated elsewhere since it was loaded; reload it and retry."
+                )
+            session_state = json.loads(row[0])
+            if event.actions and event.actions.state_delta:
+                delta = event.actions.state_delta
+                session_state.update(self._apply_state_delta(db, session.app_name, session.user_id, delta))
+            db.execute(
+                "INSERT INTO events (app_name, user_id, session_id, author, timestamp, event_data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, event.author or "", event.timestamp, event.model_dump_json(exclude_none=True)),
+            )
+            db.execute(
+                "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps(session_state), event.timestamp, *key),
+            )
+            self._trim_history(db, *key)
+
+    def evict_idle(self) -> None:
+        """Delete idle sessions and sessions over the cap now, instead of on the next sweep."""
+        with self._transaction() as db:
+            self._evict(db, time.time(), force=True)
+
+    def stats(self) -> Dict[str, Union[int, float, None]]:
+        with self._lock:
+            db = self._connection()
+            sessions = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            events = db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {
+            "sessions": sessions,
+            "events": events,
+            "max_events": self.max_events,
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "evicted_sessions": self.evicted,
+            "trimmed_events": self.trimmed_events,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            executor = self._executor if self._executor_pid == os.getpid() else None
+            self._executor = None
+        if executor is not None:
+            # Outside the lock: queued work still needs it to finish
+            executor.shutdown(wait=True)
+        with self._lock:
+            if self._db is not None and self._connection_pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+def _optional_number(name: str, default, cast):
+    """Read a numeric environment variable; 0 or "none" means no limit."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if value.strip().lower() in ("", "0", "none", "off"):
+        return None
+    return cast(value)
+
+
+def session_service_from_env() -> SQLiteSessionService:
+    """
+    Create the session service configured by environment variables.
+
+    COFFEE_SESSION_STORE selects the storage: "memory" (default) for sessions
+    private to this process, or a file path for a SQLite database that
+    survives restarts and is shared by all workers. COFFEE_SESSION_MAX_EVENTS,
+    COFFEE_SESSION_IDLE_TIMEOUT and COFFEE_SESSION_MAX_SESSIONS set the bounds
+    (0 for no limit).
+
+    Returns:
+        SQLiteSessionService
+    """
+    store = os.environ.get(SESSION_STORE_ENV_VAR, "memory").strip()
+    return SQLiteSessionService(
+        ":memory:" if store in ("", "memory", ":memory:") else store,
+        max_events=_optional_number(SESSION_MAX_EVENTS_ENV_VAR, DEFAULT_MAX_EVENTS, int),
+        idle_timeout=_optional_number(SESSION_IDLE_TIMEOUT_ENV_VAR, DEFAULT_IDLE_TIMEOUT_SECONDS, float),
+        max_sessions=_optional_number(SESSION_MAX_SESSIONS_ENV_VAR, DEFAULT_MAX_SESSIONS, int),
+    )
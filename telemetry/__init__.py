@@ -0,0 +1,66 @@
+"""
+Telemetry Package
+"""
+
+from .metrics import (
+    Counter,
+    Histogram,
+    MetricFamily,
+    MetricsRegistry,
+    REGISTRY,
+    PROMETHEUS_CONTENT_TYPE,
+    AGENT_TURN_SECONDS,
+    MODEL_CALL_SECONDS,
+    MODEL_TOKENS,
+    MODEL_WAIT_SECONDS,
+    MODEL_RETRIES,
+    TOOL_CALL_SECONDS,
+    TOOL_POOL_WAIT_SECONDS,
+    TOOL_POOL_REJECTED,
+    KNOWLEDGE_SECONDS,
+    A2A_CLIENT_SECONDS,
+    HTTP_SERVER_SECONDS,
+    render_prometheus,
+)
+from .tracing import TELEMETRY_MODES, configure_telemetry, get_span_exporter, get_tracer, traced
+
+# The propagation helpers need httpx; load them on first use so the knowledge
+# base, which uses traced(), can import this package cheaply.
+_PROPAGATION_ATTRIBUTES = ("TracingTransport", "TraceContextMiddleware")
+
+
+def __getattr__(name: str):
+    if name in _PROPAGATION_ATTRIBUTES:
+        from . import propagation
+
+        return getattr(propagation, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricFamily",
+    "MetricsRegistry",
+    "REGISTRY",
+    "PROMETHEUS_CONTENT_TYPE",
+    "AGENT_TURN_SECONDS",
+    "MODEL_CALL_SECONDS",
+    "MODEL_TOKENS",
+    "MODEL_WAIT_SECONDS",
+    "MODEL_RETRIES",
+    "TOOL_CALL_SECONDS",
+    "TOOL_POOL_WAIT_SECONDS",
+    "TOOL_POOL_REJECTED",
+    "KNOWLEDGE_SECONDS",
+    "A2A_CLIENT_SECONDS",
+    "HTTP_SERVER_SECONDS",
+    "render_prometheus",
+    "TELEMETRY_MODES",
+    "configure_telemetry",
+    "get_span_exporter",
+    "get_tracer",
+    "traced",
+    "TracingTransport",
+    "TraceContextMiddleware",
+]
@@ -0,0 +1,258 @@
+"""
+Metrics
+Prometheus-style counters and histograms for the agents' hot paths.
+
+Metrics live in a MetricsRegistry and are rendered in the Prometheus text
+exposition format, e.g. by the trends server's GET /metrics route:
+
+    coffee_agent_turn_seconds_bucket{agent="coffee_trends_agent",le="0.5"} 12
+    coffee_model_tokens_sum{agent="coffee_trends_agent",direction="input"} 48213
+
+Values are kept per process; with several server workers, each scrape reports
+the worker that answered it. Collectors registered with register_collector()
+add values read at scrape time, such as cache hit counts.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached lookups (sub-millisecond) up to slow model turns
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+
+class MetricFamily(NamedTuple):
+    """Values of one metric read by a collector at scrape time."""
+
+    name: str
+    kind: str  # "counter" or "gauge"
+    documentation: str
+    samples: List[Tuple[Dict[str, str], float]]
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Observations per label set, counted into fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> per-bucket counts (last one is +Inf), then the sum
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def sum(self, **labels) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = self.header()
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values[:-1]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(values[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics and scrape-time collectors of one process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter with this name, creating it on first use."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram with this name, creating it on first use."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """
+        Add values read at scrape time.
+
+        Args:
+            name: Unique name for the collector (re-registering a name replaces it)
+            collector: Returns the MetricFamily values to report
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text, served with PROMETHEUS_CONTENT_TYPE
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for family in collector():
+                lines.append(f"# HELP {family.name} {family.documentation}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for labels, value in family.samples:
+                    lines.append(f"{family.name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registry of this process, rendered by GET /metrics
+REGISTRY = MetricsRegistry()
+
+AGENT_TURN_SECONDS = REGISTRY.histogram(
+    "coffee_agent_turn_seconds", "Duration of agent turns (ADK invoke_agent spans).", ("agent",)
+)
+MODEL_CALL_SECONDS = REGISTRY.histogram(
+    "coffee_model_call_seconds", "Duration of model calls (ADK generate_content spans).", ("agent", "model")
+)
+MODEL_TOKENS = REGISTRY.histogram(
+    "coffee_model_tokens", "Tokens per model call, as reported by the model.", ("agent", "direction"),
+    buckets=TOKEN_BUCKETS,
+)
+MODEL_WAIT_SECONDS = REGISTRY.histogram(
+    "coffee_model_wait_seconds", "Time model calls waited for the model scheduler to admit them.",
+)
+MODEL_RETRIES = REGISTRY.counter(
+    "coffee_model_retries_total", "Model calls retried by the model scheduler, by the status that failed them.",
+    ("status",),
+)
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "coffee_tool_call_seconds", "Duration of tool calls (ADK execute_tool spans).", ("tool", "status")
+)
+TOOL_POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "coffee_tool_pool_wait_seconds", "Time tool calls waited for a tool pool worker.", ("tool",)
+)
+TOOL_POOL_REJECTED = REGISTRY.counter(
+    "coffee_tool_pool_rejected_total", "Tool calls turned away because the tool pool was saturated.", ("tool",)
+)
+KNOWLEDGE_SECONDS = REGISTRY.histogram(
+    "coffee_knowledge_seconds", "Duration of knowledge base functions.", ("function",)
+)
+A2A_CLIENT_SECONDS = REGISTRY.histogram(
+    "coffee_a2a_client_seconds", "Duration of A2A requests to the Coffee Trends Agent, until the response is read.",
+    ("path", "status"),
+)
+HTTP_SERVER_SECONDS = REGISTRY.histogram(
+    "coffee_http_server_seconds", "Duration of requests served by the Coffee Trends Agent server.",
+    ("method", "path", "status"),
+)
+
+
+def render_prometheus() -> str:
+    """Render the process's metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
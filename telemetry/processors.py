@@ -0,0 +1,108 @@
+"""
+Span Processors
+Span-based metrics, an in-memory span exporter and the tracer provider for the OpenTelemetry SDK.
+
+Imported by configure_telemetry() once telemetry is enabled.
+"""
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Sequence, Tuple
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import StatusCode
+
+from .metrics import AGENT_TURN_SECONDS, MODEL_CALL_SECONDS, MODEL_TOKENS, TOOL_CALL_SECONDS
+
+MEMORY_EXPORTER_MAX_SPANS = 10_000
+
+# a2a-sdk opens ~60 spans per request (one per event queue operation); the
+# client and server spans of propagation.py already cover the A2A hop. Setting
+# a2a-sdk's own switch to "true" keeps its spans.
+A2A_SDK_SCOPE = "a2a-python-sdk"
+A2A_SDK_ENABLED_ENV_VAR = "OTEL_INSTRUMENTATION_A2A_SDK_ENABLED"
+
+
+class _EnclosingSpanTracer(trace.Tracer):
+    """Tracer that records nothing: its "spans" are the caller's current span, so nested spans keep their parent."""
+
+    def start_span(self, name, context=None, *args, **kwargs) -> trace.Span:
+        return trace.NonRecordingSpan(trace.get_current_span(context).get_span_context())
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, *args, **kwargs) -> Iterator[trace.Span]:
+        yield self.start_span(name, context)
+
+
+class ProjectTracerProvider(TracerProvider):
+    """SDK tracer provider that leaves out a2a-sdk's internal spans unless they are asked for."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._skip_a2a_sdk = os.getenv(A2A_SDK_ENABLED_ENV_VAR, "").lower() != "true"
+        self._enclosing_span_tracer = _EnclosingSpanTracer()
+
+    def get_tracer(self, instrumenting_module_name, *args, **kwargs) -> trace.Tracer:
+        if self._skip_a2a_sdk and instrumenting_module_name == A2A_SDK_SCOPE:
+            return self._enclosing_span_tracer
+        return super().get_tracer(instrumenting_module_name, *args, **kwargs)
+
+
+class MetricsSpanProcessor(SpanProcessor):
+    """
+    Records the duration and token usage of finished ADK spans as histograms.
+
+    ADK names the operation of its spans with the OpenTelemetry GenAI
+    attribute gen_ai.operation.name; other spans are ignored.
+    """
+
+    def on_end(self, span: ReadableSpan) -> None:
+        attributes = span.attributes or {}
+        operation = attributes.get("gen_ai.operation.name")
+        if operation is None or span.start_time is None or span.end_time is None:
+            return
+        seconds = (span.end_time - span.start_time) / 1e9
+        agent = attributes.get("gen_ai.agent.name", "")
+        if operation == "invoke_agent":
+            AGENT_TURN_SECONDS.observe(seconds, agent=agent)
+        elif operation == "execute_tool":
+            status = "error" if span.status.status_code is StatusCode.ERROR else "ok"
+            TOOL_CALL_SECONDS.observe(seconds, tool=attributes.get("gen_ai.tool.name", ""), status=status)
+        elif operation == "generate_content":
+            MODEL_CALL_SECONDS.observe(seconds, agent=agent, model=attributes.get("gen_ai.request.model", ""))
+            for direction in ("input", "output"):
+                tokens = attributes.get(f"gen_ai.usage.{direction}_tokens")
+                if tokens is not None:
+                    MODEL_TOKENS.observe(tokens, agent=agent, direction=direction)
+
+
+class MemorySpanExporter(SpanExporter):
+    """Keeps the most recent finished spans in memory, for tests and offline inspection."""
+
+    def __init__(self, max_spans: int = MEMORY_EXPORTER_MAX_SPANS):
+        """
+        Args:
+            max_spans: Spans kept; older ones are dropped first
+        """
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self) -> Tuple[ReadableSpan, ...]:
+        with self._lock:
+            return tuple(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self) -> None:
+        self.clear()
@@ -0,0 +1,155 @@
+"""
+Trace Context Propagation
+Carries traces across the A2A hop between the BAHO agent and the Coffee Trends Agent.
+
+TracingTransport wraps the httpx transport of the shared A2A client: every
+request becomes a client span and sends its W3C trace context (traceparent)
+header. TraceContextMiddleware, on the trends server, continues the trace
+from that header in a server span, so the trends agent's turn, model and tool
+spans join the BAHO agent's trace. Both record request durations in the
+histograms of metrics.py, also while tracing is off.
+
+A streamed (SSE) response counts until it has been read and closed, like the
+load balancer's in-flight accounting.
+"""
+
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from .metrics import A2A_CLIENT_SECONDS, HTTP_SERVER_SECONDS
+from .tracing import get_tracer
+
+# Served without spans: scrapes and health probes would drown the request traces
+UNTRACED_PATHS = ("/metrics", "/.well-known/agent-card.json")
+
+
+class _TracedStream(httpx.AsyncByteStream):
+    """Response body that ends its request's span when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, finish: Callable[[], None]):
+        self._stream = stream
+        self._finish: Optional[Callable[[], None]] = finish
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._finish is not None:
+                finish, self._finish = self._finish, None
+                finish()
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that traces requests and sends their trace context."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        """
+        Args:
+            transport: Transport that sends the requests
+        """
+        self._transport = transport
+
+    @property
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return self._transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        started = time.perf_counter()
+        tracer = get_tracer()
+        span = None
+        if tracer is not None:
+            from opentelemetry import propagate, trace
+
+            span = tracer.start_span(
+                f"{request.method} {path}",
+                kind=trace.SpanKind.CLIENT,
+                attributes={
+                    "http.request.method": request.method,
+                    "url.full": str(request.url),
+                    "server.address": request.url.host,
+                },
+            )
+            propagate.inject(request.headers, context=trace.set_span_in_context(span))
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            A2A_CLIENT_SECONDS.observe(time.perf_counter() - started, path=path, status="error")
+            if span is not None:
+                span.record_exception(e)
+                span.set_status(trace.StatusCode.ERROR, str(e))
+                span.end()
+            raise
+
+        status = response.status_code
+
+        def finish() -> None:
+            A2A_CLIENT_SECONDS.observe(time.perf_counter() - started, path=path, status=str(status))
+            if span is not None:
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(trace.StatusCode.ERROR)
+                span.end()
+
+        response.stream = _TracedStream(response.stream, finish)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class TraceContextMiddleware:
+    """ASGI middleware continuing incoming trace context in a server span per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        tracer = get_tracer()
+        try:
+            if tracer is None or path in UNTRACED_PATHS:
+                await self.app(scope, receive, send_with_status)
+                return
+
+            from opentelemetry import propagate, trace
+
+            headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+            with tracer.start_as_current_span(
+                f"{method} {path}",
+                context=propagate.extract(headers),
+                kind=trace.SpanKind.SERVER,
+                attributes={"http.request.method": method, "url.path": path},
+            ) as span:
+                try:
+                    await self.app(scope, receive, send_with_status)
+                finally:
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(trace.StatusCode.ERROR)
+        finally:
+            # Unknown paths share one label so scans cannot grow the metric without bound
+            HTTP_SERVER_SECONDS.observe(
+                time.perf_counter() - started, method=method, path=path if status != 404 else "other",
+                status=str(status),
+            )
@@ -0,0 +1,141 @@
+"""
+Tracing
+OpenTelemetry spans for agent turns, model and tool calls, knowledge lookups and A2A requests.
+
+ADK opens OpenTelemetry spans for every agent turn (invoke_agent), model call
+(generate_content) and tool call (execute_tool), but they are only recorded
+once a tracer provider is installed. configure_telemetry() installs one (or
+extends the application's own SDK provider) with the span processors of
+processors.py:
+
+    MetricsSpanProcessor   feeds finished ADK spans into the latency and token
+                           histograms of metrics.py
+    an exporter            "memory" keeps the latest spans in a MemorySpanExporter
+                           for offline inspection, "console" prints them
+
+traced() adds a span and a latency histogram to plain functions such as the
+knowledge lookups, and propagation.py carries the trace context across the
+A2A hop, so one BAHO question is one trace from the BAHO turn down to the
+trends agent's tool calls.
+
+OpenTelemetry is imported only when telemetry is configured, so importing
+this module (and the knowledge base that uses traced()) stays cheap.
+"""
+
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Tracer
+
+TELEMETRY_MODES = ("metrics", "memory", "console", "off")
+TRACER_NAME = "coffee_trends"
+
+# Tracer for traced() and the A2A propagation; None until telemetry is configured
+_tracer: Optional["Tracer"] = None
+_mode: Optional[str] = None
+_exporter = None
+_lock = threading.Lock()
+
+
+def get_tracer() -> Optional["Tracer"]:
+    """Return the project's tracer, or None while telemetry is not configured (or is off)."""
+    return _tracer
+
+
+def configure_telemetry(mode: str = "metrics", service_name: str = "coffee-trends"):
+    """
+    Start recording spans and span-based metrics in this process.
+
+    The first call wins; later calls (e.g. from a second agent factory in the
+    same process) return the exporter configured by the first one.
+
+    Args:
+        mode: "metrics" (histograms only), "memory" (also keep the latest spans
+              in a MemorySpanExporter), "console" (also print spans) or "off"
+        service_name: service.name of a tracer provider created here
+
+    Returns:
+        The MemorySpanExporter in "memory" mode, otherwise None
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    global _tracer, _mode, _exporter
+    if mode not in TELEMETRY_MODES:
+        raise ValueError(f"Unknown telemetry mode '{mode}' (expected one of {', '.join(TELEMETRY_MODES)})")
+    with _lock:
+        # logging is imported here rather than at the top, keeping `import knowledge` light
+        import logging
+
+        logger = logging.getLogger(__name__)
+        if _mode is not None:
+            if mode != _mode:
+                logger.info("Telemetry already configured as '%s'; ignoring '%s'", _mode, mode)
+            return _exporter if _mode == "memory" else None
+        _mode = mode
+        if mode == "off":
+            return None
+
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+        from .processors import MemorySpanExporter, MetricsSpanProcessor, ProjectTracerProvider
+
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            # An application that installed its own SDK provider keeps it, with our processors added
+            provider = ProjectTracerProvider(resource=Resource.create({"service.name": service_name}))
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(MetricsSpanProcessor())
+        if mode == "memory":
+            _exporter = MemorySpanExporter()
+        elif mode == "console":
+            _exporter = ConsoleSpanExporter()
+        if _exporter is not None:
+            provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        _tracer = trace.get_tracer(TRACER_NAME)
+        logger.info("Telemetry configured (%s) for %s", mode, service_name)
+        return _exporter if mode == "memory" else None
+
+
+def get_span_exporter():
+    """Return the MemorySpanExporter configured in "memory" mode, or None."""
+    return _exporter if _mode == "memory" else None
+
+
+def traced(span_name: str, histogram: Optional[Histogram] = None, **labels) -> Callable:
+    """
+    Decorate a function to run in its own span and record its duration.
+
+    Args:
+        span_name: Name of the span (only opened once telemetry is configured)
+        histogram: Histogram to record the duration in seconds in, if any
+        **labels: Label values for the histogram
+
+    Returns:
+        Decorator
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                tracer = _tracer
+                if tracer is None:
+                    return function(*args, **kwargs)
+                with tracer.start_as_current_span(span_name):
+                    return function(*args, **kwargs)
+            finally:
+                if histogram is not None:
+                    histogram.observe(time.perf_counter() - started, **labels)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,113 @@
+"""
+Load Balancer Tests
+In-flight accounting survives cancellation and errors; 503s fail over only to replicas in rotation.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from clients.load_balancer import BalancedTransport
+
+REPLICAS = ["http://trends-1:8001", "http://trends-2:8001"]
+
+
+class _Body(httpx.AsyncByteStream):
+    """Streamed body, read (and closed) by the client like a real transport's."""
+
+    def __init__(self, text: str):
+        self._data = text.encode("utf-8")
+
+    async def __aiter__(self):
+        yield self._data
+
+
+def _response(status_code, text, **kwargs):
+    return httpx.Response(status_code, stream=_Body(text), **kwargs)
+
+
+def _client(handler, urls=REPLICAS):
+    transport = BalancedTransport(urls, httpx.MockTransport(handler), health_check_interval=0, reset_timeout=60)
+    return httpx.AsyncClient(transport=transport), transport
+
+
+def _outstanding(transport):
+    return [replica.outstanding for replica in transport.replicas]
+
+
+def test_cancelled_request_releases_its_replica():
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.Event().wait()
+
+    async def main():
+        client, transport = _client(handler)
+        task = asyncio.ensure_future(client.post(f"{REPLICAS[0]}/", content=b"{}"))
+        await started.wait()
+        assert sum(_outstanding(transport)) == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return _outstanding(transport)
+
+    assert asyncio.run(main()) == [0, 0]
+
+
+def test_failed_request_releases_its_replica():
+    def handler(request):
+        raise RuntimeError("handler failed")
+
+    async def main():
+        client, transport = _client(handler)
+        with pytest.raises(RuntimeError):
+            await client.post(f"{REPLICAS[0]}/", content=b"{}")
+        return _outstanding(transport)
+
+    assert asyncio.run(main()) == [0, 0]
+
+
+def test_503_fails_over_to_another_replica():
+    def handler(request):
+        return _response(503 if request.url.host == "trends-1" else 200, request.url.host)
+
+    async def main():
+        client, transport = _client(handler)
+        bodies = [(await client.post(f"{REPLICAS[0]}/", content=b"{}")).text for _ in range(4)]
+        return bodies, _outstanding(transport)
+
+    bodies, outstanding = asyncio.run(main())
+    assert bodies == ["trends-2"] * 4
+    assert outstanding == [0, 0]
+
+
+def test_503_is_returned_when_no_other_replica_is_in_rotation():
+    def handler(request):
+        return _response(503, "busy", headers={"Retry-After": "1"})
+
+    async def main():
+        client, transport = _client(handler)
+        transport._open(transport.replicas[1])
+        response = await client.post(f"{REPLICAS[0]}/", content=b"{}")
+        return response, _outstanding(transport)
+
+    response, outstanding = asyncio.run(main())
+    assert response.status_code == 503
+    assert response.text == "busy"
+    assert outstanding == [0, 0]
+
+
+def test_unreachable_replica_is_skipped():
+    def handler(request):
+        if request.url.host == "trends-1":
+            raise httpx.ConnectError("connection refused", request=request)
+        return _response(200, request.url.host)
+
+    async def main():
+        client, transport = _client(handler)
+        response = await client.post(f"{REPLICAS[0]}/", content=b"{}")
+        return response.text, transport.replicas[0].failures, _outstanding(transport)
+
+    assert asyncio.run(main()) == ("trends-2", 1, [0, 0])
@@ -0,0 +1,74 @@
+"""
+Semantic Response Cache Tests
+Paraphrases of a cached question hit; questions about another year or origin miss.
+"""
+
+import pytest
+
+from cache.response_cache import QuestionCache, ResponseCache
+from cache.semantic_cache import SemanticResponseCache, key_terms
+
+AGENT = "coffee_trends_agent"
+VERSION = "v1"
+
+PARAPHRASES = [
+    ("pricing strategy for Rwandan coffee", "how should BAHO price its coffee"),
+    ("What coffee trends matter most for BAHO?", "Which coffee trends matter most to BAHO"),
+    ("What are the latest specialty coffee trends?", "what are the latest trends in specialty coffee"),
+    ("How should BAHO price its specialty coffee?", "What pricing strategy should BAHO use for specialty coffee?"),
+]
+
+NEAR_MISSES = [
+    ("What were the coffee price trends in 2023?", "What were the coffee price trends in 2024?"),
+    ("What are Rwanda's coffee quality grades?", "What are Kenya's coffee quality grades?"),
+    ("rwanda quality grades", "kenya quality grades"),
+    ("What are the key coffee trends for BAHO?", "What are the key coffee trends for BAHO in Europe?"),
+    ("Is Rwandan coffee organic?", "Is Rwandan coffee not organic?"),
+    ("Which trends matter for BAHO?", "Which trends don't matter for BAHO?"),
+    ("specialty coffee with natural processing", "specialty coffee without natural processing"),
+]
+
+
+@pytest.mark.parametrize("cached, asked", PARAPHRASES)
+def test_paraphrase_hits(cached, asked):
+    cache = SemanticResponseCache()
+    cache.store(AGENT, cached, VERSION, "answer")
+    assert cache.lookup(AGENT, asked, VERSION) == "answer"
+
+
+@pytest.mark.parametrize("cached, asked", NEAR_MISSES)
+def test_near_miss_misses(cached, asked):
+    cache = SemanticResponseCache()
+    cache.store(AGENT, cached, VERSION, "answer")
+    assert cache.lookup(AGENT, asked, VERSION) is None
+    assert cache.lookup(AGENT, cached, VERSION) == "answer"
+
+
+def test_key_terms_map_domain_names():
+    assert key_terms("pricing strategy for Rwandan coffee") == key_terms("how should BAHO price its coffee")
+    assert key_terms("coffee price trends in 2023") == {"2023"}
+    assert key_terms("What are the latest specialty coffee trends?") == set()
+    assert key_terms("Why isn't BAHO coffee never cheaper?") == {"rwanda", "not"}
+
+
+def test_version_and_agent_namespace_entries():
+    cache = SemanticResponseCache()
+    cache.store(AGENT, "What are the key coffee trends?", VERSION, "answer")
+    assert cache.lookup(AGENT, "What are the key coffee trends?", "v2") is None
+    assert cache.lookup("baho_strategy_agent", "What are the key coffee trends?", VERSION) is None
+
+
+def test_namespaces_are_bounded_by_slots():
+    cache = SemanticResponseCache(max_entries=4)
+    for version in range(100):
+        cache.store(AGENT, "What are the key coffee trends?", f"v{version}", "answer")
+    assert len(cache._namespace_ids) <= cache.max_entries + 1
+    assert cache.lookup(AGENT, "What are the key coffee trends?", "v99") == "answer"
+    assert cache.lookup(AGENT, "What are the key coffee trends?", "v0") is None
+
+
+def test_is_a_question_cache_not_a_key_value_cache():
+    cache = SemanticResponseCache()
+    assert isinstance(cache, QuestionCache)
+    assert not isinstance(cache, ResponseCache)
+    assert not hasattr(cache, "get")
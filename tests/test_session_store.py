@@ -0,0 +1,58 @@
+"""
+Session Store Tests
+Sessions persist their events and state, expire when idle, and can be recreated under the same id.
+"""
+
+import asyncio
+
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.genai import types
+
+from sessions.session_store import SQLiteSessionService
+
+
+def _event(text):
+    return Event(author="user", invocation_id="i1", content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+@pytest.fixture
+def service():
+    service = SQLiteSessionService(":memory:", idle_timeout=0.2)
+    yield service
+    service.close()
+
+
+def test_events_and_state_round_trip(service):
+    async def main():
+        session = await service.create_session(app_name="a", user_id="u", session_id="c1", state={"x": 1})
+        await service.append_event(session, _event("hi"))
+        return await service.get_session(app_name="a", user_id="u", session_id="c1")
+
+    session = asyncio.run(main())
+    assert [event.content.parts[0].text for event in session.events] == ["hi"]
+    assert session.state == {"x": 1}
+
+
+def test_idle_session_expires_and_can_be_recreated(service):
+    async def main():
+        await service.create_session(app_name="a", user_id="u", session_id="c1")
+        await asyncio.sleep(0.3)
+        expired = await service.get_session(app_name="a", user_id="u", session_id="c1")
+        await service.create_session(app_name="a", user_id="u", session_id="c1")
+        recreated = await service.get_session(app_name="a", user_id="u", session_id="c1")
+        return expired, recreated
+
+    expired, recreated = asyncio.run(main())
+    assert expired is None
+    assert recreated.id == "c1" and not recreated.events
+
+
+def test_duplicate_session_id_is_refused(service):
+    async def main():
+        await service.create_session(app_name="a", user_id="u", session_id="c1")
+        await service.create_session(app_name="a", user_id="u", session_id="c1")
+
+    with pytest.raises(AlreadyExistsError):
+        asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Trend Store Tests
+A SQLite store keeps serving the file it opened after that path is rewritten, and a reload closes it.
+"""
+
+import threading
+
+import pytest
+
+from knowledge import (
+    COFFEE_TRENDS_DB,
+    RWANDA_COFFEE_INFO,
+    DictTrendStore,
+    SQLiteTrendStore,
+    get_knowledge_snapshot,
+    reload_knowledge,
+    search_coffee_trends,
+    write_sqlite_store,
+)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = write_sqlite_store(tmp_path / "coffee_trends.sqlite", COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO)
+    yield path
+    reload_knowledge(DictTrendStore(COFFEE_TRENDS_DB, RWANDA_COFFEE_INFO))
+
+
+def _rewrite_with_subset(path, size=2):
+    subset = dict(list(COFFEE_TRENDS_DB.items())[:size])
+    write_sqlite_store(path, subset, RWANDA_COFFEE_INFO)
+
+
+def _in_new_thread(function):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_store_keeps_serving_the_file_it_opened(store_path):
+    store = SQLiteTrendStore(store_path)
+    keys = store.trend_keys()
+    _rewrite_with_subset(store_path)
+    assert _in_new_thread(lambda: [store.get_trend(key) is not None for key in keys]) == [True] * len(keys)
+    assert len(list(store.iter_trends())) == len(keys)
+    store.close()
+
+
+def test_search_after_the_store_file_is_rewritten(store_path):
+    reload_knowledge(SQLiteTrendStore(store_path))
+    expected = [view["key"] for view in search_coffee_trends("specialty")]
+    _rewrite_with_subset(store_path)
+    found = _in_new_thread(lambda: [view["key"] for view in search_coffee_trends("specialty")])
+    assert found == expected and found
+
+
+def test_reload_closes_the_previous_store(store_path):
+    reload_knowledge(SQLiteTrendStore(store_path))
+    old_store = get_knowledge_snapshot().store
+    _rewrite_with_subset(store_path)
+    diff = reload_knowledge(SQLiteTrendStore(store_path))
+    assert len(diff.removed) == len(COFFEE_TRENDS_DB) - 2
+    assert old_store._file is None
+    assert len(search_coffee_trends("coffee")) <= 2
+
+
+def test_reload_keeps_the_store_it_is_given_again(store_path):
+    store = SQLiteTrendStore(store_path)
+    reload_knowledge(store)
+    reload_knowledge(store)
+    assert store._file is not None
+    assert search_coffee_trends("specialty")